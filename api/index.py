@@ -0,0 +1,311 @@
+"""
+生命靈數 HTTP API
+
+    GET /api/profile?birthdate=19900101[&year=2026][&fields=life_number,zodiac_name]
+    POST /api/profiles  {"birthdates": [...], "year": 2026, "fields": [...]}
+    GET /api/metrics
+
+批次查詢回傳與 birthdates 對齊的陣列，無效的生日對應 {"error": 原因代碼}。
+請求格式錯誤時回應 400，本文超過 MAX_BODY_BYTES 時回應 413，其他錯誤回應 500。
+fields=tarot_pairings 取得六組塔羅配牌的解讀（由預先建好的配牌表查得，與 GUI 的配牌段落相同）。
+
+同時湧入的單一生日查詢會經過 MicroBatcher：在很短的時間窗內（預設 1 毫秒或 256 個請求）
+收集請求，相同的 (生日, 年份, 欄位) 只計算一次，再將同一份 JSON 回應分送給每個請求者。
+
+本機執行：
+    python api/index.py --port 8000 --window-ms 1 --max-batch 256
+"""
+from concurrent.futures import Future
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from life_number_calculator import normalize_date, normalize_year, format_birthdate, compute_profile  # noqa: E402
+
+# 批次查詢本文的大小上限（位元組），超過時回應 413 而不讀取本文
+MAX_BODY_BYTES = int(os.environ.get('LIFE_NUMBER_MAX_BODY_BYTES', str(1024 * 1024)))
+
+
+def profile_json(birthdate, year, fields):
+    """計算一個生日的 JSON 回應本文"""
+    profile = compute_profile(birthdate, fields, year)
+    return json.dumps(profile, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class MicroBatcher:
+    """
+    將短時間內抵達的請求合併成一批計算
+
+    第一個請求抵達後開始計時，時間窗結束或累積的請求數達到上限時送出整批；
+    批次中相同的鍵只計算一次，結果透過 Future 分送給所有等待中的請求。
+    """
+
+    def __init__(self, compute, window=0.001, max_batch=256):
+        """
+        Args:
+            compute (function): compute(*key)，計算單一鍵的結果
+            window (float): 時間窗（秒）
+            max_batch (int): 每批最多的請求數
+        """
+        self.compute = compute
+        self.window = window
+        self.max_batch = max_batch
+        self._condition = threading.Condition()
+        self._pending = {}            # 鍵 -> [(Future, 抵達時間), ...]
+        self._count = 0
+        self._first_arrival = 0.0
+        self._worker = None
+        self._metrics = {
+            'batches': 0,
+            'requests': 0,
+            'computed': 0,
+            'max_batch_size': 0,
+            'total_wait': 0.0,
+            'max_wait': 0.0,
+        }
+
+    def submit(self, *key):
+        """
+        送出一個請求
+
+        Returns:
+            Future: 完成後的結果（或計算時的例外）
+        """
+        future = Future()
+        now = time.monotonic()
+        with self._condition:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+                self._worker.start()
+            self._pending.setdefault(key, []).append((future, now))
+            self._count += 1
+            if self._count == 1:
+                self._first_arrival = now
+                self._condition.notify()
+            elif self._count >= self.max_batch:
+                self._condition.notify()
+        return future
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                deadline = self._first_arrival + self.window
+                while self._count < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                pending, self._pending = self._pending, {}
+                count, self._count = self._count, 0
+            self._dispatch(pending, count)
+
+    def _dispatch(self, pending, count):
+        """計算一批不重複的鍵，並將結果分送給所有請求者"""
+        started = time.monotonic()
+        waits = [started - arrival for waiters in pending.values() for _, arrival in waiters]
+        for key, waiters in pending.items():
+            try:
+                result = self.compute(*key)
+            except Exception as e:
+                for future, _ in waiters:
+                    future.set_exception(e)
+                continue
+            for future, _ in waiters:
+                future.set_result(result)
+
+        metrics = self._metrics
+        with self._condition:
+            metrics['batches'] += 1
+            metrics['requests'] += count
+            metrics['computed'] += len(pending)
+            metrics['max_batch_size'] = max(metrics['max_batch_size'], count)
+            metrics['total_wait'] += sum(waits)
+            metrics['max_wait'] = max(metrics['max_wait'], max(waits))
+
+    def metrics(self):
+        """
+        批次統計
+
+        Returns:
+            dict: 批次數、請求數、實際計算數、平均與最大批次大小、平均與最大等待時間（毫秒）、
+                  合併比例（請求數 / 實際計算數）
+        """
+        with self._condition:
+            metrics = dict(self._metrics)
+        batches = metrics['batches'] or 1
+        requests = metrics['requests'] or 1
+        return {
+            'window_ms': self.window * 1000,
+            'max_batch': self.max_batch,
+            'batches': metrics['batches'],
+            'requests': metrics['requests'],
+            'computed': metrics['computed'],
+            'avg_batch_size': round(metrics['requests'] / batches, 3),
+            'max_batch_size': metrics['max_batch_size'],
+            'avg_wait_ms': round(metrics['total_wait'] / requests * 1000, 3),
+            'max_wait_ms': round(metrics['max_wait'] * 1000, 3),
+            'coalescing_ratio': round(metrics['requests'] / (metrics['computed'] or 1), 3),
+        }
+
+
+def batch_json(birthdates, year, fields):
+    """
+    計算批次查詢的 JSON 回應本文，相同的生日只計算一次
+
+    Raises:
+        ValueError: 欄位名稱錯誤
+    """
+    bodies = {}
+    parts = []
+    for value in birthdates:
+        date, reason = normalize_date(value)
+        if reason is not None:
+            parts.append(json.dumps({'error': reason}).encode('utf-8'))
+            continue
+        if date not in bodies:
+            bodies[date] = profile_json(format_birthdate(date), year, fields)
+        parts.append(bodies[date])
+    return b'[' + b','.join(parts) + b']'
+
+
+class handler(BaseHTTPRequestHandler):
+    """API 請求處理（類別名稱依 Vercel Python 函式的慣例）"""
+
+    # 以 HTTP/1.1 保持連線，壓測與高頻率的用戶端不必每次重新連線
+    protocol_version = 'HTTP/1.1'
+    # 標頭與本文分開寫出，關閉 Nagle 以免與用戶端的延遲 ACK 互等約 40 毫秒
+    disable_nagle_algorithm = True
+
+    batcher = MicroBatcher(
+        profile_json,
+        window=float(os.environ.get('LIFE_NUMBER_BATCH_WINDOW_MS', '1')) / 1000,
+        max_batch=int(os.environ.get('LIFE_NUMBER_BATCH_MAX', '256')),
+    )
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.rstrip('/').endswith('/metrics'):
+            self._send_json(200, json.dumps(self.batcher.metrics()).encode('utf-8'))
+            return
+
+        query = parse_qs(url.query)
+        date, reason = normalize_date(query.get('birthdate', [''])[0])
+        if reason is not None:
+            self._send_error(reason)
+            return
+        year = datetime.now().year
+        if 'year' in query:
+            year, reason = normalize_year(query['year'][0])
+            if reason is not None:
+                self._send_error(reason)
+                return
+        fields = tuple(query['fields'][0].split(',')) if 'fields' in query else None
+
+        try:
+            body = self.batcher.submit(format_birthdate(date), year, fields).result()
+        except ValueError:
+            self._send_error('field')
+            return
+        except Exception:
+            self._send_json(500, b'{"error":"internal"}')
+            return
+        self._send_json(200, body)
+
+    def do_POST(self):
+        length = self.headers.get('Content-Length') or '0'
+        if not (length.isascii() and length.isdigit()):
+            # 無法得知本文在哪裡結束，回應後關閉連線
+            self.close_connection = True
+            self._send_error('length')
+            return
+        if int(length) > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send_json(413, b'{"error":"too_large"}')
+            return
+        # 先讀完本文，保持連線時下一個請求才不會讀到殘留的資料
+        body = self.rfile.read(int(length))
+        if not urlparse(self.path).path.rstrip('/').endswith('/profiles'):
+            self._send_json(404, b'{"error":"not_found"}')
+            return
+        try:
+            request = json.loads(body.decode('utf-8'))
+            birthdates = request['birthdates']
+        except (ValueError, KeyError, TypeError):
+            self._send_error('format')
+            return
+        if not isinstance(birthdates, list):
+            self._send_error('format')
+            return
+        year = request.get('year')
+        if year is None:
+            year = datetime.now().year
+        else:
+            # JSON 本文中的年份必須是數字，不接受字串
+            year, reason = (None, 'year') if isinstance(year, str) else normalize_year(year)
+            if reason is not None:
+                self._send_error(reason)
+                return
+        fields = request.get('fields')
+        if fields is not None:
+            if not isinstance(fields, list) or not all(isinstance(field, str) for field in fields):
+                self._send_error('field')
+                return
+            fields = tuple(fields) or None
+
+        try:
+            body = batch_json(birthdates, year, fields)
+        except ValueError:
+            self._send_error('field')
+            return
+        except Exception:
+            self._send_json(500, b'{"error":"internal"}')
+            return
+        self._send_json(200, body)
+
+    def _send_error(self, reason):
+        self._send_json(400, json.dumps({'error': reason}).encode('utf-8'))
+
+    def _send_json(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 高流量時逐筆記錄請求的成本比計算本身還高
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生命靈數 HTTP API")
+    parser.add_argument('--host', default='127.0.0.1', help="監聽位址")
+    parser.add_argument('--port', type=int, default=8000, help="監聽埠號")
+    parser.add_argument('--window-ms', type=float, default=1.0, help="合併請求的時間窗（毫秒）")
+    parser.add_argument('--max-batch', type=int, default=256, help="每批最多的請求數")
+    args = parser.parse_args(argv)
+
+    handler.batcher = MicroBatcher(profile_json, window=args.window_ms / 1000, max_batch=args.max_batch)
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    server.daemon_threads = True
+    print(f"API 已啟動：http://{args.host}:{args.port}/api/profile?birthdate=19900101", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
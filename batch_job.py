@@ -0,0 +1,373 @@
+"""
+可中斷、可續跑的批次計算工作
+
+從 '編號,生日'（或只有生日）的 CSV 檔案讀取資料，每累積一定筆數就輸出一個分段檔案，
+並在檢查點檔案中記錄已處理到的輸入位元組位置與輸出狀態。
+工作被中斷後再次執行同一個指令，會從最後一個檢查點繼續，不會重算或重複輸出任何一列。
+
+輸出資料夾：
+    part-000000.csv ...   每個分段一個檔案，先寫入暫存檔再以 os.replace 原子地換上
+    checkpoint.json       檢查點，同樣以原子方式更新
+
+分段檔案一律在檢查點更新之前寫好；若在兩者之間被中斷，續跑時會以相同內容覆寫同一個分段。
+
+用法：
+    python batch_job.py --input members.csv --output-dir out/ --year 2026
+    python batch_job.py --input members.csv --output-dir out/ --segment-size 1000000 --format jsonl
+    python batch_job.py --input members.csv --output-dir out/ --format columnar
+"""
+from collections import Counter, OrderedDict
+from datetime import datetime
+import argparse
+import csv
+import glob
+import io
+import json
+import os
+import signal
+import sys
+
+from columnar import write_columnar
+from life_number_calculator import normalize_date, format_birthdate, compute_profile
+
+# 檢查點版本；分段檔案的格式改變時遞增，舊版檢查點不能續跑
+#   2：新增欄式分段（含 birthdate 欄）
+#   3：預設欄位 BATCH_FIELDS 新增 month_day_sum、digit_sum
+CHECKPOINT_VERSION = 3
+CHECKPOINT_NAME = 'checkpoint.json'
+
+# 預設輸出的欄位（皆為單一數值或字串，可直接寫成表格）
+BATCH_FIELDS = (
+    'life_number', 'year_number',
+    'life_tarot', 'soul_tarot', 'year_tarot', 'talent_tarot', 'innate_tarot',
+    'acquired_tarot', 'personality_tarot', 'shadow_tarot',
+    'ziwei_main', 'ziwei_sub', 'ziwei_destiny',
+    'connection_innate', 'connection_life', 'connection_talent',
+    'zodiac_number', 'zodiac_name',
+    'grid_counts',
+    # 跨年時 year_rollover.py 以這兩個數字和重算流年欄位，不必重新計算整份結果
+    'month_day_sum', 'digit_sum',
+)
+
+
+def _csv_value(value):
+    """九宮格數量等序列寫成連續數字，例如 (2, 0, 1, ...) -> '201...'"""
+    if isinstance(value, tuple):
+        return ''.join(map(str, value))
+    return value
+
+
+def write_csv_segment(f, ids, birthdates, profiles, fields):
+    """將一個分段寫成 CSV（含標題列）"""
+    text = io.TextIOWrapper(f, encoding='utf-8', newline='')
+    writer = csv.writer(text)
+    writer.writerow(('id', 'birthdate') + tuple(fields))
+    for record_id, birthdate, profile in zip(ids, birthdates, profiles):
+        writer.writerow([record_id, birthdate] + [_csv_value(profile[field]) for field in fields])
+    text.flush()
+    text.detach()
+
+
+def write_jsonl_segment(f, ids, birthdates, profiles, fields):
+    """將一個分段寫成每行一個 JSON 物件"""
+    for record_id, birthdate, profile in zip(ids, birthdates, profiles):
+        row = {'id': record_id, 'birthdate': birthdate}
+        row.update(profile)
+        f.write(json.dumps(row, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n')
+
+
+# 格式名稱 -> (副檔名, 寫入函式)
+SEGMENT_FORMATS = {
+    'csv': ('csv', write_csv_segment),
+    'jsonl': ('jsonl', write_jsonl_segment),
+    # 欄式二進位格式，見 columnar.py
+    'columnar': ('lnc', write_columnar),
+}
+
+
+def atomic_write(path, write):
+    """
+    先寫入同資料夾的暫存檔並 fsync，再以 os.replace 換上，讀取端不會看到寫到一半的檔案
+
+    Args:
+        path (str): 目標檔案
+        write (function): write(f)，f 為以二進位模式開啟的暫存檔
+    """
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+
+
+def segment_path(output_dir, index, file_format):
+    """第 index 個分段的檔案路徑"""
+    extension = SEGMENT_FORMATS[file_format][0]
+    return os.path.join(output_dir, f"part-{index:06d}.{extension}")
+
+
+def load_checkpoint(output_dir):
+    """
+    讀取檢查點
+
+    Returns:
+        dict: 檢查點內容；尚未開始時回傳 None
+    """
+    path = os.path.join(output_dir, CHECKPOINT_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_checkpoint(output_dir, checkpoint):
+    """以原子方式更新檢查點"""
+    data = json.dumps(checkpoint, ensure_ascii=False, indent=2).encode('utf-8')
+    atomic_write(os.path.join(output_dir, CHECKPOINT_NAME), lambda f: f.write(data))
+
+
+def new_checkpoint(input_path, fields, year, file_format, segment_size):
+    """
+    建立新工作的檢查點
+
+    輸入檔案的大小與修改時間一併記錄，續跑時用來確認輸入沒有被更換。
+    """
+    stat = os.stat(input_path)
+    return {
+        'version': CHECKPOINT_VERSION,
+        'input': os.path.abspath(input_path),
+        'input_size': stat.st_size,
+        'input_mtime_ns': stat.st_mtime_ns,
+        'fields': list(fields),
+        'year': year,
+        'format': file_format,
+        'segment_size': segment_size,
+        'offset': 0,
+        'line_number': 0,
+        'segments': 0,
+        'rows': 0,
+        'computed': 0,
+        'rejects': {},
+        'done': False,
+    }
+
+
+def check_resumable(checkpoint, input_path, fields, file_format):
+    """
+    確認檢查點與這次的參數相符
+
+    Raises:
+        ValueError: 輸入檔案或輸出設定與檢查點不同
+    """
+    if checkpoint.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"檢查點版本 {checkpoint.get('version')} 與目前的分段格式不符，請使用 --restart 重新開始")
+    stat = os.stat(input_path)
+    if (checkpoint['input'] != os.path.abspath(input_path)
+            or checkpoint['input_size'] != stat.st_size
+            or checkpoint['input_mtime_ns'] != stat.st_mtime_ns):
+        raise ValueError("輸入檔案與檢查點記錄的不同，請使用 --restart 重新開始")
+    if checkpoint['fields'] != list(fields) or checkpoint['format'] != file_format:
+        raise ValueError("輸出欄位或格式與檢查點記錄的不同，請使用 --restart 重新開始")
+
+
+class DedupPlanner:
+    """
+    批次計算的去重與分送
+
+    同一個世紀只有約三萬六千個不同的生日，客戶檔案中大量重複；
+    以 (生日, 目標年份) 為鍵，每個不同的鍵只計算一次，再依原本的列順序分送結果。
+    跨分段保留最近使用的 max_keys 個結果，記憶體用量不隨輸入大小增加。
+    """
+
+    def __init__(self, compute, max_keys=65536):
+        """
+        Args:
+            compute (function): compute(birthdate, year)
+            max_keys (int): 跨分段保留的結果數上限
+        """
+        self.compute = compute
+        self.max_keys = max_keys
+        self.cache = OrderedDict()
+        self.rows = 0
+        self.computed = 0
+
+    def run(self, keys):
+        """
+        計算一批鍵的結果
+
+        Args:
+            keys (list): [(birthdate, year), ...]
+
+        Returns:
+            list: 與 keys 對齊的結果（相同的鍵共用同一個物件）
+        """
+        cache = self.cache
+        for key in dict.fromkeys(keys):
+            if key in cache:
+                cache.move_to_end(key)
+            else:
+                cache[key] = self.compute(*key)
+                self.computed += 1
+        results = [cache[key] for key in keys]
+        self.rows += len(keys)
+        while len(cache) > self.max_keys:
+            cache.popitem(last=False)
+        return results
+
+    @property
+    def dedup_ratio(self):
+        """輸入列數 / 實際計算數"""
+        return self.rows / self.computed if self.computed else 1.0
+
+
+def read_segment(f, checkpoint):
+    """
+    從檢查點記錄的位置讀取一個分段的有效資料
+
+    Args:
+        f: 以二進位模式開啟、已移到 checkpoint['offset'] 的輸入檔案
+        checkpoint (dict): 檢查點（只讀取，不修改）
+
+    Returns:
+        tuple: (編號串列, 生日串列, 分段結束後的位元組位置, 行號, 無效原因 Counter)
+    """
+    offset = checkpoint['offset']
+    line_number = checkpoint['line_number']
+    ids, birthdates, rejects = [], [], Counter()
+    while len(birthdates) < checkpoint['segment_size']:
+        raw = f.readline()
+        if not raw:
+            break
+        offset += len(raw)
+        line_number += 1
+        line = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+        if line_number == 1:
+            line = line.lstrip('\ufeff')
+        row = next(csv.reader([line]), None)
+        if not row:
+            continue
+        record_id, value = (row[0], row[1]) if len(row) >= 2 else (str(line_number), row[0])
+        date, reason = normalize_date(value)
+        if reason is None:
+            ids.append(record_id)
+            birthdates.append(format_birthdate(date))
+        else:
+            rejects[reason] += 1
+    return ids, birthdates, offset, line_number, rejects
+
+
+def run_job(input_path, output_dir, fields=BATCH_FIELDS, year=None, file_format='csv',
+            segment_size=100000, restart=False, progress=None, max_keys=65536):
+    """
+    執行或續跑批次工作
+
+    Args:
+        input_path (str): 輸入 CSV 檔案（必須可以 seek，不支援標準輸入）
+        output_dir (str): 輸出資料夾，檢查點也存放在這裡
+        fields (tuple): 輸出欄位
+        year (int): 流年使用的目標年份，預設為今年；續跑時沿用檢查點記錄的年份
+        file_format (str): SEGMENT_FORMATS 的名稱
+        segment_size (int): 每個分段（也是每次檢查點）的有效資料筆數
+        restart (bool): 忽略既有的檢查點，從頭開始
+        progress (function): progress(checkpoint)，每完成一個分段呼叫一次
+        max_keys (int): 去重時跨分段保留的結果數上限
+
+    Returns:
+        dict: 最後的檢查點
+    """
+    if file_format not in SEGMENT_FORMATS:
+        raise ValueError(f"未知的輸出格式：{file_format}")
+    write_segment = SEGMENT_FORMATS[file_format][1]
+    os.makedirs(output_dir, exist_ok=True)
+
+    if restart:
+        for path in glob.glob(os.path.join(output_dir, 'part-*')):
+            os.remove(path)
+    checkpoint = None if restart else load_checkpoint(output_dir)
+    if checkpoint is None:
+        year = year or datetime.now().year
+        checkpoint = new_checkpoint(input_path, fields, year, file_format, segment_size)
+        save_checkpoint(output_dir, checkpoint)
+    else:
+        check_resumable(checkpoint, input_path, fields, file_format)
+        if year is not None and year != checkpoint['year']:
+            raise ValueError(f"檢查點的目標年份為 {checkpoint['year']}，請使用 --restart 重新開始")
+    if checkpoint['done']:
+        return checkpoint
+
+    # 先確認欄位名稱正確，避免寫到一半才失敗
+    compute_profile('20000101', fields, checkpoint['year'])
+    planner = DedupPlanner(lambda birthdate, year: compute_profile(birthdate, fields, year), max_keys)
+    with open(input_path, 'rb') as f:
+        f.seek(checkpoint['offset'])
+        while True:
+            ids, birthdates, offset, line_number, rejects = read_segment(f, checkpoint)
+            if birthdates:
+                computed = planner.computed
+                profiles = planner.run([(birthdate, checkpoint['year']) for birthdate in birthdates])
+                path = segment_path(output_dir, checkpoint['segments'], file_format)
+                atomic_write(path, lambda out: write_segment(out, ids, birthdates, profiles, fields))
+                checkpoint['segments'] += 1
+                checkpoint['computed'] += planner.computed - computed
+                checkpoint['rows'] += len(birthdates)
+
+            checkpoint['offset'] = offset
+            checkpoint['line_number'] = line_number
+            total_rejects = Counter(checkpoint['rejects'])
+            total_rejects.update(rejects)
+            checkpoint['rejects'] = dict(total_rejects)
+            checkpoint['done'] = len(birthdates) < checkpoint['segment_size']
+            save_checkpoint(output_dir, checkpoint)
+            if progress:
+                progress(checkpoint)
+            if checkpoint['done']:
+                return checkpoint
+
+
+def _dedup_ratio(checkpoint):
+    return checkpoint['rows'] / checkpoint['computed'] if checkpoint['computed'] else 1.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="可中斷、可續跑的批次計算工作")
+    parser.add_argument('--input', required=True, help="'編號,生日' CSV 檔案")
+    parser.add_argument('--output-dir', required=True, help="輸出資料夾（同時存放檢查點）")
+    parser.add_argument('--fields', help="以逗號分隔的輸出欄位，預設為全部單一數值欄位")
+    parser.add_argument('--year', type=int, help="流年使用的目標年份，預設為今年")
+    parser.add_argument('--format', choices=sorted(SEGMENT_FORMATS), default='csv', help="分段檔案格式")
+    parser.add_argument('--segment-size', type=int, default=100000, help="每個分段與檢查點間隔的資料筆數")
+    parser.add_argument('--restart', action='store_true', help="忽略既有的檢查點，從頭開始")
+    parser.add_argument('--cache-size', type=int, default=65536, help="去重時跨分段保留的不同生日數")
+    args = parser.parse_args(argv)
+
+    if args.segment_size < 1:
+        parser.error("--segment-size 必須大於 0")
+    fields = tuple(args.fields.split(',')) if args.fields else BATCH_FIELDS
+    # 讓 SIGTERM 與 Ctrl+C 一樣結束，已寫好的分段與檢查點都保持完整
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))
+
+    def report(checkpoint):
+        print(f"分段 {checkpoint['segments']}：已輸出 {checkpoint['rows']} 筆，"
+              f"讀到第 {checkpoint['line_number']} 行，去重比例 {_dedup_ratio(checkpoint):.1f}", file=sys.stderr)
+
+    try:
+        checkpoint = run_job(args.input, args.output_dir, fields, args.year, args.format,
+                             args.segment_size, args.restart, report, args.cache_size)
+    except ValueError as e:
+        parser.error(str(e))
+    except KeyboardInterrupt:
+        print("已中斷，再次執行相同指令即可從最後一個檢查點繼續", file=sys.stderr)
+        sys.exit(1)
+    rejected = sum(checkpoint['rejects'].values())
+    print(f"完成：共 {checkpoint['segments']} 個分段、{checkpoint['rows']} 筆（實際計算 {checkpoint['computed']} 次，"
+          f"去重比例 {_dedup_ratio(checkpoint):.1f}），略過 {rejected} 筆無效資料", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+產生前端使用的靜態 JSON 分片
+
+每一年（或每個月）輸出一個 JSON 分片，包含該期間每一天只由生日決定的全部計算結果，
+並另存一份 gzip 預先壓縮的版本，前端可直接從 CDN 查表，不需要任何伺服器運算。
+分片格式請見 README.md 的「靜態資料分片」一節。
+
+用法：
+    python build_shards.py --start-year 1900 --end-year 2100 --output public/data
+    python build_shards.py --start-year 1990 --end-year 1990 --granularity month
+"""
+from datetime import date, timedelta
+import argparse
+import calendar
+import gzip
+import json
+import os
+
+from life_number_calculator import (
+    compute_profile,
+    calculate_zodiac_number,
+    get_life_number_meaning,
+    get_year_number_meaning,
+    get_tarot_card,
+    get_ziwei_meaning,
+    get_connection_number_meaning,
+    get_zodiac_meaning,
+)
+
+SHARD_VERSION = 1
+
+# 分片中每一列的欄位順序
+SHARD_FIELDS = (
+    'life_number',
+    'life_tarot', 'soul_tarot', 'talent_tarot', 'innate_tarot',
+    'acquired_tarot', 'personality_tarot', 'shadow_tarot',
+    'ziwei_main', 'ziwei_sub', 'ziwei_destiny',
+    'connection_innate', 'connection_life', 'connection_talent',
+    'zodiac_number', 'zodiac_name',
+    'grid_counts',
+    # 前端以這兩個數字和計算任意年份的流年數與流年塔羅
+    'month_day_sum', 'digit_sum',
+)
+
+# 以閏年的日期順序列出星座名稱，分片中的 zodiac_name 為此表的索引
+ZODIAC_NAMES = tuple(dict.fromkeys(
+    calculate_zodiac_number(f"2000{month:02d}{day:02d}")[1]
+    for month in range(1, 13) for day in range(1, 32)
+    if calculate_zodiac_number(f"2000{month:02d}{day:02d}")[0]
+))
+_ZODIAC_INDEX = {name: index for index, name in enumerate(ZODIAC_NAMES)}
+
+
+def build_rows(first_day, last_day):
+    """
+    計算期間內每一天的結果列
+
+    Args:
+        first_day (date): 起始日期（含）
+        last_day (date): 結束日期（含）
+
+    Returns:
+        list: 依日期排列的結果列，每列依 SHARD_FIELDS 排列
+    """
+    rows = []
+    for offset in range((last_day - first_day).days + 1):
+        current = first_day + timedelta(days=offset)
+        birthdate = f"{current.year:04d}{current.month:02d}{current.day:02d}"
+        profile = compute_profile(birthdate, SHARD_FIELDS, year=current.year)
+        profile['zodiac_name'] = _ZODIAC_INDEX[profile['zodiac_name']]
+        profile['grid_counts'] = list(profile['grid_counts'])
+        rows.append([profile[field] for field in SHARD_FIELDS])
+    return rows
+
+
+def build_meta():
+    """
+    產生前端顯示用的對照表（牌名、含義等）
+
+    Returns:
+        dict: 各種數字對應的文字
+    """
+    return {
+        'version': SHARD_VERSION,
+        'fields': list(SHARD_FIELDS),
+        'zodiac_names': list(ZODIAC_NAMES),
+        'life_number_meanings': {n: get_life_number_meaning(n) for n in range(1, 10)},
+        'year_number_meanings': {n: get_year_number_meaning(n) for n in range(1, 10)},
+        'tarot_cards': {n: list(get_tarot_card(n)) for n in range(0, 23)},
+        'ziwei_meanings': {n: get_ziwei_meaning(n) for n in range(1, 10)},
+        'connection_meanings': {
+            type_name: {n: get_connection_number_meaning(n, type_name) for n in range(1, 10)}
+            for type_name in ("先天數", "生命數", "天賦數")
+        },
+        'zodiac_meanings': {n: get_zodiac_meaning(n) for n in range(1, 10)},
+    }
+
+
+def write_json(path, payload, plain=True):
+    """
+    寫出精簡的 JSON 與固定時間戳記的 gzip 版本（重複建置時內容相同）
+
+    Returns:
+        int: gzip 檔案的位元組數
+    """
+    data = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if plain:
+        with open(path, 'wb') as f:
+            f.write(data)
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    with open(path + '.gz', 'wb') as f:
+        f.write(compressed)
+    return len(compressed)
+
+
+def iter_periods(start_year, end_year, granularity):
+    """
+    依分片粒度列出 (分片名稱, 起始日期, 結束日期)
+    """
+    for year in range(start_year, end_year + 1):
+        if granularity == 'year':
+            yield f"{year:04d}", date(year, 1, 1), date(year, 12, 31)
+            continue
+        for month in range(1, 13):
+            last = calendar.monthrange(year, month)[1]
+            yield f"{year:04d}{month:02d}", date(year, month, 1), date(year, month, last)
+
+
+def build_shards(output, start_year, end_year, granularity='year', plain=True):
+    """
+    產生全部分片、對照表與索引檔
+
+    Args:
+        output (str): 輸出資料夾
+        start_year (int): 起始年份
+        end_year (int): 結束年份（含）
+        granularity (str): 'year' 或 'month'
+        plain (bool): 是否同時輸出未壓縮的 JSON
+
+    Returns:
+        dict: 索引檔內容
+    """
+    os.makedirs(output, exist_ok=True)
+    shards = {}
+    for name, first_day, last_day in iter_periods(start_year, end_year, granularity):
+        payload = {
+            'version': SHARD_VERSION,
+            'start': f"{first_day.year:04d}{first_day.month:02d}{first_day.day:02d}",
+            'days': (last_day - first_day).days + 1,
+            'rows': build_rows(first_day, last_day),
+        }
+        shards[name] = write_json(os.path.join(output, f"{name}.json"), payload, plain)
+
+    write_json(os.path.join(output, 'meta.json'), build_meta(), plain)
+    index = {
+        'version': SHARD_VERSION,
+        'granularity': granularity,
+        'start_year': start_year,
+        'end_year': end_year,
+        'fields': list(SHARD_FIELDS),
+        'shards': shards,
+    }
+    write_json(os.path.join(output, 'index.json'), index, plain)
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="產生前端使用的靜態 JSON 分片")
+    parser.add_argument('--start-year', type=int, default=1900, help="起始年份")
+    parser.add_argument('--end-year', type=int, default=2100, help="結束年份（含）")
+    parser.add_argument('--granularity', choices=('year', 'month'), default='year', help="分片粒度")
+    parser.add_argument('--output', default=os.path.join('public', 'data'), help="輸出資料夾")
+    parser.add_argument('--gzip-only', action='store_true', help="只輸出 .json.gz")
+    args = parser.parse_args(argv)
+
+    if not 1 <= args.start_year <= args.end_year <= 9999:
+        parser.error("請輸入有效的年份區間！")
+    index = build_shards(args.output, args.start_year, args.end_year, args.granularity,
+                         plain=not args.gzip_only)
+    total = sum(index['shards'].values())
+    print(f"已產生 {len(index['shards'])} 個分片，壓縮後共 {total} 位元組")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+生命靈數常駐服務的精簡用戶端
+
+只使用標準函式庫的 socket，不載入計算模組與 tkinter，
+將查詢轉送給 calculator_daemon.py 並印出回應。
+
+用法：
+    python calculator_client.py 19900101
+    python calculator_client.py 19900101 2026 life_number,zodiac_name
+    cut -d, -f2 members.csv | python calculator_client.py
+
+每一行查詢的格式為「生日 [目標年份] [欄位,欄位,...]」，每一行回應為一個 JSON 物件。
+"""
+import argparse
+import os
+import socket
+import sys
+import threading
+
+
+def default_socket_path():
+    """
+    目前使用者的預設 socket 路徑
+
+    依序使用 LIFE_NUMBER_SOCKET、$XDG_RUNTIME_DIR，最後是 ~/.cache；
+    不放在所有人都能寫入的暫存資料夾，避免被其他使用者搶先建立或冒用。
+    """
+    if os.environ.get('LIFE_NUMBER_SOCKET'):
+        return os.environ['LIFE_NUMBER_SOCKET']
+    directory = os.environ.get('XDG_RUNTIME_DIR') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(directory, 'life_number_calculator.sock')
+
+
+DEFAULT_SOCKET = default_socket_path()
+
+
+def _send_lines(sock, lines):
+    """送出所有查詢後關閉寫入端，讓服務端知道查詢已結束"""
+    try:
+        for line in lines:
+            line = line.strip()
+            if line:
+                sock.sendall(line.encode('utf-8') + b'\n')
+    finally:
+        sock.shutdown(socket.SHUT_WR)
+
+
+def query_daemon(lines, socket_path=DEFAULT_SOCKET):
+    """
+    以單一連線將查詢逐行送給常駐服務，並依序取回回應
+
+    查詢在背景執行緒中持續送出，不必等待上一個回應。
+
+    Args:
+        lines (iterable): 查詢字串
+        socket_path (str): Unix socket 路徑
+
+    Yields:
+        str: 每個查詢的 JSON 回應（不含換行）
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        writer = threading.Thread(target=_send_lines, args=(sock, lines), daemon=True)
+        writer.start()
+        with sock.makefile('rb') as reader:
+            for response in reader:
+                yield response.decode('utf-8').rstrip('\n')
+        writer.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="查詢生命靈數常駐服務")
+    parser.add_argument('query', nargs='*', help="生日 [目標年份] [欄位,...]；省略時從標準輸入逐行讀取")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help="Unix socket 路徑")
+    args = parser.parse_args(argv)
+
+    lines = [' '.join(args.query)] if args.query else sys.stdin
+    try:
+        for response in query_daemon(lines, args.socket):
+            sys.stdout.write(response + '\n')
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"無法連線到常駐服務：{args.socket}（請先執行 calculator_daemon.py）", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
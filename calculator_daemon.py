@@ -0,0 +1,163 @@
+"""
+生命靈數常駐服務
+
+在背景常駐並保持計算模組與查表已載入，透過 Unix domain socket 以逐行文字協定提供查詢，
+讓 shell 管線與排程工作不必每次都重新啟動直譯器與載入 tkinter。
+
+協定：
+    每一行查詢為「生日 [目標年份] [欄位,欄位,...]」，例如 `19900101 2026 life_number,zodiac_name`。
+    生日可為 YYYYMMDD、YYYY-MM-DD 或 YYYY/MM/DD；目標年份預設為今年；欄位預設為全部。
+    每一行查詢對應一行 JSON 回應，無效的查詢回傳 {"error": 原因代碼, "input": 原始查詢}。
+    `PING` 回應 `{"pong": true}`。
+
+用法：
+    python calculator_daemon.py
+    python calculator_daemon.py --socket "$XDG_RUNTIME_DIR/life_number_calculator.sock"
+
+預設的 socket 路徑見 calculator_client.default_socket_path。
+"""
+from datetime import datetime
+from functools import lru_cache
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+
+from calculator_client import DEFAULT_SOCKET
+from life_number_calculator import normalize_date, normalize_year, format_birthdate, compute_profile
+
+
+@lru_cache(maxsize=65536)
+def _profile_json(birthdate, year, fields):
+    """計算並快取單一生日的 JSON 回應"""
+    return json.dumps(compute_profile(birthdate, fields, year), ensure_ascii=False, separators=(',', ':'))
+
+
+def answer_query(line):
+    """
+    處理一行查詢
+
+    Args:
+        line (str): 「生日 [目標年份] [欄位,...]」
+
+    Returns:
+        str: JSON 回應（不含換行）
+    """
+    parts = line.split()
+    if not parts:
+        return json.dumps({'error': 'empty', 'input': line})
+    if parts[0].upper() == 'PING':
+        return '{"pong":true}'
+
+    date, reason = normalize_date(parts[0])
+    if reason is not None:
+        return json.dumps({'error': reason, 'input': line}, ensure_ascii=False)
+    year = datetime.now().year
+    if len(parts) > 1:
+        year, reason = normalize_year(parts[1])
+        if reason is not None:
+            return json.dumps({'error': reason, 'input': line}, ensure_ascii=False)
+    fields = tuple(parts[2].split(',')) if len(parts) > 2 else None
+    try:
+        return _profile_json(format_birthdate(date), year, fields)
+    except ValueError:
+        return json.dumps({'error': 'field', 'input': line}, ensure_ascii=False)
+
+
+class CalculatorRequestHandler(socketserver.StreamRequestHandler):
+    """每個連線可連續送出多行查詢，依序逐行回應"""
+
+    def handle(self):
+        for raw in self.rfile:
+            response = answer_query(raw.decode('utf-8', errors='replace').strip())
+            self.wfile.write(response.encode('utf-8') + b'\n')
+
+
+class CalculatorDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def remove_stale_socket(socket_path):
+    """
+    刪除先前沒有正常結束而留下的 socket 檔
+
+    只刪除已經沒有服務在監聽的 socket；路徑上是一般檔案或仍有服務在執行時拒絕啟動。
+
+    Args:
+        socket_path (str): Unix socket 路徑
+
+    Raises:
+        ValueError: 路徑不是 socket，或已有服務在使用
+    """
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise ValueError(f"{socket_path} 已存在且不是 socket，請改用其他路徑")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except ConnectionRefusedError:
+            os.unlink(socket_path)
+            return
+        except FileNotFoundError:
+            return
+    raise ValueError(f"已有常駐服務在 {socket_path} 執行")
+
+
+def serve(socket_path=DEFAULT_SOCKET):
+    """
+    啟動常駐服務，直到收到 SIGINT 或 SIGTERM
+
+    Args:
+        socket_path (str): Unix socket 路徑
+
+    Raises:
+        ValueError: 路徑已被其他檔案或服務佔用
+    """
+    # 先計算一次，讓計算計畫在第一個查詢之前就準備好
+    answer_query('20000101')
+    remove_stale_socket(socket_path)
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    # 只允許目前的使用者連線
+    old_umask = os.umask(0o077)
+    try:
+        server = CalculatorDaemon(socket_path, CalculatorRequestHandler)
+    finally:
+        os.umask(old_umask)
+    inode = os.lstat(socket_path).st_ino
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"常駐服務已啟動：{socket_path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.server_close()
+        # 只刪除自己建立的 socket，路徑已被換成其他檔案時保留
+        try:
+            if os.lstat(socket_path).st_ino == inode:
+                os.unlink(socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生命靈數常駐服務")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help="Unix socket 路徑")
+    args = parser.parse_args(argv)
+    try:
+        serve(args.socket)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+族群分布統計
+
+以串流方式讀取生日（檔案或日期區間），先依生日累計人數，
+每個不同的生日只計算一次，再以人數加權累加到各個統計表：
+
+- 生命靈數分布
+- 生命靈數 × 星座 交叉表
+- 陰影塔羅分布
+- 九宮格連線出現次數
+
+用法：
+    python cohort_stats.py --input births.csv --column 2 --format csv
+    python cohort_stats.py --range 19000101 19991231 --format json
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+import argparse
+import csv
+import json
+import sys
+
+from life_number_calculator import validate_date, normalize_date, format_birthdate, compute_profile
+
+# 統計所需的欄位
+COHORT_FIELDS = ('life_number', 'zodiac_name', 'shadow_tarot', 'grid_analysis')
+
+
+def count_birthdates_in_file(lines, column=None, delimiter=','):
+    """
+    串流累計檔案中每個生日出現的次數
+
+    生日可為 YYYYMMDD、YYYY-MM-DD 或 YYYY/MM/DD，每個不同的有效字串只正規化一次；
+    無效的資料只依原因累計筆數，不論有多少種不同的髒資料，記憶體用量都不會增加。
+
+    Args:
+        lines (iterable): 檔案的每一行
+        column (int): 生日所在的欄位（從 0 開始），None 表示整行都是生日
+        delimiter (str): 欄位分隔字元
+
+    Returns:
+        tuple: (Counter 生日次數, Counter 無效原因代碼 -> 筆數)
+    """
+    counts = Counter()
+    rejects = Counter()
+    # 只記住有效的原始字串（數量受日期範圍限制）；無效的字串直接累計原因，不保留原文
+    valid = {}
+    rows = csv.reader(lines, delimiter=delimiter) if column is not None else ([line] for line in lines)
+    for row in rows:
+        if column is not None and column >= len(row):
+            value = ''
+        else:
+            value = row[0 if column is None else column].strip()
+            if not value:
+                continue
+        key = valid.get(value)
+        if key is None:
+            date, reason = normalize_date(value)
+            if reason is not None:
+                rejects[reason] += 1
+                continue
+            key = valid[value] = format_birthdate(date)
+        counts[key] += 1
+    return counts, rejects
+
+
+def count_birthdates_in_range(start, end):
+    """
+    產生日期區間內每天各一次的生日計數
+
+    Args:
+        start (str): 起始日期 'YYYYMMDD'（含）
+        end (str): 結束日期 'YYYYMMDD'（含）
+
+    Returns:
+        Counter: 生日次數
+    """
+    first = datetime.strptime(start, '%Y%m%d').date()
+    last = datetime.strptime(end, '%Y%m%d').date()
+    counts = Counter()
+    for offset in range((last - first).days + 1):
+        current = first + timedelta(days=offset)
+        counts[f"{current.year:04d}{current.month:02d}{current.day:02d}"] = 1
+    return counts
+
+
+def aggregate_cohort(counts, rejects=None):
+    """
+    依生日計數累加各項統計表
+
+    Args:
+        counts (Counter): 生日 -> 人數
+        rejects (Counter): 無效原因代碼 -> 筆數
+
+    Returns:
+        dict: 各統計表
+    """
+    life_numbers = Counter()
+    life_by_zodiac = Counter()
+    shadow_tarots = Counter()
+    grid_lines = Counter()
+
+    for birthdate, count in counts.items():
+        profile = compute_profile(birthdate, COHORT_FIELDS)
+        life_number = profile['life_number']
+        life_numbers[life_number] += count
+        life_by_zodiac[(life_number, profile['zodiac_name'])] += count
+        shadow_tarots[profile['shadow_tarot']] += count
+        _, _, connections = profile['grid_analysis']
+        for connection in connections:
+            # 連線說明的格式為「思想-意志-智慧連線：...」
+            grid_lines[connection.split('：')[0]] += count
+
+    cross_tab = {}
+    for (life_number, zodiac_name), count in sorted(life_by_zodiac.items()):
+        cross_tab.setdefault(str(life_number), {})[zodiac_name] = count
+
+    return {
+        'total': sum(counts.values()),
+        'invalid': sum(rejects.values()) if rejects else 0,
+        'rejects': dict(sorted(rejects.items())) if rejects else {},
+        'distinct_dates': len(counts),
+        'life_number': {str(k): v for k, v in sorted(life_numbers.items())},
+        'life_number_x_zodiac': cross_tab,
+        'shadow_tarot': {str(k): v for k, v in sorted(shadow_tarots.items())},
+        'grid_lines': dict(sorted(grid_lines.items())),
+    }
+
+
+def write_json(stats, out):
+    """以 JSON 輸出統計結果"""
+    json.dump(stats, out, ensure_ascii=False, indent=2)
+    out.write('\n')
+
+
+def write_csv(stats, out):
+    """
+    以長格式 CSV 輸出統計結果
+
+    每列為 table,row,column,count；一維的統計表 column 欄為空白。
+    """
+    writer = csv.writer(out)
+    writer.writerow(['table', 'row', 'column', 'count'])
+    for key in ('total', 'invalid', 'distinct_dates'):
+        writer.writerow(['summary', key, '', stats[key]])
+    for reason, count in stats['rejects'].items():
+        writer.writerow(['rejects', reason, '', count])
+    for table in ('life_number', 'shadow_tarot', 'grid_lines'):
+        for row, count in stats[table].items():
+            writer.writerow([table, row, '', count])
+    for row, columns in stats['life_number_x_zodiac'].items():
+        for column, count in columns.items():
+            writer.writerow(['life_number_x_zodiac', row, column, count])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生命靈數族群分布統計")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--input', help="生日檔案，'-' 表示標準輸入")
+    source.add_argument('--range', nargs=2, metavar=('START', 'END'), help="日期區間 YYYYMMDD YYYYMMDD")
+    parser.add_argument('--column', type=int, help="CSV 中生日所在的欄位（從 0 開始）")
+    parser.add_argument('--delimiter', default=',', help="CSV 分隔字元")
+    parser.add_argument('--format', choices=('json', 'csv'), default='json', help="輸出格式")
+    parser.add_argument('--output', help="輸出檔案，預設為標準輸出")
+    args = parser.parse_args(argv)
+
+    if args.range:
+        start, end = args.range
+        if not (validate_date(start) and validate_date(end)):
+            parser.error("請輸入有效的日期區間！")
+        counts, rejects = count_birthdates_in_range(start, end), None
+    elif args.input == '-':
+        counts, rejects = count_birthdates_in_file(sys.stdin, args.column, args.delimiter)
+    else:
+        with open(args.input, encoding='utf-8', newline='') as f:
+            counts, rejects = count_birthdates_in_file(f, args.column, args.delimiter)
+
+    stats = aggregate_cohort(counts, rejects)
+    writer = write_json if args.format == 'json' else write_csv
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='') as out:
+            writer(stats, out)
+    else:
+        writer(stats, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
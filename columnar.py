@@ -0,0 +1,207 @@
+"""
+批次結果的欄式二進位格式
+
+每個欄位一段連續、固定寬度的小端序陣列，分析工作可以直接 mmap 整個檔案，
+或以 numpy.frombuffer / numpy.memmap 依標頭中的 dtype 與位移一次載入，不需要解析文字。
+格式說明請見 README.md 的「欄式二進位格式」一節。
+"""
+from array import array
+import json
+import mmap
+import struct
+import sys
+
+COLUMNAR_MAGIC = b'LNCCOL01'
+COLUMNAR_VERSION = 1
+ALIGNMENT = 64
+
+# 每個數字欄位都以一個位元組儲存（值域皆在 0-255 之間）
+BYTE_FIELDS = (
+    'life_number', 'year_number',
+    'life_tarot', 'soul_tarot', 'year_tarot', 'talent_tarot', 'innate_tarot',
+    'acquired_tarot', 'personality_tarot', 'shadow_tarot',
+    'ziwei_main', 'ziwei_sub', 'ziwei_destiny',
+    'connection_innate', 'connection_life', 'connection_talent',
+    'zodiac_number',
+    # 跨年時以這兩個數字和重算流年數與流年塔羅（見 year_rollover.py）
+    'month_day_sum', 'digit_sum',
+)
+
+# grid_counts 拆成九個欄位：數字 1-9 在生日中出現的次數
+GRID_COLUMNS = tuple(f"grid_{digit}" for digit in range(1, 10))
+
+# 欄位型別 -> (numpy dtype 字串, array typecode)
+_TYPES = {
+    'u1': ('|u1', 'B'),
+    'u4': ('<u4', 'I'),
+    'u8': ('<u8', 'Q'),
+}
+
+
+def _typed_array(kind, values=()):
+    """建立指定寬度的 array（依平台選擇對應的 typecode）"""
+    typecode = _TYPES[kind][1]
+    if kind == 'u4' and array('I').itemsize != 4:
+        typecode = 'L'
+    if kind == 'u8' and array('Q').itemsize != 8:
+        raise ValueError("本機不支援 8 位元組的整數陣列")
+    return array(typecode, values)
+
+
+def build_columns(ids, birthdates, profiles, fields):
+    """
+    將一批計算結果轉為欄式陣列
+
+    只有 BYTE_FIELDS 與 grid_counts 會寫入；zodiac_name 等文字欄位可由數字查表取得。
+
+    Args:
+        ids (list): 資料編號
+        birthdates (list): 'YYYYMMDD' 生日
+        profiles (list): compute_profile 的結果
+        fields (tuple): profiles 中包含的欄位
+
+    Returns:
+        list: [(欄位名稱, 型別, array 或 bytes), ...]，依寫入順序排列
+    """
+    columns = [('birthdate', 'u4', _typed_array('u4', map(int, birthdates)))]
+    for field in BYTE_FIELDS:
+        if field in fields:
+            columns.append((field, 'u1', _typed_array('u1', [profile[field] for profile in profiles])))
+    if 'grid_counts' in fields:
+        for position, name in enumerate(GRID_COLUMNS):
+            columns.append((name, 'u1', _typed_array('u1', [profile['grid_counts'][position] for profile in profiles])))
+
+    # 編號為不定長度的字串，以 CSR 格式存成位移與 UTF-8 位元組
+    encoded = [str(record_id).encode('utf-8') for record_id in ids]
+    offsets = _typed_array('u8', [0])
+    total = 0
+    for value in encoded:
+        total += len(value)
+        offsets.append(total)
+    columns.append(('id_offsets', 'u8', offsets))
+    columns.append(('ids', 'u1', b''.join(encoded)))
+    return columns
+
+
+def _as_bytes(values):
+    """轉為小端序的原始位元組"""
+    if isinstance(values, (bytes, bytearray)):
+        return bytes(values)
+    if sys.byteorder != 'little' and values.itemsize > 1:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_columnar(f, ids, birthdates, profiles, fields):
+    """
+    寫出一個欄式檔案
+
+    Args:
+        f: 以二進位模式開啟的檔案
+        ids (list): 資料編號
+        birthdates (list): 'YYYYMMDD' 生日
+        profiles (list): compute_profile 的結果
+        fields (tuple): profiles 中包含的欄位
+    """
+    write_columns(f, len(birthdates), build_columns(ids, birthdates, profiles, fields))
+
+
+def write_columns(f, rows, columns):
+    """
+    將已經建好的欄位寫成欄式檔案
+
+    Args:
+        f: 以二進位模式開啟的檔案
+        rows (int): 資料筆數
+        columns (list): [(欄位名稱, 型別, array、bytes 或 memoryview), ...]，型別為 _TYPES 的名稱
+    """
+    columns = [(name, kind, _as_bytes(values)) for name, kind, values in columns]
+
+    # 標頭長度會影響各欄位的位移，先以佔位值估算，再補齊到對齊邊界
+    descriptors = [{'name': name, 'dtype': _TYPES[kind][0], 'offset': 0, 'nbytes': len(data)}
+                   for name, kind, data in columns]
+    header = {'version': COLUMNAR_VERSION, 'rows': rows, 'columns': descriptors}
+    placeholder = len(json.dumps(header).encode('utf-8')) + 32 * len(descriptors)
+    data_start = _align(len(COLUMNAR_MAGIC) + 8 + placeholder)
+    position = data_start
+    for descriptor in descriptors:
+        descriptor['offset'] = position
+        position = _align(position + descriptor['nbytes'])
+
+    encoded = json.dumps(header).encode('utf-8')
+    if len(COLUMNAR_MAGIC) + 8 + len(encoded) > data_start:
+        raise ValueError("欄式檔案標頭超出預留空間")
+    encoded += b' ' * (data_start - len(COLUMNAR_MAGIC) - 8 - len(encoded))
+    f.write(COLUMNAR_MAGIC)
+    f.write(struct.pack('<Q', len(encoded)))
+    f.write(encoded)
+    written = data_start
+    for descriptor, (name, kind, data) in zip(descriptors, columns):
+        f.write(b'\0' * (descriptor['offset'] - written))
+        f.write(data)
+        written = descriptor['offset'] + len(data)
+
+
+def _align(position):
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def read_columnar_header(buffer):
+    """
+    解析欄式檔案的標頭
+
+    Args:
+        buffer: 整個檔案的位元組（bytes 或 mmap）
+
+    Returns:
+        dict: 標頭內容
+    """
+    if bytes(buffer[:len(COLUMNAR_MAGIC)]) != COLUMNAR_MAGIC:
+        raise ValueError("不是欄式結果檔")
+    start = len(COLUMNAR_MAGIC)
+    length, = struct.unpack('<Q', buffer[start:start + 8])
+    header = json.loads(bytes(buffer[start + 8:start + 8 + length]).decode('utf-8'))
+    if header['version'] != COLUMNAR_VERSION:
+        raise ValueError(f"不支援的欄式格式版本：{header['version']}")
+    return header
+
+
+class ColumnarFile:
+    """
+    以 mmap 開啟的欄式檔案
+
+    columns[name] 為直接指向檔案內容的 memoryview，不會複製資料。
+    """
+
+    def __init__(self, path):
+        if sys.byteorder != 'little':
+            raise ValueError("欄式檔案為小端序，請在小端序的平台上以 mmap 讀取")
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.header = read_columnar_header(self._mmap)
+        self.rows = self.header['rows']
+        self._view = view = memoryview(self._mmap)
+        self.columns = {}
+        for descriptor in self.header['columns']:
+            kind = descriptor['dtype'][1:]
+            data = view[descriptor['offset']:descriptor['offset'] + descriptor['nbytes']]
+            self.columns[descriptor['name']] = data.cast(_typed_array(kind).typecode)
+
+    def ids(self):
+        """將編號欄位解碼為字串串列"""
+        offsets, blob = self.columns['id_offsets'], self.columns['ids']
+        return [bytes(blob[offsets[i]:offsets[i + 1]]).decode('utf-8') for i in range(self.rows)]
+
+    def close(self):
+        for column in self.columns.values():
+            column.release()
+        self.columns = {}
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
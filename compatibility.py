@@ -0,0 +1,247 @@
+"""
+一對多配對引擎
+
+將候選人的生日預先計算成欄式儲存（每個欄位一個 bytearray），
+查詢時只需依照查詢者的數字建立查表，以 map 批次計分，
+再取出分數最高的前 k 名候選人。
+"""
+from array import array
+from collections import defaultdict
+from operator import add
+import heapq
+import json
+
+from life_number_calculator import validate_date, compute_profile
+
+# 參與配對的欄位（皆為只由生日決定的數字，值域都在 0-255 之間）
+COMPATIBILITY_FIELDS = (
+    'life_number',
+    'ziwei_main', 'ziwei_sub', 'ziwei_destiny',
+    'connection_innate', 'connection_life', 'connection_talent',
+    'zodiac_number',
+    'life_tarot', 'soul_tarot', 'talent_tarot', 'innate_tarot',
+    'acquired_tarot', 'personality_tarot', 'shadow_tarot',
+)
+
+# 預設權重：數字相同即得到該欄位的權重分數
+DEFAULT_WEIGHTS = {
+    'life_number': 3.0,
+    'ziwei_main': 1.0,
+    'ziwei_sub': 1.0,
+    'ziwei_destiny': 2.0,
+    'connection_innate': 1.0,
+    'connection_life': 1.0,
+    'connection_talent': 1.0,
+    'zodiac_number': 2.0,
+    'life_tarot': 1.0,
+    'soul_tarot': 1.0,
+    'talent_tarot': 1.0,
+    'innate_tarot': 1.0,
+    'acquired_tarot': 1.0,
+    'personality_tarot': 1.0,
+    'shadow_tarot': 1.0,
+}
+
+STORE_MAGIC = b'LNCSTORE1\n'
+
+
+def calculate_compatibility_features(birthdate):
+    """
+    計算配對所需的全部數字
+
+    Args:
+        birthdate (str): 出生日期，格式為 'YYYYMMDD'
+
+    Returns:
+        dict: 欄位名稱對應的數字
+    """
+    return compute_profile(birthdate, COMPATIBILITY_FIELDS)
+
+
+def _resolve_weights(weights):
+    """合併使用者權重與預設權重，並檢查欄位名稱"""
+    resolved = dict(DEFAULT_WEIGHTS)
+    if weights:
+        for field, weight in weights.items():
+            if field not in resolved:
+                raise ValueError(f"未知的配對欄位：{field}")
+            resolved[field] = float(weight)
+    return resolved
+
+
+class CandidateStore:
+    """
+    候選人欄式儲存
+
+    同一天生日的候選人數字完全相同，因此只為每個不同的生日存一列，
+    再以 offsets/ids（CSR 格式）記錄每個生日底下的候選人。
+    一百年內只有約三萬六千個不同生日，百萬候選人的計分量因此大幅下降。
+    """
+
+    def __init__(self, dates, columns, offsets, ids, skipped=0):
+        self.dates = dates            # 不重複的生日，已排序
+        self.columns = columns        # 欄位名稱 -> bytearray（每個生日一格）
+        self.offsets = offsets        # array('q')，長度為生日數 + 1
+        self.ids = ids                # 依生日排列的候選人編號
+        self.skipped = skipped        # 建立時略過的無效生日筆數
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, candidates):
+        """
+        由 (候選人編號, 生日) 建立欄式儲存
+
+        Args:
+            candidates (iterable): (candidate_id, 'YYYYMMDD') 序列
+
+        Returns:
+            CandidateStore: 預先計算好的候選人儲存
+        """
+        groups = defaultdict(list)
+        for candidate_id, birthdate in candidates:
+            groups[birthdate].append(candidate_id)
+
+        dates = []
+        columns = {field: bytearray() for field in COMPATIBILITY_FIELDS}
+        offsets = array('q', [0])
+        ids = []
+        skipped = 0
+        for birthdate in sorted(groups):
+            members = groups[birthdate]
+            if not validate_date(birthdate):
+                skipped += len(members)
+                continue
+            features = calculate_compatibility_features(birthdate)
+            for field in COMPATIBILITY_FIELDS:
+                columns[field].append(features[field])
+            dates.append(birthdate)
+            ids.extend(members)
+            offsets.append(len(ids))
+        return cls(dates, columns, offsets, ids, skipped)
+
+    def score_dates(self, birthdate, weights=None):
+        """
+        為每個不同的生日計算與查詢者的配對分數
+
+        Args:
+            birthdate (str): 查詢者的出生日期
+            weights (dict): 欄位權重，未指定的欄位使用預設值
+
+        Returns:
+            list: 與 self.dates 對齊的分數
+        """
+        query = calculate_compatibility_features(birthdate)
+        resolved = _resolve_weights(weights)
+        scores = [0.0] * len(self.dates)
+        for field in COMPATIBILITY_FIELDS:
+            weight = resolved[field]
+            if not weight:
+                continue
+            # 查表：只有與查詢者相同的數字得分
+            table = [0.0] * 256
+            table[query[field]] = weight
+            scores = list(map(add, scores, map(table.__getitem__, self.columns[field])))
+        return scores
+
+    def top_matches(self, birthdate, k=10, weights=None, exclude=()):
+        """
+        找出與查詢者最相配的前 k 名候選人
+
+        Args:
+            birthdate (str): 查詢者的出生日期，格式為 'YYYYMMDD'
+            k (int): 回傳的筆數
+            weights (dict): 欄位權重
+            exclude (iterable): 要排除的候選人編號（例如查詢者本人）
+
+        Returns:
+            list: [(候選人編號, 生日, 分數), ...]，分數由高到低
+        """
+        if not validate_date(birthdate):
+            raise ValueError(f"無效的日期：{birthdate}")
+        if k <= 0 or not self.dates:
+            return []
+        exclude = set(exclude)
+        scores = self.score_dates(birthdate, weights)
+        # 每個生日至少有一位候選人，取 k + 排除數 個生日一定足夠
+        wanted = min(len(scores), k + len(exclude))
+        best = heapq.nlargest(wanted, range(len(scores)), key=scores.__getitem__)
+
+        results = []
+        for index in best:
+            for position in range(self.offsets[index], self.offsets[index + 1]):
+                candidate_id = self.ids[position]
+                if candidate_id in exclude:
+                    continue
+                results.append((candidate_id, self.dates[index], scores[index]))
+                if len(results) == k:
+                    return results
+        return results
+
+    def save(self, path):
+        """
+        將欄式儲存寫入檔案
+
+        檔案格式：魔術字串、一行 JSON 標頭，接著依序為 offsets 與各欄位的原始位元組。
+        """
+        header = {
+            'fields': list(COMPATIBILITY_FIELDS),
+            'dates': self.dates,
+            'ids': self.ids,
+            'skipped': self.skipped,
+            'offset_itemsize': self.offsets.itemsize,
+        }
+        with open(path, 'wb') as f:
+            f.write(STORE_MAGIC)
+            f.write(json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n')
+            self.offsets.tofile(f)
+            for field in COMPATIBILITY_FIELDS:
+                f.write(self.columns[field])
+
+    @classmethod
+    def load(cls, path):
+        """
+        讀取 save() 寫出的欄式儲存
+
+        Args:
+            path (str): 檔案路徑
+
+        Returns:
+            CandidateStore: 候選人儲存
+
+        Raises:
+            ValueError: 不是候選人儲存檔，或檔案的欄位與整數格式與目前版本不符
+        """
+        with open(path, 'rb') as f:
+            if f.readline() != STORE_MAGIC:
+                raise ValueError(f"不是候選人儲存檔：{path}")
+            header = json.loads(f.readline().decode('utf-8'))
+            if header.get('fields') != list(COMPATIBILITY_FIELDS):
+                raise ValueError("候選人儲存檔的配對欄位與目前版本不符，請重新建立")
+            count = len(header['dates'])
+            offsets = array('q')
+            if offsets.itemsize != header['offset_itemsize']:
+                raise ValueError("候選人儲存檔的整數格式與本機不符")
+            offsets.fromfile(f, count + 1)
+            columns = {}
+            for field in header['fields']:
+                columns[field] = bytearray(f.read(count))
+        return cls(header['dates'], columns, offsets, header['ids'], header['skipped'])
+
+
+def find_compatible_matches(store, birthdate, k=10, weights=None, exclude=()):
+    """
+    以預先計算的候選人儲存進行一對多配對
+
+    Args:
+        store (CandidateStore): 候選人儲存
+        birthdate (str): 查詢者的出生日期
+        k (int): 回傳的筆數
+        weights (dict): 欄位權重
+        exclude (iterable): 要排除的候選人編號
+
+    Returns:
+        list: [(候選人編號, 生日, 分數), ...]
+    """
+    return store.top_matches(birthdate, k=k, weights=weights, exclude=exclude)
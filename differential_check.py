@@ -0,0 +1,271 @@
+"""
+加速引擎的差異比對工具
+
+逐日比對 0001-01-01 到 9999-12-31 的每一個有效日期，確認加速引擎的結果與
+life_number_calculator 中原本的 calculate_* 參考函式完全相同，並列出最早出現的差異。
+
+內建引擎：
+    registry  compute_profile（共用中間值的計算器登錄）
+    shards    build_shards 產生的靜態分片資料列
+
+也可以用 `模組:函式` 指定其他引擎，函式簽名為 engine(birthdates, year)，
+回傳與 birthdates 對齊的 dict 序列（只需包含引擎支援的欄位）。
+
+用法：
+    python differential_check.py --engine registry
+    python differential_check.py --engine shards --start 19000101 --end 21001231 --workers 8
+    python differential_check.py --engine my_engine:batch_profiles --year 2030
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from importlib import import_module
+from itertools import islice
+import argparse
+import sys
+
+from life_number_calculator import (
+    normalize_date,
+    compute_profile,
+    calculate_life_number,
+    calculate_year_number,
+    calculate_life_tarot,
+    calculate_soul_tarot,
+    calculate_year_tarot,
+    calculate_talent_tarot,
+    calculate_innate_tarot,
+    calculate_acquired_tarot,
+    calculate_personality_tarot,
+    calculate_shadow_tarot,
+    calculate_ziwei_number,
+    calculate_connection_numbers,
+    calculate_zodiac_number,
+    calculate_life_grid,
+    reduce_number,
+)
+
+# 比對的欄位（與 CALCULATORS 的名稱一致）
+CHECK_FIELDS = (
+    'life_number', 'year_number',
+    'life_tarot', 'soul_tarot', 'year_tarot', 'talent_tarot', 'innate_tarot',
+    'acquired_tarot', 'personality_tarot', 'shadow_tarot',
+    'ziwei_main', 'ziwei_sub', 'ziwei_destiny',
+    'connection_innate', 'connection_life', 'connection_talent',
+    'zodiac_number', 'zodiac_name',
+    'life_grid', 'grid_counts',
+)
+
+# 九宮格各位置的名稱，依數字 1-9 排列
+GRID_NAMES = tuple(calculate_life_grid(''))
+
+# 引擎結果缺少某個比對欄位時，在差異中代替引擎結果
+MISSING = '（缺少）'
+
+
+def reference_profile(birthdate, year):
+    """
+    以原本的 calculate_* 函式計算全部比對欄位
+
+    Args:
+        birthdate (str): 出生日期，格式為 'YYYYMMDD'
+        year (int): 流年欄位使用的目標年份
+
+    Returns:
+        dict: 欄位名稱 -> 參考結果
+    """
+    main_number, sub_number, destiny_number = calculate_ziwei_number(birthdate)
+    innate, life, talent = calculate_connection_numbers(birthdate)
+    zodiac_number, zodiac_name = calculate_zodiac_number(birthdate)
+    grid = calculate_life_grid(birthdate)
+    return {
+        'life_number': calculate_life_number(birthdate),
+        'year_number': calculate_year_number(birthdate, year),
+        'life_tarot': calculate_life_tarot(birthdate),
+        'soul_tarot': calculate_soul_tarot(birthdate),
+        'year_tarot': calculate_year_tarot(birthdate, year),
+        'talent_tarot': calculate_talent_tarot(birthdate),
+        'innate_tarot': calculate_innate_tarot(birthdate),
+        'acquired_tarot': calculate_acquired_tarot(birthdate),
+        'personality_tarot': calculate_personality_tarot(birthdate),
+        'shadow_tarot': calculate_shadow_tarot(birthdate),
+        'ziwei_main': main_number,
+        'ziwei_sub': sub_number,
+        'ziwei_destiny': destiny_number,
+        'connection_innate': innate,
+        'connection_life': life,
+        'connection_talent': talent,
+        'zodiac_number': zodiac_number,
+        'zodiac_name': zodiac_name,
+        'life_grid': grid,
+        'grid_counts': tuple(len(numbers) for numbers in grid.values()),
+    }
+
+
+def registry_engine(birthdates, year):
+    """compute_profile 引擎"""
+    return [compute_profile(birthdate, CHECK_FIELDS, year) for birthdate in birthdates]
+
+
+def shards_engine(birthdates, year):
+    """
+    靜態分片引擎：以 build_rows 產生資料列，依 README 的公式計算流年欄位，並由 grid_counts 還原九宮格
+
+    birthdates 必須是連續的日期。
+    """
+    from build_shards import SHARD_FIELDS, ZODIAC_NAMES, build_rows
+
+    year_digit_sum = sum(int(d) for d in str(year))
+    first = normalize_date(birthdates[0])[0]
+    last = normalize_date(birthdates[-1])[0]
+    rows = build_rows(date(first // 10000, first // 100 % 100, first % 100),
+                      date(last // 10000, last // 100 % 100, last % 100))
+    profiles = []
+    for row in rows:
+        profile = dict(zip(SHARD_FIELDS, row))
+        profile['zodiac_name'] = ZODIAC_NAMES[profile['zodiac_name']]
+        profile['grid_counts'] = tuple(profile['grid_counts'])
+        profile['life_grid'] = {name: [digit] * count for digit, (name, count)
+                                in enumerate(zip(GRID_NAMES, profile['grid_counts']), 1)}
+        profile['year_number'] = reduce_number(profile['month_day_sum'] + year_digit_sum, 9)
+        profile['year_tarot'] = reduce_number(profile['digit_sum'] + year_digit_sum, 22)
+        profiles.append(profile)
+    return profiles
+
+
+ENGINES = {
+    'registry': registry_engine,
+    'shards': shards_engine,
+}
+
+
+def load_engine(spec):
+    """
+    依名稱或 `模組:函式` 取得引擎
+
+    Args:
+        spec (str): 引擎名稱
+
+    Returns:
+        function: engine(birthdates, year)
+    """
+    if spec in ENGINES:
+        return ENGINES[spec]
+    if ':' not in spec:
+        raise ValueError(f"未知的引擎：{spec}")
+    module_name, function_name = spec.split(':', 1)
+    return getattr(import_module(module_name), function_name)
+
+
+def iter_date_ranges(start, end, days_per_task):
+    """將日期區間切成多個連續的小區間"""
+    current = start
+    while current <= end:
+        remaining = (end - current).days
+        stop = current + timedelta(days=min(days_per_task - 1, remaining))
+        yield current, stop
+        if stop == end:
+            break
+        current = stop + timedelta(days=1)
+
+
+def check_range(engine_spec, first_day, last_day, year, max_mismatches):
+    """
+    比對一個日期區間
+
+    Returns:
+        tuple: (比對的日期數, [(生日, 欄位, 參考結果, 引擎結果), ...])；
+        引擎少回傳欄位時引擎結果為 MISSING，回傳筆數不符時整個區間記為一筆欄位為「（筆數）」的差異
+    """
+    engine = load_engine(engine_spec)
+    birthdates = []
+    for offset in range((last_day - first_day).days + 1):
+        current = first_day + timedelta(days=offset)
+        birthdates.append(f"{current.year:04d}{current.month:02d}{current.day:02d}")
+
+    results = list(engine(birthdates, year))
+    if len(results) != len(birthdates):
+        # 筆數不符時無法判斷結果與日期如何對應，整個區間記為一筆差異
+        return len(birthdates), [(birthdates[0], '（筆數）', len(birthdates), len(results))]
+
+    mismatches = []
+    for birthdate, actual in zip(birthdates, results):
+        expected = reference_profile(birthdate, year)
+        for field in CHECK_FIELDS:
+            value = actual.get(field, MISSING)
+            if value != expected[field]:
+                mismatches.append((birthdate, field, expected[field], value))
+        if len(mismatches) >= max_mismatches:
+            break
+    return len(birthdates), mismatches
+
+
+def run_check(engine_spec, start, end, year, workers=None, max_mismatches=20, days_per_task=3653):
+    """
+    平行比對整個日期區間，依日期順序收集差異，收集到足夠的差異時提早結束
+
+    Args:
+        engine_spec (str): 引擎名稱或 `模組:函式`
+        start (date): 起始日期（含）
+        end (date): 結束日期（含）
+        year (int): 流年欄位使用的目標年份
+        workers (int): 行程數，預設為 CPU 數
+        max_mismatches (int): 最多回報的差異數
+        days_per_task (int): 每個工作的日期數
+
+    Returns:
+        tuple: (比對的日期數, 依日期排序的差異)
+    """
+    load_engine(engine_spec)
+    ranges = iter_date_ranges(start, end, days_per_task)
+    checked = 0
+    mismatches = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # 依序取得結果，保持「最早的差異」順序；同時送出的工作數有上限
+        pending = []
+        for first_day, last_day in islice(ranges, (workers or 4) * 2):
+            pending.append(pool.submit(check_range, engine_spec, first_day, last_day, year, max_mismatches))
+        while pending:
+            count, found = pending.pop(0).result()
+            checked += count
+            mismatches.extend(found)
+            if len(mismatches) >= max_mismatches:
+                for future in pending:
+                    future.cancel()
+                break
+            for first_day, last_day in islice(ranges, 1):
+                pending.append(pool.submit(check_range, engine_spec, first_day, last_day, year, max_mismatches))
+    return checked, mismatches[:max_mismatches]
+
+
+def _parse_day(parser, value):
+    parsed, reason = normalize_date(value)
+    if reason is not None:
+        parser.error(f"無效的日期：{value}")
+    return date(parsed // 10000, parsed // 100 % 100, parsed % 100)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="比對加速引擎與參考函式的結果")
+    parser.add_argument('--engine', default='registry', help="引擎名稱（registry、shards）或 模組:函式")
+    parser.add_argument('--start', default='00010101', help="起始日期")
+    parser.add_argument('--end', default='99991231', help="結束日期")
+    parser.add_argument('--year', type=int, default=2025, help="流年欄位使用的目標年份")
+    parser.add_argument('--workers', type=int, help="平行行程數，預設為 CPU 數")
+    parser.add_argument('--max-mismatches', type=int, default=20, help="最多回報的差異數")
+    parser.add_argument('--days-per-task', type=int, default=3653, help="每個工作的日期數")
+    args = parser.parse_args(argv)
+
+    start = _parse_day(parser, args.start)
+    end = _parse_day(parser, args.end)
+    checked, mismatches = run_check(args.engine, start, end, args.year, args.workers,
+                                    args.max_mismatches, args.days_per_task)
+    if not mismatches:
+        print(f"引擎 {args.engine}：{checked} 個日期全部一致")
+        return
+    print(f"引擎 {args.engine}：在 {checked} 個日期中發現差異，最早的 {len(mismatches)} 筆：")
+    for birthdate, field, expected, actual in mismatches:
+        print(f"  {birthdate} {field}: 參考 {expected!r}，引擎 {actual!r}")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
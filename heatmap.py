@@ -0,0 +1,238 @@
+"""
+生命靈數與塔羅牌的日曆熱度圖
+
+將整年或數十年中每一天的生命靈數（或塔羅牌號）畫成日曆熱度圖，輸出 SVG 或 PNG。
+只使用標準函式庫（PNG 以 zlib 壓縮）。
+
+每一天的數值不逐日呼叫 calculate_* 函式：月日相關的數字和預先建成平年與閏年兩張表，
+每一年只需把該年的年份數字和加上去，再以 life_number_calculator 的 reduce_to_9、reduce_to_22（1000 以內查表）化簡。
+
+用法：
+    python heatmap.py --field life_number --start-year 2026 --end-year 2026 --output 2026.svg
+    python heatmap.py --field life_tarot --start-year 1926 --end-year 2025 --output century.png
+"""
+from datetime import date
+import argparse
+import struct
+import zlib
+
+from life_number_calculator import sum_digits, reduce_to_9, reduce_to_22
+
+# 平年與閏年每一天的 (月, 日, 月日數字和, 日數字和, 月×日)
+_DAY_TABLES = {
+    leap: [
+        (day.month, day.day, sum_digits(f"{day.month:02d}{day.day:02d}"),
+         sum_digits(f"{day.day:02d}"), day.month * day.day)
+        for day in (date.fromordinal(date(base, 1, 1).toordinal() + offset)
+                    for offset in range(366 if leap else 365))
+    ]
+    for leap, base in ((False, 2001), (True, 2000))
+}
+
+
+def _is_leap(year):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def _year_digit_sum(year):
+    return sum_digits(f"{year:04d}")
+
+
+def _life_number(year, table):
+    total = _year_digit_sum(year)
+    return [reduce_to_9(total + row[2]) for row in table]
+
+
+def _life_tarot(year, table):
+    total = _year_digit_sum(year)
+    return [reduce_to_22(total + row[2]) for row in table]
+
+
+def _talent_tarot(year, table):
+    last_two = sum_digits(f"{year % 100:02d}")
+    return [reduce_to_22(last_two + row[3]) for row in table]
+
+
+def _acquired_tarot(year, table):
+    return [reduce_to_22(year * row[0]) for row in table]
+
+
+def _shadow_tarot(year, table):
+    middle = year // 10 % 100
+    return [reduce_to_22(row[0] * middle) for row in table]
+
+
+# 與年份無關的欄位：平年與閏年各算一次
+_SOUL_TAROT = {leap: [reduce_to_22(row[2]) for row in table] for leap, table in _DAY_TABLES.items()}
+_INNATE_TAROT = {leap: [reduce_to_22(row[4]) for row in table] for leap, table in _DAY_TABLES.items()}
+
+# 欄位 -> (顯示名稱, 最小值, 最大值, values(year, table))
+HEATMAP_FIELDS = {
+    'life_number': ("生命靈數", 1, 9, _life_number),
+    'life_tarot': ("生命塔羅", 0, 22, _life_tarot),
+    'soul_tarot': ("靈魂塔羅", 0, 22, lambda year, table: _SOUL_TAROT[len(table) == 366]),
+    'talent_tarot': ("天賦塔羅", 0, 22, _talent_tarot),
+    'innate_tarot': ("先天塔羅", 0, 22, lambda year, table: _INNATE_TAROT[len(table) == 366]),
+    'acquired_tarot': ("後天塔羅", 0, 22, _acquired_tarot),
+    'shadow_tarot': ("陰影塔羅", 0, 22, _shadow_tarot),
+}
+
+WEEKS = 54
+
+BACKGROUND = (0x1E, 0x1E, 0x1E)
+EMPTY_CELL = (0x2F, 0x2F, 0x2F)
+LOW_COLOR = (0x20, 0xB2, 0xAA)
+HIGH_COLOR = (0x99, 0x32, 0xCC)
+
+
+def year_values(field, year):
+    """
+    一年中每一天的數值
+
+    Args:
+        field (str): HEATMAP_FIELDS 的名稱
+        year (int): 年份
+
+    Returns:
+        list: 依日期排列的數值（長度 365 或 366）
+    """
+    if field not in HEATMAP_FIELDS:
+        raise ValueError(f"未知的欄位：{field}")
+    return HEATMAP_FIELDS[field][3](year, _DAY_TABLES[_is_leap(year)])
+
+
+def make_palette(count):
+    """由 LOW_COLOR 漸變到 HIGH_COLOR 的 count 種顏色"""
+    if count == 1:
+        return [LOW_COLOR]
+    return [tuple(round(low + (high - low) * index / (count - 1)) for low, high in zip(LOW_COLOR, HIGH_COLOR))
+            for index in range(count)]
+
+
+def _year_cells(field, year):
+    """
+    將一年排成 7 列（星期一到星期日）× 54 欄（週，閏年且一月一日為星期日時需要 54 週）的格子
+
+    Returns:
+        list: 7 列，每列 54 格，格子為調色盤索引，None 表示不屬於這一年
+    """
+    minimum = HEATMAP_FIELDS[field][1]
+    offset = date(year, 1, 1).weekday()
+    rows = [[None] * WEEKS for _ in range(7)]
+    for index, value in enumerate(year_values(field, year)):
+        position = offset + index
+        rows[position % 7][position // 7] = value - minimum
+    return rows
+
+
+def render_svg(field, start_year, end_year, cell=12, gap=2):
+    """
+    輸出 SVG 熱度圖，每一年一個區塊並附上年份標籤與圖例
+
+    Returns:
+        str: SVG 文件
+    """
+    label, minimum, maximum, _ = HEATMAP_FIELDS[field]
+    palette = ['#%02x%02x%02x' % color for color in make_palette(maximum - minimum + 1)]
+    step = cell + gap
+    left, top = 50, 30
+    block = 7 * step + 10
+    years = range(start_year, end_year + 1)
+    width = left + WEEKS * step + 10
+    height = top + len(years) * block + 40
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="sans-serif" font-size="11">',
+        f'<rect width="{width}" height="{height}" fill="#%02x%02x%02x"/>' % BACKGROUND,
+        f'<text x="{left}" y="18" fill="white" font-size="14">{label}（{start_year}-{end_year}）</text>',
+    ]
+    for block_index, year in enumerate(years):
+        y0 = top + block_index * block
+        parts.append(f'<text x="4" y="{y0 + cell}" fill="white">{year}</text>')
+        for weekday, row in enumerate(_year_cells(field, year)):
+            y = y0 + weekday * step
+            for week, value in enumerate(row):
+                if value is None:
+                    continue
+                parts.append(f'<rect x="{left + week * step}" y="{y}" '
+                             f'width="{cell}" height="{cell}" fill="{palette[value]}"/>')
+
+    # 圖例
+    legend_y = height - 30
+    for index, color in enumerate(palette):
+        x = left + index * (cell + 14)
+        parts.append(f'<rect x="{x}" y="{legend_y}" width="{cell}" height="{cell}" fill="{color}"/>')
+        parts.append(f'<text x="{x}" y="{legend_y + cell + 12}" fill="white">{minimum + index}</text>')
+    parts.append('</svg>')
+    return '\n'.join(parts)
+
+
+def _png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+def render_png(field, start_year, end_year, cell=6, gap=1):
+    """
+    輸出 PNG 熱度圖（索引色，無文字標籤；年份由上而下排列）
+
+    Returns:
+        bytes: PNG 檔案內容
+    """
+    label, minimum, maximum, _ = HEATMAP_FIELDS[field]
+    colors = make_palette(maximum - minimum + 1)
+    # 調色盤索引：0 背景，1 非本年的空格，2 之後為數值
+    palette = [BACKGROUND, EMPTY_CELL] + colors
+    step = cell + gap
+    block_gap = cell
+    width = WEEKS * step + gap
+    pixel_gap = b'\0' * gap
+    cell_pixels = [bytes([index]) * cell for index in range(len(palette))]
+    blank_row = b'\0' + b'\0' * width  # 每列開頭的濾波位元組為 0（None）
+
+    scanlines = []
+    for year in range(start_year, end_year + 1):
+        scanlines.extend([blank_row] * gap)
+        for row in _year_cells(field, year):
+            line = b'\0' + pixel_gap + pixel_gap.join(
+                cell_pixels[1 if value is None else value + 2] for value in row) + pixel_gap
+            scanlines.extend([line] * cell)
+            scanlines.extend([blank_row] * gap)
+        scanlines.extend([blank_row] * block_gap)
+    height = len(scanlines)
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0)
+    plte = b''.join(bytes(color) for color in palette)
+    return (b'\x89PNG\r\n\x1a\n'
+            + _png_chunk(b'IHDR', header)
+            + _png_chunk(b'PLTE', plte)
+            + _png_chunk(b'IDAT', zlib.compress(b''.join(scanlines), 6))
+            + _png_chunk(b'IEND', b''))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="輸出生命靈數與塔羅牌的日曆熱度圖")
+    parser.add_argument('--field', choices=sorted(HEATMAP_FIELDS), default='life_number', help="顯示的數字")
+    parser.add_argument('--start-year', type=int, required=True, help="起始年份")
+    parser.add_argument('--end-year', type=int, help="結束年份（含），預設與起始年份相同")
+    parser.add_argument('--format', choices=('svg', 'png'), help="輸出格式，預設依副檔名判斷")
+    parser.add_argument('--cell-size', type=int, help="每一天的格子大小（像素）")
+    parser.add_argument('--output', required=True, help="輸出檔案")
+    args = parser.parse_args(argv)
+
+    end_year = args.end_year or args.start_year
+    if not 1 <= args.start_year <= end_year <= 9999:
+        parser.error("請輸入有效的年份區間！")
+    file_format = args.format or ('png' if args.output.lower().endswith('.png') else 'svg')
+    if file_format == 'png':
+        data = render_png(args.field, args.start_year, end_year, **({'cell': args.cell_size} if args.cell_size else {}))
+        with open(args.output, 'wb') as f:
+            f.write(data)
+    else:
+        svg = render_svg(args.field, args.start_year, end_year, **({'cell': args.cell_size} if args.cell_size else {}))
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(svg)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,19 @@
+from array import array
 from datetime import datetime
+from functools import lru_cache
+from operator import add, mul, itemgetter
 import os
+import time
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import sys
 from http.server import BaseHTTPRequestHandler
 import json
 
+from lunar_calendar import (
+    lookup_lunar, solar_to_lunar_many, parse_lunar_date, lunar_to_solar, lunar_to_solar_many, format_lunar_date,
+)
+
 class Colors:
     """
     ANSI 顏色碼常量
@@ -20,6 +28,142 @@ class Colors:
     UNDERLINE = '\033[4m'    # 底線
     END = '\033[0m'          # 結束顏色
 
+# 無效日期的原因代碼
+DATE_REJECT_REASONS = {
+    'empty': "空白",
+    'type': "不支援的資料型別",
+    'format': "格式錯誤",
+    'year': "年份無效",
+    'month': "月份無效",
+    'day': "日期無效",
+    'lunar': "農曆日期無效或超出 1900-2100 年",
+}
+
+_DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def normalize_date(value):
+    """
+    驗證並正規化日期，不使用例外處理
+    
+    接受 'YYYYMMDD'、'YYYY-MM-DD'、'YYYY/MM/DD' 字串與 19900101 形式的整數。
+    
+    Args:
+        value (str | int): 日期
+        
+    Returns:
+        tuple: (整數日期 YYYYMMDD 或 None, 無效原因代碼或 None)
+    """
+    if isinstance(value, str):
+        text = value.strip()
+        length = len(text)
+        if length == 8:
+            compact = text
+        elif length == 10 and text[4] == text[7] and text[4] in '-/':
+            compact = text[0:4] + text[5:7] + text[8:10]
+        elif length == 0:
+            return None, 'empty'
+        else:
+            return None, 'format'
+        if not (compact.isascii() and compact.isdigit()):
+            return None, 'format'
+        year = int(compact[0:4])
+        month = int(compact[4:6])
+        day = int(compact[6:8])
+    elif isinstance(value, int) and not isinstance(value, bool):
+        if value <= 0:
+            return None, 'format'
+        year, month_day = divmod(value, 10000)
+        month, day = divmod(month_day, 100)
+    elif value is None:
+        return None, 'empty'
+    else:
+        return None, 'type'
+    
+    if not 1 <= year <= 9999:
+        return None, 'year'
+    if not 1 <= month <= 12:
+        return None, 'month'
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        last_day = 29
+    else:
+        last_day = _DAYS_IN_MONTH[month]
+    if not 1 <= day <= last_day:
+        return None, 'day'
+    return year * 10000 + month * 100 + day, None
+
+def normalize_year(value):
+    """
+    驗證目標年份，不使用例外處理
+    
+    接受 1-9999 的整數或只含 ASCII 數字的字串；布林值、全形或上標數字都視為無效，
+    也不會把過長的數字字串交給 int()。
+    
+    Args:
+        value (str | int): 年份
+        
+    Returns:
+        tuple: (整數年份或 None, 無效時為 'year'，否則為 None)
+    """
+    if isinstance(value, str):
+        text = value.strip()
+        if not (0 < len(text) <= 4 and text.isascii() and text.isdigit()):
+            return None, 'year'
+        value = int(text)
+    elif not isinstance(value, int) or isinstance(value, bool):
+        return None, 'year'
+    if not 1 <= value <= 9999:
+        return None, 'year'
+    return value, None
+
+def iter_normalized_dates(values):
+    """
+    逐筆正規化日期，適合串流處理
+    
+    Args:
+        values (iterable): 日期序列
+        
+    Yields:
+        tuple: (索引, 整數日期或 None, 無效原因代碼或 None)
+    """
+    for index, value in enumerate(values):
+        date, reason = normalize_date(value)
+        yield index, date, reason
+
+def normalize_dates(values):
+    """
+    批次正規化日期
+    
+    Args:
+        values (iterable): 日期序列
+        
+    Returns:
+        tuple: (有效遮罩 bytearray, 整數日期 array（無效時為 0）, [(索引, 無效原因代碼), ...])
+    """
+    mask = bytearray()
+    dates = array('l')
+    rejects = []
+    for index, date, reason in iter_normalized_dates(values):
+        if reason is None:
+            mask.append(1)
+            dates.append(date)
+        else:
+            mask.append(0)
+            dates.append(0)
+            rejects.append((index, reason))
+    return mask, dates, rejects
+
+def format_birthdate(date):
+    """
+    將整數日期轉為計算函式使用的 'YYYYMMDD' 字串
+    
+    Args:
+        date (int): 整數日期，例如 19900101
+        
+    Returns:
+        str: 'YYYYMMDD'
+    """
+    return f"{date:08d}"
+
 def validate_date(date_str):
     """
     驗證日期格式是否正確
@@ -30,11 +174,7 @@ def validate_date(date_str):
     Returns:
         bool: 日期是否有效
     """
-    try:
-        datetime.strptime(date_str, '%Y%m%d')
-        return True
-    except ValueError:
-        return False
+    return isinstance(date_str, str) and len(date_str) == 8 and normalize_date(date_str)[1] is None
 
 def get_life_number_meaning(number):
     """
@@ -93,8 +233,21 @@ def calculate_year_number(birthdate, year):
     # 取出出生月日
     birth_month_day = birthdate[4:8]
     
+    return calculate_year_number_from_sum(sum(int(digit) for digit in birth_month_day), year)
+
+def calculate_year_number_from_sum(month_day_sum, year):
+    """
+    以出生月日的數字和計算流年數字（切換年份時可重複使用同一個數字和）
+    
+    Args:
+        month_day_sum (int): 出生月日各位數字的和
+        year (int): 要計算的年份
+        
+    Returns:
+        int: 流年數字（1-9）
+    """
     # 將年份和出生月日的數字相加
-    total = sum(int(digit) for digit in str(year)) + sum(int(digit) for digit in birth_month_day)
+    total = sum(int(digit) for digit in str(year)) + month_day_sum
     
     # 持續相加直到得到個位數
     while total > 9:
@@ -203,11 +356,24 @@ def calculate_year_tarot(birthdate, year):
         birthdate (str): 出生日期，格式為 'YYYYMMDD'
         year (int): 要計算的年份
         
+    Returns:
+        int: 流年塔羅數字（1-22）
+    """
+    return calculate_year_tarot_from_sum(sum(int(digit) for digit in birthdate), year)
+
+def calculate_year_tarot_from_sum(digit_sum, year):
+    """
+    以出生年月日的數字和計算流年塔羅（切換年份時可重複使用同一個數字和）
+    
+    Args:
+        digit_sum (int): 出生年月日各位數字的和
+        year (int): 要計算的年份
+        
     Returns:
         int: 流年塔羅數字（1-22）
     """
     # 將出生年月日和目標年份相加
-    total = sum(int(digit) for digit in birthdate) + sum(int(digit) for digit in str(year))
+    total = digit_sum + sum(int(digit) for digit in str(year))
     while total > 22:
         total = sum(int(digit) for digit in str(total))
     return total
@@ -291,7 +457,7 @@ def calculate_shadow_tarot(birthdate):
         birthdate (str): 出生日期，格式為 'YYYYMMDD'
         
     Returns:
-        int: 陰影塔羅數字（1-22）
+        int: 陰影塔羅數字（0-22）；年份中間兩位為 00 時（例如 2005 年）為 0
     """
     # 使用月份和年份中間兩位的乘積
     month = int(birthdate[4:6])
@@ -580,12 +746,663 @@ def analyze_life_grid(grid):
     
     return strengths, weaknesses, connections
 
+def sum_digits(digits):
+    """
+    各位數字相加
+    
+    Args:
+        digits (str): 數字字串，例如 '19790619'
+        
+    Returns:
+        int: 各位數字的和
+    """
+    return sum(int(d) for d in digits)
+
+def reduce_number(total, limit):
+    """
+    持續將各位數字相加直到不大於 limit
+    
+    Args:
+        total (int): 要化簡的非負整數
+        limit (int): 上限，例如生命靈數為 9、塔羅牌為 22
+        
+    Returns:
+        int: 化簡後的數字
+    """
+    while total > limit:
+        total = sum_digits(str(total))
+    return total
+
+# 兩位數字串的數字和，例如 '19' -> 10
+_PAIR_DIGIT_SUM = {f"{n:02d}": n // 10 + n % 10 for n in range(100)}
+
+# 1000 以內的化簡結果對照表
+_REDUCE_9 = [reduce_number(n, 9) for n in range(1000)]
+_REDUCE_22 = [reduce_number(n, 22) for n in range(1000)]
+
+def reduce_to_9(total):
+    """
+    化簡為 0-9 的數字（生命靈數、流年數等），1000 以內直接查表
+    
+    Args:
+        total (int): 要化簡的非負整數
+        
+    Returns:
+        int: 化簡後的數字
+    """
+    while total >= 1000:
+        total = sum_digits(str(total))
+    return _REDUCE_9[total]
+
+def reduce_to_22(total):
+    """
+    化簡為 0-22 的塔羅牌數字，1000 以內直接查表
+    
+    Args:
+        total (int): 要化簡的非負整數
+        
+    Returns:
+        int: 化簡後的數字
+    """
+    while total >= 1000:
+        total = sum_digits(str(total))
+    return _REDUCE_22[total]
+
+# 星座只由月日決定，預先建立 (月, 日) -> (星座數, 星座名稱) 的對照表
+_ZODIAC_TABLE = {
+    (month, day): calculate_zodiac_number(f"0000{month:02d}{day:02d}")
+    for month in range(1, 13) for day in range(1, 32)
+}
+
+def _ziwei_triple(year_digit_sum, month_x_day):
+    main_number = _REDUCE_9[year_digit_sum]
+    sub_number = reduce_to_9(month_x_day)
+    return (main_number, sub_number, _REDUCE_9[main_number + sub_number])
+
+def _lunar_ziwei_triple(lunar):
+    if lunar is None:
+        return None
+    year, month, day, _ = lunar
+    return _ziwei_triple(sum_digits(str(year)), month * day)
+
+def calculate_lunar_ziwei_number(lunar):
+    """
+    以農曆日期計算紫微靈動數（規則與 calculate_ziwei_number 相同，改用農曆的年、月、日）
+    
+    Args:
+        lunar (tuple): (年, 月, 日, 是否閏月)，閏月以該月的月份計算
+        
+    Returns:
+        tuple: (主星數, 副星數, 命宮數)
+    """
+    return _lunar_ziwei_triple(lunar)
+
+def calculate_lunar_ziwei_numbers(dates):
+    """
+    批次由國曆日期換算農曆並計算紫微靈動數
+    
+    Args:
+        dates (iterable): 國曆日期 YYYYMMDD 整數（例如 normalize_dates 的結果）
+        
+    Returns:
+        list: 每個日期的 (農曆日期, (主星數, 副星數, 命宮數))；超出 1900-2100 範圍時為 None
+    """
+    return [None if lunar is None else (lunar, _lunar_ziwei_triple(lunar))
+            for lunar in solar_to_lunar_many(dates)]
+
+def calculate_lunar_ziwei_numbers_from_lunar(lunars):
+    """
+    批次由農曆生日計算紫微靈動數，不必逐筆換算國曆或處理例外
+    
+    Args:
+        lunars (iterable): (年, 月, 日, 是否閏月)，例如 parse_lunar_date 的結果
+        
+    Returns:
+        list: 每個日期的 (主星數, 副星數, 命宮數)；該月沒有這一天或超出 1900-2100 範圍時為 None
+    """
+    lunars = list(lunars)
+    return [None if solar is None else _lunar_ziwei_triple(lunar)
+            for lunar, solar in zip(lunars, lunar_to_solar_many(lunars))]
+
+def _connection_triple(day_digit_sum, month_digit_sum):
+    innate = _REDUCE_9[day_digit_sum]
+    life = _REDUCE_9[month_digit_sum]
+    return (innate, life, _REDUCE_9[innate + life])
+
+# 塔羅牌配牌：相鄰牌號的差距表示轉變的難易程度，牌號總和表示整體能量強度
+# 陰影塔羅在出生年份中間兩位為 00 時（例如 2005 年）化簡為 0，因此牌號包含 0
+TAROT_NUMBERS = range(0, 23)
+
+# 牌號差距的上限 -> 轉變難易
+_TAROT_TRANSITIONS = (
+    (0, "相同", "能量重疊，彼此強化"),
+    (3, "容易", "能量相近，轉換自然"),
+    (7, "中等", "需要一段時間調適"),
+    (13, "需要努力", "跨度較大，需要刻意練習"),
+    (22, "困難", "兩端差異極大，轉變需要突破"),
+)
+
+# 每張牌的平均牌號上限 -> 能量強度
+_TAROT_ENERGY_LEVELS = ((7, "溫和"), (15, "穩定"), (22, "強烈"))
+
+# 與 GUI 相同的配牌組合：(標題, 牌的欄位, 說明)；兩張牌查 TAROT_PAIR_TABLE，三張牌查 tarot_chain_table()
+TAROT_PAIRINGS = (
+    ("生命塔羅 + 靈魂塔羅", ('life_tarot', 'soul_tarot'), "顯示您目前生命歷程中的主要課題和靈魂學習"),
+    ("天賦塔羅 + 先天塔羅", ('talent_tarot', 'innate_tarot'), "展現您與生俱來的能力和潛在天賦"),
+    ("後天塔羅 + 人格塔羅", ('acquired_tarot', 'personality_tarot'), "顯示您在成長過程中發展出的特質"),
+    ("生命方向配牌", ('life_tarot', 'soul_tarot', 'talent_tarot'), "顯示您的生命發展軌跡和方向"),
+    ("內在成長配牌", ('innate_tarot', 'acquired_tarot', 'personality_tarot'), "展現您的個人成長和轉變過程"),
+    ("陰影整合配牌", ('personality_tarot', 'shadow_tarot', 'soul_tarot'), "顯示您需要整合的陰影面向和靈性成長"),
+)
+
+# 特殊組合提示：兩個欄位的牌號相同時顯示
+TAROT_NOTES = (
+    (('life_tarot', 'soul_tarot'), "生命塔羅與靈魂塔羅相同：表示生命目標與靈魂使命高度一致"),
+    (('talent_tarot', 'innate_tarot'), "天賦塔羅與先天塔羅相同：表示天賦能力已充分展現"),
+    (('acquired_tarot', 'personality_tarot'), "後天塔羅與人格塔羅相同：表示個性特質已充分發展"),
+)
+
+# 配牌用到的塔羅欄位（依 CALCULATORS 的順序）
+TAROT_PAIRING_FIELDS = tuple(dict.fromkeys(field for _, fields, _ in TAROT_PAIRINGS for field in fields))
+
+def _tarot_transition(difference):
+    for limit, transition, phrase in _TAROT_TRANSITIONS:
+        if difference <= limit:
+            return transition, phrase
+
+def _tarot_energy_level(energy, count):
+    for limit, level in _TAROT_ENERGY_LEVELS:
+        if energy <= limit * count:
+            return level
+
+# 建表時使用的牌名與含義，避免逐項呼叫 get_tarot_card
+_TAROT_CARDS = {number: get_tarot_card(number) for number in TAROT_NUMBERS}
+
+def _build_tarot_pair(first, second):
+    """計算兩張牌的配牌解讀（只在建表時呼叫）"""
+    (first_name, first_meaning), (second_name, second_meaning) = _TAROT_CARDS[first], _TAROT_CARDS[second]
+    difference = abs(first - second)
+    transition, phrase = _tarot_transition(difference)
+    energy = first + second
+    combined = reduce_to_22(energy)
+    combined_name, combined_meaning = _TAROT_CARDS[combined]
+    return {
+        'cards': (first, second),
+        'names': (first_name, second_name),
+        'difference': difference,
+        'transition': transition,
+        'energy': energy,
+        'energy_level': _tarot_energy_level(energy, 2),
+        'combined': combined,
+        'interpretation': f"{first_name}（{first_meaning.split('、')[0]}）與{second_name}（{second_meaning.split('、')[0]}）："
+                          f"{phrase}；兩張牌合成{combined_name}，{combined_meaning}",
+    }
+
+def _build_tarot_chain(first, second, third):
+    """計算三張牌依序流動的配牌解讀（只在建表時呼叫），每一步沿用兩張牌的配牌表"""
+    steps = (TAROT_PAIR_TABLE[(first, second)], TAROT_PAIR_TABLE[(second, third)])
+    energy = first + second + third
+    combined = reduce_to_22(energy)
+    combined_name, combined_meaning = _TAROT_CARDS[combined]
+    cards = (first, second, third)
+    repeated = ()
+    if first == second or second == third or first == third:
+        repeated = tuple(sorted({number for number in cards if cards.count(number) > 1}))
+    interpretation = (f"{steps[0]['names'][0]} → {steps[0]['names'][1]}（{steps[0]['transition']}）"
+                      f" → {steps[1]['names'][1]}（{steps[1]['transition']}）；"
+                      f"三張牌合成{combined_name}，{combined_meaning}")
+    if repeated:
+        interpretation += f"；重複出現的{'、'.join(_TAROT_CARDS[number][0] for number in repeated)}是特別需要關注的面向"
+    return {
+        'cards': cards,
+        'names': (_TAROT_CARDS[first][0], _TAROT_CARDS[second][0], _TAROT_CARDS[third][0]),
+        'differences': (steps[0]['difference'], steps[1]['difference']),
+        'transitions': (steps[0]['transition'], steps[1]['transition']),
+        'energy': energy,
+        'energy_level': _tarot_energy_level(energy, 3),
+        'combined': combined,
+        'repeated': repeated,
+        'interpretation': interpretation,
+    }
+
+# 23×23 的兩張牌配牌表，鍵為牌號 tuple
+TAROT_PAIR_TABLE = {(first, second): _build_tarot_pair(first, second)
+                    for first in TAROT_NUMBERS for second in TAROT_NUMBERS}
+
+@lru_cache(maxsize=None)
+def tarot_chain_table():
+    """
+    23×23×23 的三張牌連續配牌表，鍵為牌號 tuple
+    
+    表格較大，第一次需要三張牌的配牌時才建立，只使用其他欄位時不必付出建表成本。
+    
+    Returns:
+        dict: (牌號, 牌號, 牌號) -> 配牌解讀
+    """
+    return {(first, second, third): _build_tarot_chain(first, second, third)
+            for first in TAROT_NUMBERS for second in TAROT_NUMBERS for third in TAROT_NUMBERS}
+
+def lookup_tarot_pairing(*numbers):
+    """
+    查詢兩張或三張牌的配牌解讀
+    
+    Args:
+        *numbers (int): 依序的牌號（0-22），兩張或三張
+        
+    Returns:
+        dict: TAROT_PAIR_TABLE 或 tarot_chain_table() 中的項目
+    """
+    table = TAROT_PAIR_TABLE if len(numbers) == 2 else tarot_chain_table()
+    try:
+        return table[numbers]
+    except KeyError:
+        raise ValueError(f"無效的配牌：{numbers}") from None
+
+def _tarot_pairings(*numbers):
+    cards = dict(zip(TAROT_PAIRING_FIELDS, numbers))
+    pair_table, chain_table = TAROT_PAIR_TABLE, tarot_chain_table()
+    return tuple((pair_table if len(fields) == 2 else chain_table)[tuple(cards[field] for field in fields)]
+                 for _, fields, _ in TAROT_PAIRINGS)
+
+# 共用中間值：名稱 -> (相依的值, 計算函式)
+# 'birthdate' 與 'target_year' 由 compute_profile 直接提供
+INTERMEDIATES = {
+    'year': (('birthdate',), lambda birthdate: int(birthdate[0:4])),
+    'month': (('birthdate',), lambda birthdate: int(birthdate[4:6])),
+    'day': (('birthdate',), lambda birthdate: int(birthdate[6:8])),
+    'year_middle': (('birthdate',), lambda birthdate: int(birthdate[1:3])),
+    'year_last_two_sum': (('birthdate',), lambda birthdate: _PAIR_DIGIT_SUM[birthdate[2:4]]),
+    'year_digit_sum': (('birthdate', 'year_last_two_sum'), lambda birthdate, last_two: _PAIR_DIGIT_SUM[birthdate[0:2]] + last_two),
+    'month_digit_sum': (('birthdate',), lambda birthdate: _PAIR_DIGIT_SUM[birthdate[4:6]]),
+    'day_digit_sum': (('birthdate',), lambda birthdate: _PAIR_DIGIT_SUM[birthdate[6:8]]),
+    'month_day_sum': (('month_digit_sum', 'day_digit_sum'), add),
+    'digit_sum': (('year_digit_sum', 'month_day_sum'), add),
+    'month_x_day': (('month', 'day'), mul),
+    'target_year_digit_sum': (('target_year',), lambda year: sum_digits(str(year))),
+    'ziwei': (('year_digit_sum', 'month_x_day'), _ziwei_triple),
+    'connection': (('day_digit_sum', 'month_digit_sum'), _connection_triple),
+    'zodiac': (('month', 'day'), lambda month, day: _ZODIAC_TABLE.get((month, day), (0, "未知星座"))),
+    # 農曆日期與農曆紫微靈動數，超出 1900-2100 的換算範圍時為 None
+    'lunar_date': (('year', 'month', 'day'), lookup_lunar),
+    'lunar_ziwei': (('lunar_date',), _lunar_ziwei_triple),
+}
+
+# 計算器：欄位名稱 -> (需要的中間值, 計算函式)
+CALCULATORS = {
+    'life_number': (('digit_sum',), _REDUCE_9.__getitem__),
+    'year_number': (('month_day_sum', 'target_year_digit_sum'), lambda md, y: _REDUCE_9[md + y]),
+    'life_tarot': (('digit_sum',), _REDUCE_22.__getitem__),
+    'soul_tarot': (('month_day_sum',), _REDUCE_22.__getitem__),
+    'year_tarot': (('digit_sum', 'target_year_digit_sum'), lambda total, y: _REDUCE_22[total + y]),
+    'talent_tarot': (('year_last_two_sum', 'day_digit_sum'), lambda yy, dd: _REDUCE_22[yy + dd]),
+    'innate_tarot': (('month_x_day',), reduce_to_22),
+    'acquired_tarot': (('year', 'month'), lambda year, month: reduce_to_22(year * month)),
+    'personality_tarot': (('birthdate',), lambda birthdate: _REDUCE_22[int(birthdate[0]) + int(birthdate[3])]),
+    'shadow_tarot': (('month', 'year_middle'), lambda month, middle: reduce_to_22(month * middle)),
+    'ziwei_main': (('ziwei',), itemgetter(0)),
+    'ziwei_sub': (('ziwei',), itemgetter(1)),
+    'ziwei_destiny': (('ziwei',), itemgetter(2)),
+    'connection_innate': (('connection',), itemgetter(0)),
+    'connection_life': (('connection',), itemgetter(1)),
+    'connection_talent': (('connection',), itemgetter(2)),
+    'zodiac_number': (('zodiac',), itemgetter(0)),
+    'zodiac_name': (('zodiac',), itemgetter(1)),
+    'grid_counts': (('birthdate',), lambda birthdate: tuple(map(birthdate.count, "123456789"))),
+    'life_grid': (('birthdate',), calculate_life_grid),
+    'grid_analysis': (('life_grid',), analyze_life_grid),
+    # 六組配牌的解讀，依 TAROT_PAIRINGS 的順序排列
+    'tarot_pairings': (TAROT_PAIRING_FIELDS, _tarot_pairings),
+}
+
+# 與目標年份有關的欄位
+YEAR_FIELDS = ('year_number', 'year_tarot')
+
+# GUI 一次計算所需的欄位與中間值
+GUI_PROFILE_FIELDS = (
+    'life_number', 'life_tarot', 'soul_tarot', 'talent_tarot', 'innate_tarot',
+    'acquired_tarot', 'personality_tarot', 'shadow_tarot',
+    'ziwei', 'connection', 'zodiac', 'life_grid', 'grid_analysis',
+    'month_day_sum', 'digit_sum', 'lunar_date', 'lunar_ziwei',
+    'tarot_pairings',
+)
+
+# 欄位與中間值的固定順序：不同順序或重複的欄位組合共用同一個計算計畫
+_REGISTRY_ORDER = {name: index for index, name in enumerate((*CALCULATORS, *INTERMEDIATES))}
+
+# 快取的計算計畫數上限；API 與常駐服務可以指定任意欄位組合，不能無限制地累積
+PROFILE_PLAN_CACHE_SIZE = 128
+
+def _canonical_fields(fields):
+    return tuple(sorted(set(fields), key=lambda name: _REGISTRY_ORDER.get(name, len(_REGISTRY_ORDER))))
+
+@lru_cache(maxsize=PROFILE_PLAN_CACHE_SIZE)
+def _compile_plan(fields):
+    """
+    依各計算器宣告的中間值排出計算順序
+    
+    Args:
+        fields (tuple): 以 _canonical_fields 整理過的欄位或中間值
+        
+    Returns:
+        function: run(birthdate, target_year) -> dict，包含所有計算過的值
+    """
+    order = []
+    planned = {'birthdate', 'target_year'}
+    
+    def visit(name):
+        if name in planned:
+            return
+        if name in CALCULATORS:
+            requires, func = CALCULATORS[name]
+        elif name in INTERMEDIATES:
+            requires, func = INTERMEDIATES[name]
+        else:
+            raise ValueError(f"未知的欄位：{name}")
+        for dependency in requires:
+            visit(dependency)
+        planned.add(name)
+        # 大多數計算只依賴一到兩個值，先拆開以免每次都建立參數串列
+        first = requires[0] if len(requires) >= 1 else None
+        second = requires[1] if len(requires) >= 2 else None
+        order.append((name, func, len(requires), first, second, requires))
+    
+    for field in fields:
+        visit(field)
+    order = tuple(order)
+    
+    def run(birthdate, target_year):
+        values = {'birthdate': birthdate, 'target_year': target_year}
+        for name, func, count, first, second, requires in order:
+            if count == 1:
+                values[name] = func(values[first])
+            elif count == 2:
+                values[name] = func(values[first], values[second])
+            else:
+                values[name] = func(*[values[dependency] for dependency in requires])
+        return values
+    return run
+
+@lru_cache(maxsize=PROFILE_PLAN_CACHE_SIZE)
+def _plan_for(fields):
+    """呼叫端給定的欄位組合 -> 共用的計算計畫，省去每次重新整理欄位順序"""
+    return _compile_plan(_canonical_fields(fields))
+
+def plan_profile(fields):
+    """
+    依各計算器宣告的中間值排出計算順序
+    
+    每個中間值只計算一次，也只計算所要求欄位需要的中間值；
+    計算順序依欄位集合快取（最多 PROFILE_PLAN_CACHE_SIZE 組），與欄位的排列順序無關。
+    
+    Args:
+        fields (tuple): 要計算的欄位或中間值
+        
+    Returns:
+        function: profile(birthdate, target_year) -> dict，依 fields 的順序排列
+    """
+    fields = tuple(fields)
+    run = _plan_for(fields)
+    
+    def profile(birthdate, target_year):
+        values = run(birthdate, target_year)
+        return {field: values[field] for field in fields}
+    return profile
+
+def compute_profile(birthdate, fields=None, year=None):
+    """
+    計算生日的多項數字，共用的中間值（數字和、月、日、月×日等）只計算一次
+    
+    Args:
+        birthdate (str): 已驗證的出生日期，格式為 'YYYYMMDD'
+        fields (iterable): 要計算的欄位，預設為 CALCULATORS 中的全部欄位；
+            也可以指定 INTERMEDIATES 中的中間值（例如 'digit_sum'）
+        year (int): 流年欄位使用的目標年份，預設為今年
+        
+    Returns:
+        dict: 欄位名稱 -> 計算結果
+    """
+    fields = tuple(CALCULATORS) if fields is None else tuple(fields)
+    if year is None:
+        year = datetime.now().year
+    values = _plan_for(fields)(birthdate, year)
+    return {field: values[field] for field in fields}
+
+def _sum_digits_step(digits, steps):
+    """將各位數字相加並記錄為一個步驟"""
+    total = sum(int(d) for d in digits)
+    steps.append(('+'.join(digits), total))
+    return total
+
+def _reduce_steps(total, limit, steps):
+    """持續將各位數字相加直到不大於 limit，並記錄每個化簡步驟"""
+    while total > limit:
+        total = _sum_digits_step(str(total), steps)
+    return total
+
+def _explain_life_number(birthdate, year):
+    steps = []
+    _reduce_steps(_sum_digits_step(birthdate, steps), 9, steps)
+    return [('出生日期', birthdate)], steps
+
+def _explain_year_number(birthdate, year):
+    steps = []
+    _reduce_steps(_sum_digits_step(str(year) + birthdate[4:8], steps), 9, steps)
+    return [('目標年份', year), ('出生月日', birthdate[4:8])], steps
+
+def _explain_life_tarot(birthdate, year):
+    steps = []
+    _reduce_steps(_sum_digits_step(birthdate, steps), 22, steps)
+    return [('出生日期', birthdate)], steps
+
+def _explain_soul_tarot(birthdate, year):
+    steps = []
+    _reduce_steps(_sum_digits_step(birthdate[4:], steps), 22, steps)
+    return [('出生月日', birthdate[4:])], steps
+
+def _explain_year_tarot(birthdate, year):
+    steps = []
+    _reduce_steps(_sum_digits_step(birthdate + str(year), steps), 22, steps)
+    return [('出生日期', birthdate), ('目標年份', year)], steps
+
+def _explain_talent_tarot(birthdate, year):
+    steps = []
+    _reduce_steps(_sum_digits_step(birthdate[2:4] + birthdate[6:8], steps), 22, steps)
+    return [('年份後兩位', birthdate[2:4]), ('日期', birthdate[6:8])], steps
+
+def _product_steps(left, right, limit, steps):
+    """記錄兩數相乘及其化簡步驟"""
+    steps.append((f"{left} × {right}", left * right))
+    return _reduce_steps(left * right, limit, steps)
+
+def _explain_innate_tarot(birthdate, year):
+    month, day = int(birthdate[4:6]), int(birthdate[6:8])
+    steps = []
+    _product_steps(month, day, 22, steps)
+    return [('月份', month), ('日期', day)], steps
+
+def _explain_acquired_tarot(birthdate, year):
+    birth_year, month = int(birthdate[0:4]), int(birthdate[4:6])
+    steps = []
+    _product_steps(birth_year, month, 22, steps)
+    return [('年份', birth_year), ('月份', month)], steps
+
+def _explain_personality_tarot(birthdate, year):
+    first_digit, last_digit = int(birthdate[0]), int(birthdate[3])
+    steps = [(f"{first_digit} + {last_digit}", first_digit + last_digit)]
+    _reduce_steps(first_digit + last_digit, 22, steps)
+    return [('年份第一位', first_digit), ('年份最後一位', last_digit)], steps
+
+def _explain_shadow_tarot(birthdate, year):
+    month, year_middle = int(birthdate[4:6]), int(birthdate[1:3])
+    steps = []
+    _product_steps(month, year_middle, 22, steps)
+    return [('月份', month), ('年份中間兩位', year_middle)], steps
+
+def _explain_ziwei_main(birthdate, year):
+    steps = []
+    _reduce_steps(_sum_digits_step(str(int(birthdate[0:4])), steps), 9, steps)
+    return [('年份', birthdate[0:4])], steps
+
+def _explain_ziwei_sub(birthdate, year):
+    month, day = int(birthdate[4:6]), int(birthdate[6:8])
+    steps = []
+    _product_steps(month, day, 9, steps)
+    return [('月份', birthdate[4:6]), ('日期', birthdate[6:8])], steps
+
+def _explain_ziwei_destiny(birthdate, year):
+    main_number, sub_number, _ = calculate_ziwei_number(birthdate)
+    steps = [(f"{main_number} + {sub_number}", main_number + sub_number)]
+    _reduce_steps(main_number + sub_number, 9, steps)
+    return [('主星數', main_number), ('副星數', sub_number)], steps
+
+def _explain_connection_innate(birthdate, year):
+    steps = []
+    _reduce_steps(_sum_digits_step(birthdate[6:8], steps), 9, steps)
+    return [('日期', birthdate[6:8])], steps
+
+def _explain_connection_life(birthdate, year):
+    steps = []
+    _reduce_steps(_sum_digits_step(birthdate[4:6], steps), 9, steps)
+    return [('月份', birthdate[4:6])], steps
+
+def _explain_connection_talent(birthdate, year):
+    innate, life, _ = calculate_connection_numbers(birthdate)
+    steps = [(f"{innate} + {life}", innate + life)]
+    _reduce_steps(innate + life, 9, steps)
+    return [('先天數', innate), ('生命數', life)], steps
+
+def _explain_zodiac_number(birthdate, year):
+    month, day = int(birthdate[4:6]), int(birthdate[6:8])
+    number, name = calculate_zodiac_number(birthdate)
+    return [('月份', month), ('日期', day)], [(f"{month}月{day}日 → {name}", number)]
+
+# 欄位名稱 -> (中文名稱, 計算方式, 說明函式)
+EXPLAINERS = {
+    'life_number': ('生命靈數', "將出生年月日的所有數字相加，若大於9則繼續相加直到得到個位數", _explain_life_number),
+    'year_number': ('流年數', "當年年份數字與出生月日相加，若大於9則繼續相加", _explain_year_number),
+    'life_tarot': ('生命塔羅', "出生年月日所有數字相加", _explain_life_tarot),
+    'soul_tarot': ('靈魂塔羅', "月份和日期數字相加", _explain_soul_tarot),
+    'year_tarot': ('流年塔羅', "完整出生年月日和目標年份的數字相加", _explain_year_tarot),
+    'talent_tarot': ('天賦塔羅', "年份後兩位加上日期的數字相加", _explain_talent_tarot),
+    'innate_tarot': ('先天塔羅', "月份與日期相乘後化簡", _explain_innate_tarot),
+    'acquired_tarot': ('後天塔羅', "年份與月份相乘後化簡", _explain_acquired_tarot),
+    'personality_tarot': ('人格塔羅', "年份的第一位和最後一位相加", _explain_personality_tarot),
+    'shadow_tarot': ('陰影塔羅', "月份與年份中間兩位相乘後化簡", _explain_shadow_tarot),
+    'ziwei_main': ('主星數', "年份數字相加化簡", _explain_ziwei_main),
+    'ziwei_sub': ('副星數', "月份與日期相乘後化簡", _explain_ziwei_sub),
+    'ziwei_destiny': ('命宮數', "主星數與副星數相加", _explain_ziwei_destiny),
+    'connection_innate': ('先天數', "出生日期中的「日」的數字相加", _explain_connection_innate),
+    'connection_life': ('生命數', "出生日期中的「月份」數字相加", _explain_connection_life),
+    'connection_talent': ('天賦數', "先天數與生命數相加", _explain_connection_talent),
+    'zodiac_number': ('星座數', "依出生月日對應星座", _explain_zodiac_number),
+}
+
+def explain(birthdate, field, year=None):
+    """
+    產生指定數字的逐步計算過程
+
+    只有在需要顯示計算過程時才呼叫，數值計算函式本身不會產生任何說明文字。
+
+    Args:
+        birthdate (str): 出生日期，格式為 'YYYYMMDD'
+        field (str): 欄位名稱，例如 'life_number'、'shadow_tarot'
+        year (int): 流年欄位使用的目標年份，預設為今年
+
+    Returns:
+        dict: {'field', 'label', 'method', 'inputs', 'steps', 'result'}，
+              steps 為 [(算式, 結果), ...]
+    """
+    if field not in EXPLAINERS:
+        raise ValueError(f"未知的欄位：{field}")
+    if year is None:
+        year = datetime.now().year
+    label, method, explainer = EXPLAINERS[field]
+    inputs, steps = explainer(birthdate, year)
+    return {
+        'field': field,
+        'label': label,
+        'method': method,
+        'inputs': inputs,
+        'steps': steps,
+        'result': steps[-1][1],
+    }
+
+# 流年欄位 -> (化簡上限, 出生日期數字和的名稱)
+_YEAR_TRACE_SOURCES = {
+    'year_number': (9, '出生月日數字和'),
+    'year_tarot': (22, '出生日期數字和'),
+}
+
+def explain_year_from_sum(field, birth_sum, year):
+    """
+    以已經算好的出生日期數字和產生流年欄位的計算過程
+    
+    切換目標年份時使用：生日部分沿用快取的數字和，只加上與年份有關的步驟。
+    
+    Args:
+        field (str): 'year_number' 或 'year_tarot'
+        birth_sum (int): 出生月日（year_number）或出生年月日（year_tarot）各位數字的和
+        year (int): 目標年份
+        
+    Returns:
+        dict: 與 explain 相同的格式
+    """
+    if field not in _YEAR_TRACE_SOURCES:
+        raise ValueError(f"不是流年欄位：{field}")
+    limit, sum_label = _YEAR_TRACE_SOURCES[field]
+    label, method, _ = EXPLAINERS[field]
+    total = sum_digits(str(year)) + birth_sum
+    steps = [(f"{'+'.join(str(year))} + {birth_sum}", total)]
+    _reduce_steps(total, limit, steps)
+    return {
+        'field': field,
+        'label': label,
+        'method': method,
+        'inputs': [('目標年份', year), (sum_label, birth_sum)],
+        'steps': steps,
+        'result': steps[-1][1],
+    }
+
+def _chinese_numeral(number):
+    """將 1-99 轉為中文數字"""
+    digits = "零一二三四五六七八九"
+    if number < 10:
+        return digits[number]
+    tens, ones = divmod(number, 10)
+    return ("" if tens == 1 else digits[tens]) + "十" + (digits[ones] if ones else "")
+
+def format_trace_steps(trace, numbered=False):
+    """
+    將計算過程轉為顯示用的文字行
+
+    Args:
+        trace (dict): explain() 的回傳值
+        numbered (bool): True 時以「第一步、第二步」標示，否則以「計算過程、化簡」標示
+
+    Returns:
+        list: 每個步驟一行文字
+    """
+    lines = []
+    for index, (expression, value) in enumerate(trace['steps']):
+        if numbered:
+            prefix = f"第{_chinese_numeral(index + 1)}步："
+        else:
+            prefix = "計算過程：" if index == 0 else "化簡："
+        lines.append(f"{prefix}{expression} = {value}")
+    return lines
+
 def show_calculation_methods():
     """
     顯示所有數字的計算方法說明
     """
     c = Colors()  # 創建顏色對象以簡化使用
     
+    def print_trace(trace):
+        # 與 GUI 共用 explain() 產生的計算過程
+        for index, (expression, value) in enumerate(trace['steps']):
+            prefix = f"{c.YELLOW}   計算過程：{c.END}" if index == 0 else "             "
+            print(f"{prefix}{expression} = {value}")
+    
     print(f"\n{c.BOLD}" + "="*70 + f"{c.END}")
     print(f"{c.HEADER}計算方法詳細說明{c.END}")
     print(f"{c.BOLD}" + "="*70 + f"{c.END}")
@@ -595,52 +1412,56 @@ def show_calculation_methods():
     print(f"{c.CYAN}   計算方法：{c.END}將出生年月日的所有數字相加，重複相加直到得到個位數")
     print(f"{c.GREEN}   驗證範例：{c.END}")
     print("   出生日期：19900101")
-    print(f"{c.YELLOW}   計算過程：{c.END}1+9+9+0+0+1+0+1 = 21")
-    print("             2+1 = 3")
-    print(f"{c.RED}   結果：{c.END}生命靈數為 3")
+    trace = explain("19900101", 'life_number')
+    print_trace(trace)
+    print(f"{c.RED}   結果：{c.END}生命靈數為 {trace['result']}")
     
     print(f"\n{c.BOLD}【紫微靈動數】{c.END}")
     print(f"{c.BLUE}1. 主星數：{c.END}")
     print(f"{c.CYAN}   計算方法：{c.END}將出生年份的數字相加直到得到個位數")
     print(f"{c.GREEN}   驗證範例：{c.END}")
     print("   出生年份：1990")
-    print(f"{c.YELLOW}   計算過程：{c.END}1+9+9+0 = 19")
-    print("             1+9 = 10")
-    print("             1+0 = 1")
-    print(f"{c.RED}   結果：{c.END}主星數為 1")
+    trace = explain("19900101", 'ziwei_main')
+    print_trace(trace)
+    print(f"{c.RED}   結果：{c.END}主星數為 {trace['result']}")
     
     print(f"\n{c.BLUE}2. 副星數：{c.END}")
     print(f"{c.CYAN}   計算方法：{c.END}將出生月份和日期相乘後化簡至個位數")
     print(f"{c.GREEN}   驗證範例：{c.END}")
     print("   出生月日：0101（1月1日）")
-    print(f"{c.YELLOW}   計算過程：{c.END}1 × 1 = 1")
-    print(f"{c.RED}   結果：{c.END}副星數為 1")
+    trace = explain("19900101", 'ziwei_sub')
+    print_trace(trace)
+    print(f"{c.RED}   結果：{c.END}副星數為 {trace['result']}")
     
     print(f"\n{c.BLUE}3. 命宮數：{c.END}")
     print(f"{c.CYAN}   計算方法：{c.END}主星數加副星數後化簡至個位數")
     print(f"{c.GREEN}   驗證範例：{c.END}")
-    print(f"{c.YELLOW}   計算過程：{c.END}1 + 1 = 2")
-    print(f"{c.RED}   結果：{c.END}命宮數為 2")
+    trace = explain("19900101", 'ziwei_destiny')
+    print_trace(trace)
+    print(f"{c.RED}   結果：{c.END}命宮數為 {trace['result']}")
     
     print(f"\n{c.BOLD}【塔羅牌計算】{c.END}")
     print(f"{c.CYAN}所有塔羅牌數字需要化簡至1-22之間{c.END}")
     print(f"{c.BLUE}1. 生命塔羅：{c.END}")
     print(f"{c.CYAN}   計算方法：{c.END}出生年月日所有數字相加")
     print(f"{c.GREEN}   驗證範例：{c.END}19900101")
-    print(f"{c.YELLOW}   計算過程：{c.END}1+9+9+0+0+1+0+1 = 21")
-    print(f"{c.RED}   結果：{c.END}生命塔羅為 21 號牌（世界）")
+    trace = explain("19900101", 'life_tarot')
+    print_trace(trace)
+    print(f"{c.RED}   結果：{c.END}生命塔羅為 {trace['result']} 號牌（{get_tarot_card(trace['result'])[0]}）")
     
     print(f"\n{c.BLUE}2. 靈魂塔羅：{c.END}")
     print(f"{c.CYAN}   計算方法：{c.END}只計算月份和日期的數字總和")
     print(f"{c.GREEN}   驗證範例：{c.END}19900101 中的 0101")
-    print(f"{c.YELLOW}   計算過程：{c.END}0+1+0+1 = 2")
-    print(f"{c.RED}   結果：{c.END}靈魂塔羅為 2 號牌（女祭司）")
+    trace = explain("19900101", 'soul_tarot')
+    print_trace(trace)
+    print(f"{c.RED}   結果：{c.END}靈魂塔羅為 {trace['result']} 號牌（{get_tarot_card(trace['result'])[0]}）")
     
     print(f"\n{c.BLUE}3. 天賦塔羅：{c.END}")
     print(f"{c.CYAN}   計算方法：{c.END}年份後兩位加上日期的數字總和")
     print(f"{c.GREEN}   驗證範例：{c.END}1990年01月01日")
-    print(f"{c.YELLOW}   計算過程：{c.END}9+0+0+1 = 10")
-    print(f"{c.RED}   結果：{c.END}天賦塔羅為 10 號牌（命運之輪）")
+    trace = explain("19900101", 'talent_tarot')
+    print_trace(trace)
+    print(f"{c.RED}   結果：{c.END}天賦塔羅為 {trace['result']} 號牌（{get_tarot_card(trace['result'])[0]}）")
     
     print(f"\n{c.BOLD}【流年計算】{c.END}")
     print(f"{c.BLUE}1. 流年數字：{c.END}")
@@ -648,18 +1469,18 @@ def show_calculation_methods():
     print(f"{c.GREEN}   驗證範例：{c.END}")
     print("   出生日期：19790619")
     print(f"{c.YELLOW}   目標年份：{c.END}2025")
-    print(f"{c.YELLOW}   計算過程：{c.END}2+0+2+5+0+6+1+9 = 25")
-    print("             2+5 = 7")
-    print(f"{c.RED}   結果：{c.END}2025年的流年數字為 7")
+    trace = explain("19790619", 'year_number', 2025)
+    print_trace(trace)
+    print(f"{c.RED}   結果：{c.END}2025年的流年數字為 {trace['result']}")
     
     print(f"\n{c.BLUE}2. 流年塔羅：{c.END}")
     print(f"{c.CYAN}   計算方法：{c.END}將完整出生年月日和目標年份的數字相加後化簡至22以內")
     print(f"{c.GREEN}   驗證範例：{c.END}")
     print("   出生日期：19790619")
     print(f"{c.YELLOW}   目標年份：{c.END}2025")
-    print(f"{c.YELLOW}   計算過程：{c.END}1+9+7+9+0+6+1+9+2+0+2+5 = 51")
-    print("             5+1 = 6")
-    print(f"{c.RED}   結果：{c.END}2025年的流年塔羅為 6 號牌（戀人）")
+    trace = explain("19790619", 'year_tarot', 2025)
+    print_trace(trace)
+    print(f"{c.RED}   結果：{c.END}2025年的流年塔羅為 {trace['result']} 號牌（{get_tarot_card(trace['result'])[0]}）")
     
     print(f"\n{c.BOLD}註：{c.END}")
     print(f"{c.CYAN}1.「化簡至個位數」{c.END}指重複將數字相加直到得到1-9的數字")
@@ -681,8 +1502,111 @@ def supports_color():
     
     return supported_platform and is_a_tty
 
+class LatencyTracer:
+    """
+    GUI 延遲追蹤（預設關閉，設定環境變數 LIFE_NUMBER_TRACE=1 啟用）
+    
+    以 start/lap/finish 記錄一次操作中每個階段的耗時，finish 之後再量測 Tk 處理完
+    重繪等閒置工作的時間（paint）；並定期排程 after 回呼，回呼延遲超過門檻即視為事件迴圈停頓。
+    """
+    def __init__(self, enabled=False, stall_threshold_ms=100, log=None):
+        self.enabled = enabled
+        self.stall_threshold = stall_threshold_ms / 1000
+        self.log = log or (lambda message: print(f"[trace] {message}", file=sys.stderr))
+        self.stats = {}           # 「操作/階段」 -> [次數, 總時間, 最長時間]
+        self.stalls = []          # 每次停頓的秒數
+        self.last_trace = []      # 最近一次操作的 [(階段, 秒數), ...]
+        self.listeners = []       # 每次操作結束後呼叫 listener(tracer)
+        self._action = None
+        self._started = 0.0
+        self._last = 0.0
+    
+    def _record(self, name, elapsed):
+        entry = self.stats.setdefault(name, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] = max(entry[2], elapsed)
+    
+    def start(self, action):
+        """開始記錄一次操作（例如 calculate）"""
+        if not self.enabled:
+            return
+        self._action = action
+        self._started = self._last = time.perf_counter()
+        self.last_trace = []
+    
+    def lap(self, phase):
+        """記錄從上一個階段結束到現在的耗時"""
+        if not self.enabled or self._action is None:
+            return
+        now = time.perf_counter()
+        self._record(f"{self._action}/{phase}", now - self._last)
+        self.last_trace.append((phase, now - self._last))
+        self._last = now
+    
+    def finish(self, root=None):
+        """
+        結束目前的操作並輸出紀錄
+        
+        傳入 root 時，會在 Tk 處理完目前排定的閒置工作（重繪）後再記錄 paint 階段。
+        """
+        if not self.enabled or self._action is None:
+            return
+        action, started = self._action, self._started
+        self._action = None
+        self._record(f"{action}/total", time.perf_counter() - started)
+        
+        def report():
+            paint = time.perf_counter() - self._last
+            self._record(f"{action}/paint", paint)
+            trace = self.last_trace + [('paint', paint)]
+            self.log(f"{action}: " + ", ".join(f"{phase}={seconds * 1000:.1f}ms" for phase, seconds in trace))
+            for listener in self.listeners:
+                listener(self)
+        
+        if root is None:
+            report()
+        else:
+            root.after_idle(report)
+    
+    def watch(self, root, interval_ms=20):
+        """定期檢查 Tk 事件迴圈是否停頓"""
+        if not self.enabled:
+            return
+        interval = interval_ms / 1000
+        expected = [time.perf_counter() + interval]
+        
+        def tick():
+            now = time.perf_counter()
+            late = now - expected[0]
+            if late > self.stall_threshold:
+                self.stalls.append(late)
+                self.log(f"事件迴圈停頓 {late * 1000:.1f}ms")
+            expected[0] = now + interval
+            root.after(interval_ms, tick)
+        
+        root.after(interval_ms, tick)
+    
+    def summary(self):
+        """
+        彙總所有紀錄
+        
+        Returns:
+            list: 每個階段一行的文字
+        """
+        lines = [f"{'階段':<32}{'次數':>6}{'平均(ms)':>10}{'最長(ms)':>10}"]
+        for name, (count, total, longest) in sorted(self.stats.items()):
+            lines.append(f"{name:<32}{count:>6}{total / count * 1000:>10.1f}{longest * 1000:>10.1f}")
+        longest_stall = max(self.stalls, default=0.0)
+        lines.append(f"事件迴圈停頓：{len(self.stalls)} 次"
+                     f"（門檻 {self.stall_threshold * 1000:.0f}ms，最長 {longest_stall * 1000:.1f}ms）")
+        return lines
+
+# 目標年份無效時，流年區段顯示的提示
+YEAR_PLACEHOLDER_SEGMENTS = (("請輸入有效年份（1-9999）\n\n", "process"),)
+
 class LifeNumberCalculatorGUI:
-    def __init__(self, root):
+    def __init__(self, root, tracer=None):
         self.root = root
         self.root.title("生命靈數計算器")
         self.root.geometry("1200x800")  # 加大視窗尺寸
@@ -707,6 +1631,26 @@ class LifeNumberCalculatorGUI:
         
         ttk.Button(self.input_frame, text="計算", command=self.calculate).grid(row=0, column=2, padx=10)
         
+        # 目標年份：變更時只重新計算流年數與流年塔羅
+        ttk.Label(self.input_frame, text="目標年份：").grid(row=0, column=3, padx=10)
+        self.year_var = tk.StringVar(value=str(datetime.now().year))
+        self.year_spinbox = ttk.Spinbox(self.input_frame, from_=1, to=9999, width=8,
+            textvariable=self.year_var, font=('微軟正黑體', 14))
+        self.year_spinbox.grid(row=0, column=4, padx=10)
+        self.year_spinbox.bind("<MouseWheel>", self.scroll_year)
+        self.year_spinbox.bind("<Button-4>", self.scroll_year)
+        self.year_spinbox.bind("<Button-5>", self.scroll_year)
+        self.year_var.trace_add("write", lambda *args: self.update_year_fields())
+        
+        # 農曆輸入：勾選後輸入的日期視為農曆，先換算成國曆再計算
+        self.lunar_input_var = tk.BooleanVar(value=False)
+        self.leap_month_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.input_frame, text="農曆", variable=self.lunar_input_var).grid(row=0, column=5, padx=5)
+        ttk.Checkbutton(self.input_frame, text="閏月", variable=self.leap_month_var).grid(row=0, column=6, padx=5)
+        
+        # 上一次計算的生日與可重複使用的數字和
+        self.year_cache = None
+        
         # 結果顯示區域
         self.result_frame = ttk.Frame(self.main_frame)
         self.result_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -791,6 +1735,40 @@ class LifeNumberCalculatorGUI:
         self.grid_text.tag_configure("process", foreground="white", background="#2F4F4F")
         self.grid_text.tag_configure("result", foreground="#FF4500", font=('微軟正黑體', 14, 'bold'))
         self.grid_text.tag_configure("meaning", foreground="#CD853F", font=('微軟正黑體', 14))
+        
+        # 延遲追蹤：啟用時可按 F12 開啟隱藏的除錯面板
+        self.tracer = tracer or LatencyTracer()
+        self.debug_panel = None
+        if self.tracer.enabled:
+            self.tracer.watch(self.root)
+            self.tracer.listeners.append(lambda tracer: self.refresh_debug_panel())
+            self.root.bind("<F12>", lambda event: self.toggle_debug_panel())
+    
+    def toggle_debug_panel(self):
+        """顯示或隱藏延遲追蹤面板"""
+        if self.debug_panel is None:
+            self.debug_panel = tk.Toplevel(self.root)
+            self.debug_panel.title("延遲追蹤")
+            self.debug_panel.protocol("WM_DELETE_WINDOW", self.debug_panel.withdraw)
+            self.debug_text = scrolledtext.ScrolledText(self.debug_panel, width=70, height=25,
+                font=('Courier', 11))
+            self.debug_text.grid(row=0, column=0, padx=5, pady=5)
+            self.refresh_debug_panel()
+        elif self.debug_panel.state() == 'withdrawn':
+            self.debug_panel.deiconify()
+            self.refresh_debug_panel()
+        else:
+            self.debug_panel.withdraw()
+    
+    def refresh_debug_panel(self):
+        """以最近一次操作與彙總資料更新除錯面板"""
+        if self.debug_panel is None or self.debug_panel.state() == 'withdrawn':
+            return
+        self.debug_text.delete(1.0, tk.END)
+        self.debug_text.insert(tk.END, "最近一次操作\n")
+        for phase, seconds in self.tracer.last_trace:
+            self.debug_text.insert(tk.END, f"  {phase:<24}{seconds * 1000:>10.1f}ms\n")
+        self.debug_text.insert(tk.END, "\n" + "\n".join(self.tracer.summary()) + "\n")
     
     def draw_grid(self, grid_data):
         """繪製九宮格"""
@@ -828,81 +1806,178 @@ class LifeNumberCalculatorGUI:
                 justify=tk.CENTER
             )
     
+    def insert_trace(self, text_widget, trace, numbered=False):
+        """將 explain() 產生的計算過程寫入文本區域"""
+        for line in format_trace_steps(trace, numbered):
+            text_widget.insert(tk.END, f"{line}\n", "process")
+    
+    def get_target_year(self):
+        """讀取目標年份，無效時回傳 None"""
+        return normalize_year(self.year_var.get())[0]
+    
+    def scroll_year(self, event):
+        """以滑鼠滾輪快速切換目標年份"""
+        year = self.get_target_year()
+        if year is None:
+            return "break"
+        step = 1 if getattr(event, 'delta', 0) > 0 or getattr(event, 'num', None) == 4 else -1
+        self.year_var.set(str(min(9999, max(1, year + step))))
+        return "break"
+    
+    def replace_span(self, text_widget, span_tag, segments):
+        """
+        以新內容取代文本區域中帶有 span_tag 的區段
+        
+        區段不存在時（第一次計算）則附加在最後。
+        segments 為 [(文字, 樣式標籤), ...]。
+        """
+        ranges = text_widget.tag_ranges(span_tag)
+        if ranges:
+            index = text_widget.index(ranges[0])
+            text_widget.delete(ranges[0], ranges[-1])
+        else:
+            index = text_widget.index(tk.END + "-1c")
+        args = []
+        for text, tag in segments:
+            args.extend((text, (tag, span_tag)))
+        text_widget.insert(index, *args)
+    
+    def render_year_number(self):
+        """計算並顯示目標年份的流年數"""
+        year = self.get_target_year()
+        cache = self.year_cache
+        if cache is None:
+            return
+        if year is None:
+            # 年份無效時仍在原位置建立區段，之後修正年份才會就地取代
+            self.replace_span(self.life_text, "year_number_span", YEAR_PLACEHOLDER_SEGMENTS)
+            return
+        year_number = calculate_year_number_from_sum(cache['month_day_sum'], year)
+        segments = [(f"目標年份：{year}\n", "process")]
+        segments += [(f"{line}\n", "process")
+            for line in format_trace_steps(explain_year_from_sum('year_number', cache['month_day_sum'], year))]
+        segments += [
+            (f"結果：流年數為 {year_number}\n", "result"),
+            (f"含義：{get_year_number_meaning(year_number)}\n\n", "meaning"),
+        ]
+        self.replace_span(self.life_text, "year_number_span", segments)
+    
+    def render_year_tarot(self):
+        """計算並顯示目標年份的流年塔羅"""
+        year = self.get_target_year()
+        cache = self.year_cache
+        if cache is None:
+            return
+        if year is None:
+            self.replace_span(self.tarot_text, "year_tarot_span", YEAR_PLACEHOLDER_SEGMENTS)
+            return
+        year_tarot = calculate_year_tarot_from_sum(cache['digit_sum'], year)
+        card, meaning = get_tarot_card(year_tarot)
+        segments = [(f"目標年份：{year}\n", "process")]
+        segments += [(f"{line}\n", "process")
+            for line in format_trace_steps(explain_year_from_sum('year_tarot', cache['digit_sum'], year))]
+        segments += [
+            (f"結果：{card}（{year_tarot}號牌）\n", "result"),
+            (f"含義：{meaning}\n\n", "meaning"),
+        ]
+        self.replace_span(self.tarot_text, "year_tarot_span", segments)
+    
+    def update_year_fields(self):
+        """目標年份變更時，只更新流年數與流年塔羅的文字區段"""
+        self.tracer.start('year_update')
+        self.render_year_number()
+        self.tracer.lap('render_year_number')
+        self.render_year_tarot()
+        self.tracer.lap('render_year_tarot')
+        self.tracer.finish(self.root)
+    
+    def read_birthdate(self):
+        """
+        讀取輸入的出生日期，勾選農曆時先換算成國曆
+        
+        Returns:
+            tuple: (國曆日期 YYYYMMDD 整數或 None, 無效原因代碼或 None)
+        """
+        if not self.lunar_input_var.get():
+            return normalize_date(self.date_entry.get())
+        try:
+            lunar = parse_lunar_date(self.date_entry.get(), self.leap_month_var.get())
+        except ValueError:
+            return None, 'lunar'
+        return lunar_to_solar(*lunar), None
+    
     def calculate(self):
         """執行計算並顯示結果"""
-        birthdate = self.date_entry.get()
+        self.tracer.start('calculate')
+        date, reason = self.read_birthdate()
+        self.tracer.lap('validate')
         
-        if not validate_date(birthdate):
-            tk.messagebox.showerror("錯誤", "請輸入有效的日期！")
+        if reason is not None:
+            self.tracer.finish(self.root)
+            tk.messagebox.showerror("錯誤", f"請輸入有效的日期！（{DATE_REJECT_REASONS[reason]}）")
             return
+        birthdate = format_birthdate(date)
             
         # 清空所有文本區域
         self.life_text.delete(1.0, tk.END)
         self.ziwei_text.delete(1.0, tk.END)
         self.tarot_text.delete(1.0, tk.END)
+        self.tracer.lap('clear')
         
-        # 計算各項數值
-        life_number = calculate_life_number(birthdate)
+        # 計算各項數值（共用的中間值只計算一次）
+        profile = compute_profile(birthdate, GUI_PROFILE_FIELDS)
+        life_number = profile['life_number']
         life_meaning = get_life_number_meaning(life_number)
         
         # 計算生命塔羅
-        life_tarot_number = calculate_life_tarot(birthdate)
+        life_tarot_number = profile['life_tarot']
         life_tarot_card, life_tarot_meaning = get_tarot_card(life_tarot_number)
         
         # 計算靈魂塔羅
-        soul_tarot_number = calculate_soul_tarot(birthdate)
+        soul_tarot_number = profile['soul_tarot']
         soul_tarot_card, soul_tarot_meaning = get_tarot_card(soul_tarot_number)
         
         # 計算天賦塔羅
-        talent_tarot_number = calculate_talent_tarot(birthdate)
+        talent_tarot_number = profile['talent_tarot']
         talent_tarot_card, talent_tarot_meaning = get_tarot_card(talent_tarot_number)
         
         # 計算先天和後天塔羅
-        innate_tarot_number = calculate_innate_tarot(birthdate)
+        innate_tarot_number = profile['innate_tarot']
         innate_tarot_card, innate_tarot_meaning = get_tarot_card(innate_tarot_number)
         
-        acquired_tarot_number = calculate_acquired_tarot(birthdate)
+        acquired_tarot_number = profile['acquired_tarot']
         acquired_tarot_card, acquired_tarot_meaning = get_tarot_card(acquired_tarot_number)
         
         # 計算人格和陰影塔羅
-        personality_tarot_number = calculate_personality_tarot(birthdate)
+        personality_tarot_number = profile['personality_tarot']
         personality_tarot_card, personality_tarot_meaning = get_tarot_card(personality_tarot_number)
         
-        shadow_tarot_number = calculate_shadow_tarot(birthdate)
+        shadow_tarot_number = profile['shadow_tarot']
         shadow_tarot_card, shadow_tarot_meaning = get_tarot_card(shadow_tarot_number)
         
-        # 計算今年的流年數字
-        current_year = datetime.now().year
-        year_number = calculate_year_number(birthdate, current_year)
-        year_meaning = get_year_number_meaning(year_number)
-        
-        # 計算明年的流年數字
-        next_year = current_year + 1
-        next_year_number = calculate_year_number(birthdate, next_year)
-        next_year_meaning = get_year_number_meaning(next_year_number)
-        
-        # 計算今年和明年的流年塔羅
-        current_year_tarot = calculate_year_tarot(birthdate, current_year)
-        current_year_tarot_card, current_year_tarot_meaning = get_tarot_card(current_year_tarot)
-        
-        next_year_tarot = calculate_year_tarot(birthdate, next_year)
-        next_year_tarot_card, next_year_tarot_meaning = get_tarot_card(next_year_tarot)
+        # 快取流年計算所需的數字和，切換年份時不必重新解析生日
+        self.year_cache = {
+            'month_day_sum': profile['month_day_sum'],
+            'digit_sum': profile['digit_sum'],
+        }
         
-        # 計算紫微靈動數
-        main_number, sub_number, destiny_number = calculate_ziwei_number(birthdate)
+        # 計算紫微靈動數（國曆與農曆）
+        main_number, sub_number, destiny_number = profile['ziwei']
+        lunar_date, lunar_ziwei = profile['lunar_date'], profile['lunar_ziwei']
         main_meaning = get_ziwei_meaning(main_number)
         sub_meaning = get_ziwei_meaning(sub_number)
         destiny_meaning = get_ziwei_meaning(destiny_number)
         
         # 計算連線數
-        innate_num, life_num, talent_num = calculate_connection_numbers(birthdate)
+        innate_num, life_num, talent_num = profile['connection']
         innate_meaning = get_connection_number_meaning(innate_num, "先天數")
         life_meaning_conn = get_connection_number_meaning(life_num, "生命數")
         talent_meaning_conn = get_connection_number_meaning(talent_num, "天賦數")
         
         # 計算星座數
-        zodiac_number, zodiac_name = calculate_zodiac_number(birthdate)
+        zodiac_number, zodiac_name = profile['zodiac']
         zodiac_meaning = get_zodiac_meaning(zodiac_number)
+        self.tracer.lap('compute_profile')
         
         # 更新生命靈數和連線數顯示
         self.life_text.delete(1.0, tk.END)
@@ -913,12 +1988,7 @@ class LifeNumberCalculatorGUI:
         self.life_text.insert(tk.END, "將出生年月日的所有數字相加，若大於9則繼續相加直到得到個位數\n\n", "process")
         
         self.life_text.insert(tk.END, f"出生日期：{birthdate}\n", "process")
-        digits = '+'.join(birthdate)
-        total = sum(int(d) for d in birthdate)
-        self.life_text.insert(tk.END, f"第一步：{digits} = {total}\n", "process")
-        if total > 9:
-            life_number = sum(int(d) for d in str(total))
-            self.life_text.insert(tk.END, f"第二步：{'+'.join(str(total))} = {life_number}\n", "process")
+        self.insert_trace(self.life_text, explain(birthdate, 'life_number'), numbered=True)
         
         self.life_text.insert(tk.END, f"\n結果：生命靈數為 {life_number}\n", "result")
         self.life_text.insert(tk.END, f"含義：{life_meaning}\n\n", "meaning")
@@ -928,9 +1998,7 @@ class LifeNumberCalculatorGUI:
         self.life_text.insert(tk.END, "◆ 計算方式\n", "subtitle")
         self.life_text.insert(tk.END, "當年年份數字與出生月日相加，若大於9則繼續相加\n\n", "process")
         
-        self.life_text.insert(tk.END, f"當前年份：{current_year}\n", "process")
-        self.life_text.insert(tk.END, f"結果：流年數為 {year_number}\n", "result")
-        self.life_text.insert(tk.END, f"含義：{year_meaning}\n\n", "meaning")
+        self.render_year_number()
         
         # 連線數部分
         self.life_text.insert(tk.END, "\n【生命靈數連線數】\n\n", "title")
@@ -938,25 +2006,26 @@ class LifeNumberCalculatorGUI:
         # 先天數
         self.life_text.insert(tk.END, "1. 先天數\n", "connection")
         self.life_text.insert(tk.END, "◆ 計算方式：出生日期中的「日」的數字相加\n", "subtitle")
-        self.life_text.insert(tk.END, f"計算過程：{birthdate[6:8]} → {'+'.join(birthdate[6:8])} = {innate_num}\n", "process")
+        self.insert_trace(self.life_text, explain(birthdate, 'connection_innate'))
         self.life_text.insert(tk.END, f"含義：{innate_meaning}\n\n", "meaning")
         
         # 生命數
         self.life_text.insert(tk.END, "2. 生命數\n", "connection")
         self.life_text.insert(tk.END, "◆ 計算方式：出生日期中的「月份」數字相加\n", "subtitle")
-        self.life_text.insert(tk.END, f"計算過程：{birthdate[4:6]} → {'+'.join(birthdate[4:6])} = {life_num}\n", "process")
+        self.insert_trace(self.life_text, explain(birthdate, 'connection_life'))
         self.life_text.insert(tk.END, f"含義：{life_meaning_conn}\n\n", "meaning")
         
         # 天賦數
         self.life_text.insert(tk.END, "3. 天賦數\n", "connection")
         self.life_text.insert(tk.END, "◆ 計算方式：先天數與生命數相加\n", "subtitle")
-        self.life_text.insert(tk.END, f"計算過程：{innate_num} + {life_num} = {talent_num}\n", "process")
+        self.insert_trace(self.life_text, explain(birthdate, 'connection_talent'))
         self.life_text.insert(tk.END, f"含義：{talent_meaning_conn}\n\n", "meaning")
         
         # 星座數
         self.life_text.insert(tk.END, "4. 星座數\n", "connection")
         self.life_text.insert(tk.END, f"星座：{zodiac_name}（{zodiac_number}）\n", "process")
         self.life_text.insert(tk.END, f"含義：{zodiac_meaning}\n\n", "meaning")
+        self.tracer.lap('render_life_text')
         
         # 紫微靈動數顯示
         self.ziwei_text.insert(tk.END, "【紫微靈動數計算】\n\n", "title")
@@ -965,8 +2034,7 @@ class LifeNumberCalculatorGUI:
         self.ziwei_text.insert(tk.END, "1. 主星數\n", "subtitle")
         self.ziwei_text.insert(tk.END, "◆ 計算方式：年份數字相加化簡\n", "process")
         self.ziwei_text.insert(tk.END, f"年份：{birthdate[0:4]}\n", "process")
-        year_digits = '+'.join(birthdate[0:4])
-        self.ziwei_text.insert(tk.END, f"計算過程：{year_digits} = {main_number}\n", "process")
+        self.insert_trace(self.ziwei_text, explain(birthdate, 'ziwei_main'))
         self.ziwei_text.insert(tk.END, f"結果：主星數為 {main_number}\n", "result")
         self.ziwei_text.insert(tk.END, f"含義：{main_meaning}\n\n", "meaning")
         
@@ -974,31 +2042,43 @@ class LifeNumberCalculatorGUI:
         self.ziwei_text.insert(tk.END, "2. 副星數\n", "subtitle")
         self.ziwei_text.insert(tk.END, "◆ 計算方式：月份與日期相乘後化簡\n", "process")
         self.ziwei_text.insert(tk.END, f"月份：{birthdate[4:6]}\n日期：{birthdate[6:8]}\n", "process")
-        self.ziwei_text.insert(tk.END, f"計算過程：{birthdate[4:6]} × {birthdate[6:8]} = {sub_number}\n", "process")
+        self.insert_trace(self.ziwei_text, explain(birthdate, 'ziwei_sub'))
         self.ziwei_text.insert(tk.END, f"結果：副星數為 {sub_number}\n", "result")
         self.ziwei_text.insert(tk.END, f"含義：{sub_meaning}\n\n", "meaning")
         
         # 命宮數
         self.ziwei_text.insert(tk.END, "3. 命宮數\n", "subtitle")
         self.ziwei_text.insert(tk.END, "◆ 計算方式：主星數與副星數相加\n", "process")
-        self.ziwei_text.insert(tk.END, f"計算過程：{main_number} + {sub_number} = {destiny_number}\n", "process")
+        self.insert_trace(self.ziwei_text, explain(birthdate, 'ziwei_destiny'))
         self.ziwei_text.insert(tk.END, f"結果：命宮數為 {destiny_number}\n", "result")
         self.ziwei_text.insert(tk.END, f"含義：{destiny_meaning}\n\n", "meaning")
         
+        # 農曆紫微靈動數
+        self.ziwei_text.insert(tk.END, "4. 農曆紫微靈動數\n", "subtitle")
+        self.ziwei_text.insert(tk.END, "◆ 計算方式：改用農曆的年、月、日，依相同規則計算\n", "process")
+        if lunar_ziwei is None:
+            self.ziwei_text.insert(tk.END, "農曆換算只支援 1900-2100 年\n\n", "process")
+        else:
+            lunar_main, lunar_sub, lunar_destiny = lunar_ziwei
+            self.ziwei_text.insert(tk.END, f"農曆：{format_lunar_date(lunar_date)}\n", "process")
+            self.ziwei_text.insert(tk.END, f"結果：主星數 {lunar_main}、副星數 {lunar_sub}、命宮數 {lunar_destiny}\n", "result")
+            self.ziwei_text.insert(tk.END, f"含義：{get_ziwei_meaning(lunar_destiny)}\n\n", "meaning")
+        self.tracer.lap('render_ziwei_text')
+        
         # 塔羅牌顯示
         self.tarot_text.insert(tk.END, "【塔羅牌計算】\n\n", "title")
         
         # 生命塔羅
         self.tarot_text.insert(tk.END, "1. 生命塔羅\n", "subtitle")
         self.tarot_text.insert(tk.END, "◆ 計算方式：出生年月日所有數字相加\n", "process")
-        self.tarot_text.insert(tk.END, f"計算過程：{'+'.join(birthdate)} = {life_tarot_number}\n", "process")
+        self.insert_trace(self.tarot_text, explain(birthdate, 'life_tarot'))
         self.tarot_text.insert(tk.END, f"結果：{life_tarot_card}（{life_tarot_number}號牌）\n", "result")
         self.tarot_text.insert(tk.END, f"含義：{life_tarot_meaning}\n\n", "meaning")
         
         # 靈魂塔羅
         self.tarot_text.insert(tk.END, "2. 靈魂塔羅\n", "subtitle")
         self.tarot_text.insert(tk.END, "◆ 計算方式：月份和日期數字相加\n", "process")
-        self.tarot_text.insert(tk.END, f"計算過程：{'+'.join(birthdate[4:8])} = {soul_tarot_number}\n", "process")
+        self.insert_trace(self.tarot_text, explain(birthdate, 'soul_tarot'))
         self.tarot_text.insert(tk.END, f"結果：{soul_tarot_card}（{soul_tarot_number}號牌）\n", "result")
         self.tarot_text.insert(tk.END, f"含義：{soul_tarot_meaning}\n\n", "meaning")
         
@@ -1006,30 +2086,21 @@ class LifeNumberCalculatorGUI:
         self.tarot_text.insert(tk.END, "3. 天賦塔羅\n", "subtitle")
         self.tarot_text.insert(tk.END, "◆ 計算方式：年份後兩位加上日期的數字相加\n", "process")
         self.tarot_text.insert(tk.END, f"年份後兩位：{birthdate[2:4]}\n日期：{birthdate[6:8]}\n", "process")
-        self.tarot_text.insert(tk.END, f"計算過程：{'+'.join(birthdate[2:4])}+{'+'.join(birthdate[6:8])} = {talent_tarot_number}\n", "process")
+        self.insert_trace(self.tarot_text, explain(birthdate, 'talent_tarot'))
         self.tarot_text.insert(tk.END, f"結果：{talent_tarot_card}（{talent_tarot_number}號牌）\n", "result")
         self.tarot_text.insert(tk.END, f"含義：{talent_tarot_meaning}\n\n", "meaning")
         
         # 先天塔羅
         self.tarot_text.insert(tk.END, "4. 先天塔羅\n", "subtitle")
         self.tarot_text.insert(tk.END, "◆ 計算方式：月份與日期相乘後化簡\n", "process")
-        month = int(birthdate[4:6])
-        day = int(birthdate[6:8])
-        product = month * day
-        self.tarot_text.insert(tk.END, f"計算過程：{month} × {day} = {product}\n", "process")
-        if product > 22:
-            self.tarot_text.insert(tk.END, f"化簡：{'+'.join(str(product))} = {innate_tarot_number}\n", "process")
+        self.insert_trace(self.tarot_text, explain(birthdate, 'innate_tarot'))
         self.tarot_text.insert(tk.END, f"結果：{innate_tarot_card}（{innate_tarot_number}號牌）\n", "result")
         self.tarot_text.insert(tk.END, f"含義：{innate_tarot_meaning}\n\n", "meaning")
         
         # 後天塔羅
         self.tarot_text.insert(tk.END, "5. 後天塔羅\n", "subtitle")
         self.tarot_text.insert(tk.END, "◆ 計算方式：年份與月份相乘後化簡\n", "process")
-        year = int(birthdate[0:4])
-        product = year * month
-        self.tarot_text.insert(tk.END, f"計算過程：{year} × {month} = {product}\n", "process")
-        if product > 22:
-            self.tarot_text.insert(tk.END, f"化簡：{'+'.join(str(product))} = {acquired_tarot_number}\n", "process")
+        self.insert_trace(self.tarot_text, explain(birthdate, 'acquired_tarot'))
         self.tarot_text.insert(tk.END, f"結果：{acquired_tarot_card}（{acquired_tarot_number}號牌）\n", "result")
         self.tarot_text.insert(tk.END, f"含義：{acquired_tarot_meaning}\n\n", "meaning")
         
@@ -1039,57 +2110,40 @@ class LifeNumberCalculatorGUI:
         first_digit = birthdate[0]
         last_digit = birthdate[3]
         self.tarot_text.insert(tk.END, f"年份第一位：{first_digit}\n年份最後一位：{last_digit}\n", "process")
-        self.tarot_text.insert(tk.END, f"計算過程：{first_digit} + {last_digit} = {personality_tarot_number}\n", "process")
+        self.insert_trace(self.tarot_text, explain(birthdate, 'personality_tarot'))
         self.tarot_text.insert(tk.END, f"結果：{personality_tarot_card}（{personality_tarot_number}號牌）\n", "result")
         self.tarot_text.insert(tk.END, f"含義：{personality_tarot_meaning}\n\n", "meaning")
         
         # 陰影塔羅
         self.tarot_text.insert(tk.END, "7. 陰影塔羅\n", "subtitle")
         self.tarot_text.insert(tk.END, "◆ 計算方式：月份與年份中間兩位相乘後化簡\n", "process")
-        year_middle = int(birthdate[1:3])
-        product = month * year_middle
-        self.tarot_text.insert(tk.END, f"月份：{month}\n年份中間兩位：{year_middle}\n", "process")
-        self.tarot_text.insert(tk.END, f"計算過程：{month} × {year_middle} = {product}\n", "process")
-        if product > 22:
-            self.tarot_text.insert(tk.END, f"化簡：{'+'.join(str(product))} = {shadow_tarot_number}\n", "process")
+        self.tarot_text.insert(tk.END, f"月份：{int(birthdate[4:6])}\n年份中間兩位：{int(birthdate[1:3])}\n", "process")
+        self.insert_trace(self.tarot_text, explain(birthdate, 'shadow_tarot'))
         self.tarot_text.insert(tk.END, f"結果：{shadow_tarot_card}（{shadow_tarot_number}號牌）\n", "result")
         self.tarot_text.insert(tk.END, f"含義：{shadow_tarot_meaning}\n\n", "meaning")
         
-        # 在塔羅牌顯示區域添加配牌說明
-        self.tarot_text.insert(tk.END, "【塔羅牌配牌解讀】\n\n", "title")
+        # 流年塔羅
+        self.tarot_text.insert(tk.END, "8. 流年塔羅\n", "subtitle")
+        self.tarot_text.insert(tk.END, "◆ 計算方式：完整出生年月日和目標年份的數字相加\n", "process")
+        self.render_year_tarot()
         
-        # 主要配牌組合
-        self.tarot_text.insert(tk.END, "◆ 生命塔羅 + 靈魂塔羅\n", "subtitle")
-        self.tarot_text.insert(tk.END, f"組合：{life_tarot_card} + {soul_tarot_card}\n", "process")
-        self.tarot_text.insert(tk.END, "代表：顯示您目前生命歷程中的主要課題和靈魂學習\n\n", "meaning")
-        
-        # 天賦配牌組合
-        self.tarot_text.insert(tk.END, "◆ 天賦塔羅 + 先天塔羅\n", "subtitle")
-        self.tarot_text.insert(tk.END, f"組合：{talent_tarot_card} + {innate_tarot_card}\n", "process")
-        self.tarot_text.insert(tk.END, "代表：展現您與生俱來的能力和潛在天賦\n\n", "meaning")
-        
-        # 成長配牌組合
-        self.tarot_text.insert(tk.END, "◆ 後天塔羅 + 人格塔羅\n", "subtitle")
-        self.tarot_text.insert(tk.END, f"組合：{acquired_tarot_card} + {personality_tarot_card}\n", "process")
-        self.tarot_text.insert(tk.END, "代表：顯示您在成長過程中發展出的特質\n\n", "meaning")
-        
-        # 整體發展方向
-        self.tarot_text.insert(tk.END, "◆ 生命方向配牌\n", "subtitle")
-        self.tarot_text.insert(tk.END, "生命塔羅 → 靈魂塔羅 → 天賦塔羅\n", "process")
-        self.tarot_text.insert(tk.END, f"{life_tarot_card} → {soul_tarot_card} → {talent_tarot_card}\n", "process")
-        self.tarot_text.insert(tk.END, "代表：顯示您的生命發展軌跡和方向\n\n", "meaning")
-        
-        # 內在成長配牌
-        self.tarot_text.insert(tk.END, "◆ 內在成長配牌\n", "subtitle")
-        self.tarot_text.insert(tk.END, "先天塔羅 → 後天塔羅 → 人格塔羅\n", "process")
-        self.tarot_text.insert(tk.END, f"{innate_tarot_card} → {acquired_tarot_card} → {personality_tarot_card}\n", "process")
-        self.tarot_text.insert(tk.END, "代表：展現您的個人成長和轉變過程\n\n", "meaning")
-        
-        # 陰影整合配牌
-        self.tarot_text.insert(tk.END, "◆ 陰影整合配牌\n", "subtitle")
-        self.tarot_text.insert(tk.END, "人格塔羅 → 陰影塔羅 → 靈魂塔羅\n", "process")
-        self.tarot_text.insert(tk.END, f"{personality_tarot_card} → {shadow_tarot_card} → {soul_tarot_card}\n", "process")
-        self.tarot_text.insert(tk.END, "代表：顯示您需要整合的陰影面向和靈性成長\n\n", "meaning")
+        # 在塔羅牌顯示區域添加配牌說明（解讀、轉變難易與能量總和皆由預先建好的配牌表查得）
+        self.tarot_text.insert(tk.END, "【塔羅牌配牌解讀】\n\n", "title")
+        for (title, fields, description), pairing in zip(TAROT_PAIRINGS, profile['tarot_pairings']):
+            # 三張牌的項目有兩個差距與轉變難易
+            differences = pairing.get('differences', (pairing.get('difference'),))
+            transitions = pairing.get('transitions', (pairing.get('transition'),))
+            self.tarot_text.insert(tk.END, f"◆ {title}\n", "subtitle")
+            if len(fields) == 2:
+                self.tarot_text.insert(tk.END, f"組合：{' + '.join(pairing['names'])}\n", "process")
+            else:
+                self.tarot_text.insert(tk.END, " → ".join(EXPLAINERS[field][0] for field in fields) + "\n", "process")
+                self.tarot_text.insert(tk.END, f"{' → '.join(pairing['names'])}\n", "process")
+            self.tarot_text.insert(tk.END, f"牌號差距：{'、'.join(map(str, differences))}"
+                                           f"（轉變{'、'.join(transitions)}）\n", "process")
+            self.tarot_text.insert(tk.END, f"能量總和：{pairing['energy']}（{pairing['energy_level']}）\n", "process")
+            self.tarot_text.insert(tk.END, f"解讀：{pairing['interpretation']}\n", "result")
+            self.tarot_text.insert(tk.END, f"代表：{description}\n\n", "meaning")
         
         # 配牌解讀說明
         self.tarot_text.insert(tk.END, "\n【配牌解讀說明】\n", "title")
@@ -1099,19 +2153,20 @@ class LifeNumberCalculatorGUI:
         self.tarot_text.insert(tk.END, "4. 大阿爾卡納牌號的總和反映了整體能量強度\n", "process")
         
         # 特殊牌號組合解釋
-        if life_tarot_number == soul_tarot_number:
-            self.tarot_text.insert(tk.END, "\n★ 生命塔羅與靈魂塔羅相同：表示生命目標與靈魂使命高度一致\n", "result")
-        if talent_tarot_number == innate_tarot_number:
-            self.tarot_text.insert(tk.END, "★ 天賦塔羅與先天塔羅相同：表示天賦能力已充分展現\n", "result")
-        if acquired_tarot_number == personality_tarot_number:
-            self.tarot_text.insert(tk.END, "★ 後天塔羅與人格塔羅相同：表示個性特質已充分發展\n", "result")
+        notes = [text for (first, second), text in TAROT_NOTES if profile[first] == profile[second]]
+        if notes:
+            self.tarot_text.insert(tk.END, "\n", "result")
+        for text in notes:
+            self.tarot_text.insert(tk.END, f"★ {text}\n", "result")
+        self.tracer.lap('render_tarot_text')
     
         # 在計算方法中添加九宮格的計算和顯示
-        grid = calculate_life_grid(birthdate)
-        strengths, weaknesses, connections = analyze_life_grid(grid)
+        grid = profile['life_grid']
+        strengths, weaknesses, connections = profile['grid_analysis']
         
         # 繪製九宮格
         self.draw_grid(grid)
+        self.tracer.lap('draw_grid')
         
         # 顯示九宮格分析
         self.grid_text.delete(1.0, tk.END)
@@ -1147,11 +2202,19 @@ class LifeNumberCalculatorGUI:
         self.grid_text.insert(tk.END, "2. 空缺的宮位需要多加發展\n", "process")
         self.grid_text.insert(tk.END, "3. 連線表示能量的流動方向\n", "process")
         self.grid_text.insert(tk.END, "4. 對角線連線具有特殊意義\n", "process")
+        self.tracer.lap('render_grid_text')
+        self.tracer.finish(self.root)
 
 def main():
     root = tk.Tk()
-    app = LifeNumberCalculatorGUI(root)
+    tracer = LatencyTracer(
+        enabled=os.environ.get('LIFE_NUMBER_TRACE') == '1',
+        stall_threshold_ms=float(os.environ.get('LIFE_NUMBER_STALL_MS', '100')),
+    )
+    app = LifeNumberCalculatorGUI(root, tracer)
     root.mainloop()
+    if tracer.enabled:
+        print("\n".join(tracer.summary()), file=sys.stderr)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
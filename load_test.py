@@ -0,0 +1,335 @@
+"""
+HTTP API 壓力測試
+
+在本機啟動 api/index.py（或以 --url 指定已啟動的服務），以指定的並行數與生日分布送出請求，
+回報吞吐量與 p50/p95/p99 延遲，並將結果存成欄位順序固定的 JSON，方便在不同版本之間 diff。
+
+兩種模式：
+    closed  固定數量的用戶端，每個用戶端收到回應後立刻送出下一個請求
+    open    依固定速率送出請求，不論前一個請求是否完成；延遲從預定送出時間起算，
+            伺服器跟不上時排隊的時間也會計入
+
+用法：
+    python load_test.py --endpoint profile --mode closed --concurrency 32 --duration 10
+    python load_test.py --endpoint batch --batch-size 100 --mode open --rate 200 --output results.json
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+LOAD_TEST_VERSION = 1
+API_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api', 'index.py')
+
+DISTRIBUTIONS = ('uniform', 'hot', 'fixed')
+
+
+def make_birthdate_source(distribution, seed=0, start_year=1900, end_year=2025, hot_dates=100):
+    """
+    建立生日產生器
+
+    Args:
+        distribution (str): 'uniform'（區間內均勻分布）、'hot'（少數熱門生日佔大部分請求）、
+                            'fixed'（每次都是同一天）
+        seed (int): 亂數種子，相同種子產生相同的序列
+        start_year (int): 起始年份
+        end_year (int): 結束年份（含）
+        hot_dates (int): hot 分布的熱門生日數
+
+    Returns:
+        function: 每次呼叫回傳一個 'YYYYMMDD'
+    """
+    rng = random.Random(seed)
+    first = date(start_year, 1, 1)
+    days = (date(end_year, 12, 31) - first).days + 1
+
+    def random_date():
+        day = first + timedelta(days=rng.randrange(days))
+        return f"{day.year:04d}{day.month:02d}{day.day:02d}"
+
+    if distribution == 'uniform':
+        return random_date
+    if distribution == 'fixed':
+        fixed = random_date()
+        return lambda: fixed
+    if distribution == 'hot':
+        # 80% 的請求落在少數熱門生日，依排名遞減（近似 Zipf）
+        hot = [random_date() for _ in range(hot_dates)]
+        weights = [1 / rank for rank in range(1, hot_dates + 1)]
+        return lambda: rng.choices(hot, weights)[0] if rng.random() < 0.8 else random_date()
+    raise ValueError(f"未知的生日分布：{distribution}")
+
+
+def percentile(sorted_values, fraction):
+    """最近秩次法的百分位數"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * fraction // 1))
+    return sorted_values[int(rank) - 1]
+
+
+class ApiClient:
+    """每個執行緒一條保持連線的 HTTP 連線"""
+
+    def __init__(self, url, year, fields):
+        parsed = urlparse(url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.prefix = parsed.path.rstrip('/')
+        self.year = year
+        self.fields = fields
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        return connection
+
+    def _request(self, method, path, body=None):
+        connection = self._connection()
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        try:
+            connection.request(method, path, body, headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self._local.connection = None
+            return None
+
+    def profile(self, birthdates):
+        query = f"birthdate={birthdates[0]}&year={self.year}"
+        if self.fields:
+            query += f"&fields={','.join(self.fields)}"
+        return self._request('GET', f"{self.prefix}/api/profile?{query}")
+
+    def batch(self, birthdates):
+        payload = {'birthdates': birthdates, 'year': self.year}
+        if self.fields:
+            payload['fields'] = list(self.fields)
+        return self._request('POST', f"{self.prefix}/api/profiles", json.dumps(payload).encode('utf-8'))
+
+
+def run_closed_loop(send, next_birthdates, concurrency, duration):
+    """
+    closed-loop：concurrency 個用戶端各自連續送出請求
+
+    Returns:
+        tuple: (延遲秒數串列, 錯誤數, 實際經過秒數)
+    """
+    deadline = time.perf_counter() + duration
+    lock = threading.Lock()
+    latencies, errors = [], [0]
+
+    def client():
+        local = []
+        while time.perf_counter() < deadline:
+            with lock:
+                birthdates = next_birthdates()
+            started = time.perf_counter()
+            status = send(birthdates)
+            local.append(time.perf_counter() - started)
+            if status != 200:
+                with lock:
+                    errors[0] += 1
+        with lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0], time.perf_counter() - started
+
+
+def run_open_loop(send, next_birthdates, concurrency, duration, rate):
+    """
+    open-loop：依固定速率排定送出時間，延遲從排定時間起算（避免協調遺漏）
+
+    Returns:
+        tuple: (延遲秒數串列, 錯誤數, 實際經過秒數)
+    """
+    lock = threading.Lock()
+    latencies, errors = [], [0]
+
+    def task(scheduled, birthdates):
+        status = send(birthdates)
+        elapsed = time.perf_counter() - scheduled
+        with lock:
+            latencies.append(elapsed)
+            if status != 200:
+                errors[0] += 1
+
+    started = time.perf_counter()
+    total = int(duration * rate)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for index in range(total):
+            scheduled = started + index / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(task, scheduled, next_birthdates())
+    return latencies, errors[0], time.perf_counter() - started
+
+
+def summarize(latencies, errors, elapsed, rows_per_request):
+    """整理一次測試的統計（數值皆四捨五入，方便 diff）"""
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        'requests': count,
+        'errors': errors,
+        'duration_s': round(elapsed, 3),
+        'throughput_rps': round(count / elapsed, 1) if elapsed else 0.0,
+        'profiles_per_s': round(count * rows_per_request / elapsed, 1) if elapsed else 0.0,
+        'latency_ms': {
+            'mean': round(sum(latencies) / count * 1000, 3) if count else 0.0,
+            'p50': round(percentile(latencies, 0.50) * 1000, 3),
+            'p95': round(percentile(latencies, 0.95) * 1000, 3),
+            'p99': round(percentile(latencies, 0.99) * 1000, 3),
+            'max': round(latencies[-1] * 1000, 3) if count else 0.0,
+        },
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_local_server(window_ms=1.0, max_batch=256, timeout=10.0):
+    """
+    以子行程啟動 api/index.py，等待可以連線後回傳
+
+    Returns:
+        tuple: (subprocess.Popen, 服務網址)
+    """
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, API_SCRIPT, '--port', str(port),
+         '--window-ms', str(window_ms), '--max-batch', str(max_batch)],
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("無法啟動本機 API 服務")
+
+
+def run_load_test(url, endpoint='profile', mode='closed', concurrency=16, duration=5.0, rate=100.0,
+                  distribution='uniform', batch_size=100, year=2025, fields=None, seed=0):
+    """
+    執行一次壓力測試
+
+    Returns:
+        dict: 測試設定與統計
+    """
+    client = ApiClient(url, year, fields)
+    source = make_birthdate_source(distribution, seed)
+    rows = batch_size if endpoint == 'batch' else 1
+    send = client.batch if endpoint == 'batch' else client.profile
+
+    def next_birthdates():
+        return [source() for _ in range(rows)]
+
+    if mode == 'closed':
+        latencies, errors, elapsed = run_closed_loop(send, next_birthdates, concurrency, duration)
+    else:
+        latencies, errors, elapsed = run_open_loop(send, next_birthdates, concurrency, duration, rate)
+    config = {
+        'endpoint': endpoint,
+        'mode': mode,
+        'concurrency': concurrency,
+        'duration_s': duration,
+        'rate_rps': rate if mode == 'open' else None,
+        'distribution': distribution,
+        'batch_size': rows,
+        'year': year,
+        'fields': list(fields) if fields else None,
+        'seed': seed,
+    }
+    return {'config': config, 'result': summarize(latencies, errors, elapsed, rows)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP API 壓力測試")
+    parser.add_argument('--url', help="已啟動的服務網址；省略時在本機啟動 api/index.py")
+    parser.add_argument('--endpoint', choices=('profile', 'batch', 'both'), default='both', help="測試的端點")
+    parser.add_argument('--mode', choices=('closed', 'open', 'both'), default='closed', help="closed-loop 或 open-loop")
+    parser.add_argument('--concurrency', type=int, default=16, help="並行的用戶端（或執行緒）數")
+    parser.add_argument('--duration', type=float, default=5.0, help="每個測試的秒數")
+    parser.add_argument('--rate', type=float, default=200.0, help="open-loop 每秒送出的請求數")
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS, default='uniform', help="生日分布")
+    parser.add_argument('--batch-size', type=int, default=100, help="批次端點每個請求的生日數")
+    parser.add_argument('--year', type=int, default=2025, help="流年使用的目標年份")
+    parser.add_argument('--fields', help="以逗號分隔的欄位，預設為全部")
+    parser.add_argument('--seed', type=int, default=0, help="亂數種子")
+    parser.add_argument('--window-ms', type=float, default=1.0, help="本機服務合併請求的時間窗（毫秒）")
+    parser.add_argument('--max-batch', type=int, default=256, help="本機服務每批最多的請求數")
+    parser.add_argument('--label', default='', help="寫入結果的版本標籤")
+    parser.add_argument('--output', help="結果 JSON 檔案，預設為標準輸出")
+    args = parser.parse_args(argv)
+
+    endpoints = ('profile', 'batch') if args.endpoint == 'both' else (args.endpoint,)
+    modes = ('closed', 'open') if args.mode == 'both' else (args.mode,)
+    fields = tuple(args.fields.split(',')) if args.fields else None
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_local_server(args.window_ms, args.max_batch)
+    try:
+        runs = []
+        for endpoint in endpoints:
+            for mode in modes:
+                run = run_load_test(url, endpoint, mode, args.concurrency, args.duration, args.rate,
+                                    args.distribution, args.batch_size, args.year, fields, args.seed)
+                result = run['result']
+                print(f"{endpoint}/{mode}：{result['throughput_rps']} req/s，"
+                      f"p50 {result['latency_ms']['p50']}ms、p95 {result['latency_ms']['p95']}ms、"
+                      f"p99 {result['latency_ms']['p99']}ms，錯誤 {result['errors']}", file=sys.stderr)
+                runs.append(run)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    report = {
+        'version': LOAD_TEST_VERSION,
+        'label': args.label,
+        'server': 'local' if args.url is None else args.url,
+        'python': sys.version.split()[0],
+        'cpu_count': os.cpu_count(),
+        'runs': runs,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2, sort_keys=True) + '\n'
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        sys.stdout.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+農曆與國曆互換（1900-2100）
+
+以常見的 LUNAR_INFO 壓縮表（每年一個整數）記錄每個農曆年的大小月與閏月，
+第一次換算時展開成每日查表，換算時不需要任何天文計算：
+
+    bit 16      閏月是否為大月（30 天）
+    bit 15-4    一月到十二月是否為大月，一月在 bit 15
+    bit 3-0     閏哪一個月，0 表示沒有閏月
+
+農曆日期以 (年, 月, 日, 是否閏月) 表示；國曆日期以整數 YYYYMMDD 表示（與 normalize_date 相同）。
+"""
+from array import array
+from datetime import date
+from functools import lru_cache
+
+LUNAR_INFO = (
+    0x04bd8, 0x04ae0, 0x0a570, 0x054d5, 0x0d260, 0x0d950, 0x16554, 0x056a0, 0x09ad0, 0x055d2,  # 1900-1909
+    0x04ae0, 0x0a5b6, 0x0a4d0, 0x0d250, 0x1d255, 0x0b540, 0x0d6a0, 0x0ada2, 0x095b0, 0x14977,  # 1910-1919
+    0x04970, 0x0a4b0, 0x0b4b5, 0x06a50, 0x06d40, 0x1ab54, 0x02b60, 0x09570, 0x052f2, 0x04970,  # 1920-1929
+    0x06566, 0x0d4a0, 0x0ea50, 0x16a95, 0x05ad0, 0x02b60, 0x186e3, 0x092e0, 0x1c8d7, 0x0c950,  # 1930-1939
+    0x0d4a0, 0x1d8a6, 0x0b550, 0x056a0, 0x1a5b4, 0x025d0, 0x092d0, 0x0d2b2, 0x0a950, 0x0b557,  # 1940-1949
+    0x06ca0, 0x0b550, 0x15355, 0x04da0, 0x0a5b0, 0x14573, 0x052b0, 0x0a9a8, 0x0e950, 0x06aa0,  # 1950-1959
+    0x0aea6, 0x0ab50, 0x04b60, 0x0aae4, 0x0a570, 0x05260, 0x0f263, 0x0d950, 0x05b57, 0x056a0,  # 1960-1969
+    0x096d0, 0x04dd5, 0x04ad0, 0x0a4d0, 0x0d4d4, 0x0d250, 0x0d558, 0x0b540, 0x0b6a0, 0x195a6,  # 1970-1979
+    0x095b0, 0x049b0, 0x0a974, 0x0a4b0, 0x0b27a, 0x06a50, 0x06d40, 0x0af46, 0x0ab60, 0x09570,  # 1980-1989
+    0x04af5, 0x04970, 0x064b0, 0x074a3, 0x0ea50, 0x06b58, 0x05ac0, 0x0ab60, 0x096d5, 0x092e0,  # 1990-1999
+    0x0c960, 0x0d954, 0x0d4a0, 0x0da50, 0x07552, 0x056a0, 0x0abb7, 0x025d0, 0x092d0, 0x0cab5,  # 2000-2009
+    0x0a950, 0x0b4a0, 0x0baa4, 0x0ad50, 0x055d9, 0x04ba0, 0x0a5b0, 0x15176, 0x052b0, 0x0a930,  # 2010-2019
+    0x07954, 0x06aa0, 0x0ad50, 0x05b52, 0x04b60, 0x0a6e6, 0x0a4e0, 0x0d260, 0x0ea65, 0x0d530,  # 2020-2029
+    0x05aa0, 0x076a3, 0x096d0, 0x04afb, 0x04ad0, 0x0a4d0, 0x1d0b6, 0x0d250, 0x0d520, 0x0dd45,  # 2030-2039
+    0x0b5a0, 0x056d0, 0x055b2, 0x049b0, 0x0a577, 0x0a4b0, 0x0aa50, 0x1b255, 0x06d20, 0x0ada0,  # 2040-2049
+    0x14b63, 0x09370, 0x049f8, 0x04970, 0x064b0, 0x168a6, 0x0ea50, 0x06b20, 0x1a6c4, 0x0aae0,  # 2050-2059
+    0x092e0, 0x0d2e3, 0x0c960, 0x0d557, 0x0d4a0, 0x0da50, 0x05d55, 0x056a0, 0x0a6d0, 0x055d4,  # 2060-2069
+    0x052d0, 0x0a9b8, 0x0a950, 0x0b4a0, 0x0b6a6, 0x0ad50, 0x055a0, 0x0aba4, 0x0a5b0, 0x052b0,  # 2070-2079
+    0x0b273, 0x06930, 0x07337, 0x06aa0, 0x0ad50, 0x14b55, 0x04b60, 0x0a570, 0x054e4, 0x0d160,  # 2080-2089
+    0x0e968, 0x0d520, 0x0daa0, 0x16aa6, 0x056d0, 0x04ae0, 0x0a9d4, 0x0a2d0, 0x0d150, 0x0f252,  # 2090-2099
+    0x0d520,                                                                                    # 2100
+)
+
+LUNAR_FIRST_YEAR = 1900
+LUNAR_LAST_YEAR = LUNAR_FIRST_YEAR + len(LUNAR_INFO) - 1
+
+# 農曆 1900 年正月初一為國曆 1900-01-31
+_EPOCH = date(1900, 1, 31).toordinal()
+
+LUNAR_MONTH_NAMES = ("正", "二", "三", "四", "五", "六", "七", "八", "九", "十", "冬", "臘")
+
+
+def _lunar_day_name(day):
+    if day % 10 == 0:
+        return ("初十", "二十", "三十")[day // 10 - 1]
+    return "初十廿"[day // 10] + "一二三四五六七八九"[day % 10 - 1]
+
+LUNAR_DAY_NAMES = tuple(_lunar_day_name(day) for day in range(1, 31))
+
+
+def leap_month(year):
+    """農曆 year 年閏哪一個月，0 表示沒有閏月"""
+    return LUNAR_INFO[year - LUNAR_FIRST_YEAR] & 0xf
+
+
+def lunar_months(year):
+    """
+    依序列出農曆 year 年的每個月
+
+    Returns:
+        list: [(月, 是否閏月, 天數), ...]，有閏月的年份共 13 個月
+    """
+    info = LUNAR_INFO[year - LUNAR_FIRST_YEAR]
+    months = []
+    for month in range(1, 13):
+        months.append((month, False, 30 if info & (0x10000 >> month) else 29))
+        if month == info & 0xf:
+            months.append((month, True, 30 if info & 0x10000 else 29))
+    return months
+
+
+@lru_cache(maxsize=None)
+def _tables():
+    """
+    展開每日查表，第一次換算時才建立
+
+    Returns:
+        tuple: (day_codes, month_starts, solar_month_ordinals, solar_month_lengths)
+            day_codes[第 n 天] 為自 1900-01-31 起第 n 天的農曆日期，壓縮成
+            年 << 10 | 閏月 << 9 | 月 << 5 | 日；month_starts 記錄每個農曆月第一天的序數與天數；
+            solar_month_ordinals、solar_month_lengths 以 (國曆年 - 1900) * 12 + 月 - 1 為索引，
+            記錄國曆每個月第一天的序數與天數，批次換算時不必逐筆建立 date 物件
+    """
+    codes = array('L')
+    month_starts = {}
+    ordinal = _EPOCH
+    for year in range(LUNAR_FIRST_YEAR, LUNAR_LAST_YEAR + 1):
+        for month, is_leap, days in lunar_months(year):
+            month_starts[(year, month, is_leap)] = (ordinal, days)
+            base = year << 10 | is_leap << 9 | month << 5
+            codes.extend(range(base + 1, base + days + 1))
+            ordinal += days
+
+    solar_month_ordinals = array('L')
+    solar_month_lengths = bytearray()
+    for year in range(SOLAR_LAST // 10000 - LUNAR_FIRST_YEAR + 1):
+        for month in range(1, 13):
+            first = date(LUNAR_FIRST_YEAR + year, month, 1)
+            following = date(first.year + month // 12, month % 12 + 1, 1)
+            solar_month_ordinals.append(first.toordinal())
+            solar_month_lengths.append(following.toordinal() - first.toordinal())
+    return codes, month_starts, solar_month_ordinals, solar_month_lengths
+
+# 支援的天數只需要各月天數的總和，不必展開查表
+_DAY_COUNT = sum(days for year in range(LUNAR_FIRST_YEAR, LUNAR_LAST_YEAR + 1)
+                 for _, _, days in lunar_months(year))
+_LAST_ORDINAL = _EPOCH + _DAY_COUNT - 1
+
+# 支援的國曆範圍（YYYYMMDD）
+SOLAR_FIRST = 19000131
+SOLAR_LAST = int(date.fromordinal(_LAST_ORDINAL).strftime('%Y%m%d'))
+
+
+def _decode(code):
+    return (code >> 10, code >> 5 & 0xf, code & 0x1f, bool(code >> 9 & 1))
+
+
+def lookup_lunar(year, month, day):
+    """
+    以國曆年月日查表取得農曆日期
+
+    Returns:
+        tuple: (年, 月, 日, 是否閏月)；超出支援範圍時回傳 None
+    """
+    codes = _tables()[0]
+    index = date(year, month, day).toordinal() - _EPOCH
+    return _decode(codes[index]) if 0 <= index < len(codes) else None
+
+
+def parse_lunar_date(value, is_leap=False):
+    """
+    解析 YYYYMMDD、YYYY-MM-DD 或 YYYY/MM/DD 格式的農曆日期
+
+    農曆日期不能以國曆規則檢查（例如農曆二月三十日），因此只檢查格式，再確認該月確實存在這一天。
+
+    Returns:
+        tuple: (年, 月, 日, 是否閏月)
+
+    Raises:
+        ValueError: 格式錯誤或日期不存在
+    """
+    text = str(value).strip().replace('-', '').replace('/', '')
+    if len(text) != 8 or not text.isdigit():
+        raise ValueError(f"無效的農曆日期：{value}")
+    lunar = (int(text[0:4]), int(text[4:6]), int(text[6:8]), bool(is_leap))
+    lunar_to_solar(*lunar)
+    return lunar
+
+
+def solar_to_lunar(solar):
+    """
+    國曆轉農曆
+
+    Args:
+        solar (int): 國曆日期 YYYYMMDD
+
+    Returns:
+        tuple: (年, 月, 日, 是否閏月)
+
+    Raises:
+        ValueError: 日期無效或超出支援範圍
+    """
+    lunar = lookup_lunar(solar // 10000, solar // 100 % 100, solar % 100)
+    if lunar is None:
+        raise ValueError(f"超出農曆換算範圍：{solar}")
+    return lunar
+
+
+def lunar_to_solar(year, month, day, is_leap=False):
+    """
+    農曆轉國曆
+
+    Args:
+        year (int): 農曆年
+        month (int): 農曆月
+        day (int): 農曆日
+        is_leap (bool): 是否為閏月
+
+    Returns:
+        int: 國曆日期 YYYYMMDD
+
+    Raises:
+        ValueError: 該年沒有這個月（或閏月），或日期超出該月天數
+    """
+    start = _tables()[1].get((year, month, bool(is_leap)))
+    if start is None:
+        raise ValueError(f"無效的農曆月份：{year}年{'閏' if is_leap else ''}{month}月")
+    ordinal, days = start
+    if not 1 <= day <= days:
+        raise ValueError(f"無效的農曆日期：{year}年{'閏' if is_leap else ''}{month}月{day}日")
+    solar = date.fromordinal(ordinal + day - 1)
+    return solar.year * 10000 + solar.month * 100 + solar.day
+
+
+def solar_to_lunar_many(solars):
+    """
+    批次國曆轉農曆，無效或超出範圍的日期回傳 None
+
+    Args:
+        solars (iterable): 國曆日期 YYYYMMDD（例如 normalize_dates 的結果）
+
+    Returns:
+        list: (年, 月, 日, 是否閏月) 或 None
+    """
+    codes, _, month_ordinals, month_lengths = _tables()
+    count = len(codes)
+    months = len(month_lengths)
+    results = []
+    for solar in solars:
+        # 以國曆月份表檢查並換算序數，無效的日期（包括 normalize_dates 的 0）直接得到 None
+        if not isinstance(solar, int):
+            results.append(None)
+            continue
+        year, month_day = divmod(solar, 10000)
+        month, day = divmod(month_day, 100)
+        slot = (year - LUNAR_FIRST_YEAR) * 12 + month - 1
+        if not (1 <= month <= 12 and 0 <= slot < months and 1 <= day <= month_lengths[slot]):
+            results.append(None)
+            continue
+        index = month_ordinals[slot] + day - 1 - _EPOCH
+        results.append(_decode(codes[index]) if 0 <= index < count else None)
+    return results
+
+
+def lunar_to_solar_many(lunars):
+    """
+    批次農曆轉國曆，無效的日期回傳 None
+
+    Args:
+        lunars (iterable): (年, 月, 日, 是否閏月)
+
+    Returns:
+        list: 國曆日期 YYYYMMDD 或 None
+    """
+    month_starts = _tables()[1]
+    results = []
+    for year, month, day, is_leap in lunars:
+        start = month_starts.get((year, month, bool(is_leap)))
+        if start is None or not 1 <= day <= start[1]:
+            results.append(None)
+            continue
+        solar = date.fromordinal(start[0] + day - 1)
+        results.append(solar.year * 10000 + solar.month * 100 + solar.day)
+    return results
+
+
+def format_lunar_date(lunar):
+    """
+    以中文顯示農曆日期，例如 (2023, 2, 1, True) -> '2023年閏二月初一'
+    """
+    year, month, day, is_leap = lunar
+    return f"{year}年{'閏' if is_leap else ''}{LUNAR_MONTH_NAMES[month - 1]}月{LUNAR_DAY_NAMES[day - 1]}"
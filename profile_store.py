@@ -0,0 +1,421 @@
+"""
+以 SQLite 儲存會員生日與計算結果
+
+資料分成兩個資料表：
+    profiles   每個生日一列，存放只由生日決定的全部計算結果（每個欄位一個具型別的欄）
+    members    會員編號 -> 生日
+
+不論會員有幾千萬人，出生日期最多只有數萬種，因此每個生日只計算並儲存一次，
+查詢「生命靈數 X 且星座 Y 的會員」時先在很小的 profiles 上以索引篩出生日，再以 members 的生日索引取出會員。
+流年數與流年塔羅不儲存，查詢時以 month_day_sum、digit_sum 依目標年份換算。
+
+大量匯入時在同一個交易中以 executemany 重複使用預先編譯的 INSERT 陳述式，並開啟 WAL 模式。
+
+用法：
+    python profile_store.py --db members.db import --input members.csv
+    python profile_store.py --db members.db query --life-number 3 --zodiac-name 獅子座
+    python profile_store.py --db members.db query --year 2027 --year-number 5 --count
+"""
+from collections import Counter
+import argparse
+import csv
+import sqlite3
+import sys
+
+from life_number_calculator import (
+    normalize_date,
+    format_birthdate,
+    compute_profile,
+    YEAR_FIELDS,
+    sum_digits,
+    reduce_to_9,
+    reduce_to_22,
+)
+
+STORE_VERSION = 1
+
+# profiles 資料表的欄位與型別；grid_counts 拆成 grid_1 到 grid_9 九個欄位
+PROFILE_COLUMNS = (
+    ('life_number', 'INTEGER'),
+    ('life_tarot', 'INTEGER'),
+    ('soul_tarot', 'INTEGER'),
+    ('talent_tarot', 'INTEGER'),
+    ('innate_tarot', 'INTEGER'),
+    ('acquired_tarot', 'INTEGER'),
+    ('personality_tarot', 'INTEGER'),
+    ('shadow_tarot', 'INTEGER'),
+    ('ziwei_main', 'INTEGER'),
+    ('ziwei_sub', 'INTEGER'),
+    ('ziwei_destiny', 'INTEGER'),
+    ('connection_innate', 'INTEGER'),
+    ('connection_life', 'INTEGER'),
+    ('connection_talent', 'INTEGER'),
+    ('zodiac_number', 'INTEGER'),
+    ('zodiac_name', 'TEXT'),
+) + tuple((f"grid_{digit}", 'INTEGER') for digit in range(1, 10)) + (
+    # 依目標年份換算流年數與流年塔羅
+    ('month_day_sum', 'INTEGER'),
+    ('digit_sum', 'INTEGER'),
+)
+PROFILE_NAMES = tuple(name for name, _ in PROFILE_COLUMNS)
+
+# compute_profile 需要計算的欄位
+_COMPUTE_FIELDS = tuple(name for name in PROFILE_NAMES if not name.startswith('grid_')) + ('grid_counts',)
+
+# 建立索引的常用查詢欄位；(life_number, zodiac_number) 另建複合索引
+INDEXED_COLUMNS = ('life_number', 'life_tarot', 'soul_tarot', 'ziwei_destiny', 'zodiac_number',
+                   'month_day_sum', 'digit_sum')
+
+# 流年欄位 -> (換算所依據的數字和欄位, 化簡函式)
+_YEAR_SOURCES = {
+    'year_number': ('month_day_sum', reduce_to_9),
+    'year_tarot': ('digit_sum', reduce_to_22),
+}
+
+# 數字和可能的最大值（9999 年 09 月 29 日 -> 9+9+9+9+0+9+2+9）
+_MAX_DIGIT_SUM = 56
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS profiles (
+    birthdate INTEGER PRIMARY KEY,
+    {', '.join(f'{name} {kind} NOT NULL' for name, kind in PROFILE_COLUMNS)}
+);
+CREATE TABLE IF NOT EXISTS members (
+    id TEXT PRIMARY KEY,
+    birthdate INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS members_birthdate ON members (birthdate);
+CREATE INDEX IF NOT EXISTS profiles_life_zodiac ON profiles (life_number, zodiac_number);
+{''.join(f'CREATE INDEX IF NOT EXISTS profiles_{name} ON profiles ({name});' for name in INDEXED_COLUMNS)}
+"""
+
+
+def profile_row(date):
+    """
+    計算一個生日要寫入 profiles 的一列
+
+    Args:
+        date (int): YYYYMMDD 整數（normalize_date 的結果）
+
+    Returns:
+        tuple: (birthdate, PROFILE_COLUMNS 各欄位的值...)
+    """
+    profile = compute_profile(format_birthdate(date), _COMPUTE_FIELDS)
+    values = [profile[name] for name in _COMPUTE_FIELDS[:-1]]
+    grid_counts = profile['grid_counts']
+    return (date, *values[:-2], *grid_counts, *values[-2:])
+
+
+class ProfileStore:
+    """
+    SQLite 會員計算結果資料庫
+
+    同一個 ProfileStore 只能在建立它的執行緒中使用（sqlite3 的預設限制）。
+    """
+
+    def __init__(self, path, cache_size_mb=64):
+        """
+        Args:
+            path (str): 資料庫檔案
+            cache_size_mb (int): SQLite 頁面快取大小（MB）
+        """
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        connection = self.connection
+        connection.execute('PRAGMA journal_mode=WAL')
+        # WAL 模式下 NORMAL 只會在斷電時遺失最後幾個交易，不會損毀資料庫
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute(f'PRAGMA cache_size=-{cache_size_mb * 1024}')
+        connection.execute('PRAGMA temp_store=MEMORY')
+        version = connection.execute('PRAGMA user_version').fetchone()[0]
+        if version not in (0, STORE_VERSION):
+            raise ValueError(f"不支援的資料庫版本：{version}")
+        connection.executescript(_SCHEMA)
+        connection.execute(f'PRAGMA user_version={STORE_VERSION}')
+        # 已經計算過的生日；最多數萬個，放在記憶體中即可避免重算與重複寫入
+        self._known = {row[0] for row in connection.execute('SELECT birthdate FROM profiles')}
+
+    def upsert_members(self, rows, batch_size=100000):
+        """
+        批次新增或更新會員
+
+        新出現的生日會先計算並寫入 profiles；每 batch_size 筆會員提交一次交易。
+
+        Args:
+            rows (iterable): (會員編號, 生日)，生日可為 normalize_date 接受的任何格式
+            batch_size (int): 每個交易的會員筆數
+
+        Returns:
+            tuple: (寫入的會員數, 無效原因 Counter)
+        """
+        written = 0
+        rejects = Counter()
+        members = []
+        for record_id, value in rows:
+            date, reason = normalize_date(value)
+            if reason is not None:
+                rejects[reason] += 1
+                continue
+            members.append((str(record_id), date))
+            if len(members) >= batch_size:
+                written += self._write_members(members)
+                members = []
+        if members:
+            written += self._write_members(members)
+        return written, rejects
+
+    def upsert_profiles(self, dates):
+        """
+        確保生日的計算結果都已存入 profiles
+
+        Args:
+            dates (iterable): YYYYMMDD 整數
+
+        Returns:
+            int: 新寫入的生日數
+        """
+        with self._transaction():
+            new_dates = self._insert_profiles(dates)
+        self._known.update(new_dates)
+        return len(new_dates)
+
+    def _insert_profiles(self, dates):
+        """寫入尚未計算過的生日（交易提交後再由呼叫端加入 _known），回傳這些生日"""
+        new_dates = {date for date in dates if date not in self._known}
+        if not new_dates:
+            return new_dates
+        placeholders = ', '.join('?' * (len(PROFILE_NAMES) + 1))
+        self.connection.executemany(
+            f"INSERT OR IGNORE INTO profiles (birthdate, {', '.join(PROFILE_NAMES)}) VALUES ({placeholders})",
+            map(profile_row, sorted(new_dates)),
+        )
+        return new_dates
+
+    def _write_members(self, members):
+        with self._transaction():
+            new_dates = self._insert_profiles(date for _, date in members)
+            self.connection.executemany(
+                "INSERT INTO members (id, birthdate) VALUES (?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET birthdate = excluded.birthdate",
+                members,
+            )
+        self._known.update(new_dates)
+        return len(members)
+
+    def _transaction(self):
+        return _Transaction(self.connection)
+
+    def get_profile(self, birthdate, year=None):
+        """
+        讀取一個生日的計算結果
+
+        Args:
+            birthdate: normalize_date 接受的任何格式
+            year (int): 目標年份；指定時一併換算流年數與流年塔羅
+
+        Returns:
+            dict: 欄位 -> 值（grid_counts 組回 9 個數字的 tuple）；資料庫中沒有時回傳 None
+        """
+        date, reason = normalize_date(birthdate)
+        if reason is not None:
+            raise ValueError(f"無效的生日：{birthdate}")
+        row = self.connection.execute(
+            f"SELECT {', '.join(PROFILE_NAMES)} FROM profiles WHERE birthdate = ?", (date,)).fetchone()
+        return None if row is None else _row_to_profile(row, year)
+
+    def get_member(self, member_id, year=None):
+        """
+        讀取一位會員的生日與計算結果
+
+        Returns:
+            dict: 含 id、birthdate 與各欄位；找不到時回傳 None
+        """
+        row = self.connection.execute(
+            f"SELECT m.birthdate, {', '.join('p.' + name for name in PROFILE_NAMES)} "
+            "FROM members m JOIN profiles p ON p.birthdate = m.birthdate WHERE m.id = ?",
+            (str(member_id),)).fetchone()
+        if row is None:
+            return None
+        member = {'id': str(member_id), 'birthdate': format_birthdate(row[0])}
+        member.update(_row_to_profile(row[1:], year))
+        return member
+
+    def find_members(self, year=None, limit=None, **criteria):
+        """
+        依計算結果查詢會員，例如 find_members(life_number=3, zodiac_name='獅子座')
+
+        Args:
+            year (int): 目標年份，以 year_number 或 year_tarot 查詢時必須指定
+            limit (int): 最多回傳的筆數
+            **criteria: 欄位 = 值；值也可以是 list 或 tuple，表示符合其中任一個
+
+        Returns:
+            iterator: (會員編號, 生日 'YYYYMMDD')；結果直接由索引串流讀出，不另外排序
+
+        Raises:
+            ValueError: 未知的欄位，或以流年欄位查詢卻沒有指定年份
+        """
+        where, params = _where_clause(criteria, year)
+        sql = (f"SELECT m.id, m.birthdate FROM profiles p JOIN members m ON m.birthdate = p.birthdate"
+               f"{where}")
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return ((member_id, format_birthdate(date)) for member_id, date in self.connection.execute(sql, params))
+
+    def count_members(self, year=None, **criteria):
+        """
+        符合條件的會員數（條件寫法同 find_members）
+
+        Returns:
+            int: 會員數
+        """
+        where, params = _where_clause(criteria, year)
+        sql = f"SELECT COUNT(*) FROM profiles p JOIN members m ON m.birthdate = p.birthdate{where}"
+        return self.connection.execute(sql, params).fetchone()[0]
+
+    def stats(self):
+        """
+        Returns:
+            dict: 會員數與不同生日數
+        """
+        members = self.connection.execute('SELECT COUNT(*) FROM members').fetchone()[0]
+        return {'members': members, 'birthdates': len(self._known)}
+
+    def close(self):
+        self.connection.execute('PRAGMA optimize')
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _Transaction:
+    """以 BEGIN / COMMIT 包住一段寫入，發生例外時 ROLLBACK"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute('BEGIN')
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.connection.execute('ROLLBACK' if exc_type else 'COMMIT')
+
+
+def _row_to_profile(row, year):
+    profile = dict(zip(PROFILE_NAMES, row))
+    profile['grid_counts'] = tuple(profile.pop(f"grid_{digit}") for digit in range(1, 10))
+    if year is not None:
+        year_sum = sum_digits(str(year))
+        for field, (source, reduce) in _YEAR_SOURCES.items():
+            profile[field] = reduce(profile[source] + year_sum)
+    return profile
+
+
+def _where_clause(criteria, year):
+    """
+    將查詢條件轉為 WHERE 子句
+
+    流年欄位沒有儲存，改以數字和篩選：先列出在目標年份會化簡成指定值的所有數字和。
+
+    Raises:
+        ValueError: 未知的欄位，或以流年欄位查詢卻沒有指定年份
+    """
+    conditions, params = [], []
+    for field, value in criteria.items():
+        values = list(value) if isinstance(value, (list, tuple)) else [value]
+        if field in YEAR_FIELDS:
+            if year is None:
+                raise ValueError(f"以 {field} 查詢時必須指定年份")
+            source, reduce = _YEAR_SOURCES[field]
+            year_sum = sum_digits(str(year))
+            field = source
+            values = [total for total in range(_MAX_DIGIT_SUM + 1) if reduce(total + year_sum) in values]
+        elif field not in PROFILE_NAMES:
+            raise ValueError(f"未知的欄位：{field}")
+        if not values:
+            conditions.append('0')
+            continue
+        conditions.append(f"p.{field} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+    return (' WHERE ' + ' AND '.join(conditions) if conditions else ''), params
+
+
+def read_members(f):
+    """
+    讀取 '編號,生日'（或只有生日，以行號為編號）的 CSV
+
+    第一行的生日欄位無法正規化且不含任何數字時（例如 'member_id,birthdate'）視為標題列略過，
+    不計入無效資料。
+
+    Yields:
+        tuple: (會員編號, 生日字串)
+    """
+    for line_number, row in enumerate(csv.reader(f), 1):
+        if not row:
+            continue
+        if line_number == 1:
+            row[0] = row[0].lstrip('\ufeff')
+        record = (row[0], row[1]) if len(row) >= 2 else (str(line_number), row[0])
+        if line_number == 1 and _is_header(record[1]):
+            continue
+        yield record
+
+
+def _is_header(value):
+    """生日欄位無法正規化且不含數字時視為標題文字"""
+    return normalize_date(value)[1] is not None and not any(char.isdigit() for char in value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="以 SQLite 儲存會員生日與計算結果")
+    parser.add_argument('--db', required=True, help="資料庫檔案")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help="匯入或更新會員")
+    import_parser.add_argument('--input', required=True, help="'編號,生日' CSV 檔案，'-' 表示標準輸入")
+    import_parser.add_argument('--batch-size', type=int, default=100000, help="每個交易的會員筆數")
+
+    query_parser = commands.add_parser('query', help="依計算結果查詢會員")
+    for name in PROFILE_NAMES + YEAR_FIELDS:
+        kind = str if name == 'zodiac_name' else int
+        query_parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=kind, action='append',
+                                  help="可重複指定，表示符合其中任一個")
+    query_parser.add_argument('--year', type=int, help="以流年欄位查詢時的目標年份")
+    query_parser.add_argument('--limit', type=int, help="最多輸出的筆數")
+    query_parser.add_argument('--count', action='store_true', help="只輸出符合的會員數")
+    args = parser.parse_args(argv)
+
+    with ProfileStore(args.db) as store:
+        if args.command == 'import':
+            if args.batch_size < 1:
+                parser.error("--batch-size 必須大於 0")
+            f = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8', newline='')
+            try:
+                written, rejects = store.upsert_members(read_members(f), args.batch_size)
+            finally:
+                if f is not sys.stdin:
+                    f.close()
+            stats = store.stats()
+            print(f"完成：寫入 {written} 筆，略過 {sum(rejects.values())} 筆無效資料；"
+                  f"資料庫共 {stats['members']} 位會員、{stats['birthdates']} 個不同生日", file=sys.stderr)
+            return
+
+        criteria = {name: getattr(args, name) for name in PROFILE_NAMES + YEAR_FIELDS
+                    if getattr(args, name) is not None}
+        try:
+            if args.count:
+                print(store.count_members(args.year, **criteria))
+                return
+            writer = csv.writer(sys.stdout)
+            writer.writerow(('id', 'birthdate'))
+            writer.writerows(store.find_members(args.year, args.limit, **criteria))
+        except ValueError as e:
+            parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
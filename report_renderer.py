@@ -0,0 +1,387 @@
+"""
+批次 HTML 報告產生器
+
+產生與 GUI 相同段落（生命靈數、連線數、紫微靈動數、塔羅牌配牌、九宮格）的獨立 HTML 報告。
+模板在載入模組時只解析一次，批次產生時以多個行程平行渲染，
+並依輸入順序串流寫入資料夾或單一 zip 壓縮檔。
+
+用法：
+    python report_renderer.py --input members.csv --output-dir reports/
+    python report_renderer.py --input members.csv --archive reports.zip --workers 4
+"""
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from html import escape
+from itertools import islice
+from string import Formatter
+import argparse
+import csv
+import os
+import re
+import sys
+import zipfile
+
+from life_number_calculator import (
+    normalize_date,
+    format_birthdate,
+    compute_profile,
+    explain,
+    format_trace_steps,
+    get_life_number_meaning,
+    get_year_number_meaning,
+    get_connection_number_meaning,
+    get_ziwei_meaning,
+    get_zodiac_meaning,
+    get_tarot_card,
+    TAROT_PAIRINGS,
+    TAROT_NOTES,
+)
+
+
+class CompiledTemplate:
+    """
+    預先解析好的模板
+
+    使用 str.format 的 {欄位} 語法，解析一次後只需依序串接。
+    欄位值會經過 HTML 跳脫，名稱以 _html 結尾的欄位則原樣插入。
+    """
+
+    def __init__(self, source):
+        self.parts = []
+        for literal, field, _, _ in Formatter().parse(source):
+            self.parts.append((literal, field, bool(field) and field.endswith('_html')))
+
+    def render(self, **values):
+        out = []
+        for literal, field, raw in self.parts:
+            out.append(literal)
+            if field:
+                value = values[field]
+                out.append(value if raw else escape(str(value)))
+        return ''.join(out)
+
+
+REPORT_STYLE = """
+body { background: #1E1E1E; color: white; font-family: '微軟正黑體', sans-serif; font-size: 14pt; margin: 2em; }
+h1, h2 { color: #9932CC; }
+h3 { color: #4169E1; margin-bottom: 0.3em; }
+.process { background: #2F4F4F; margin: 0.2em 0; padding: 0.1em 0.4em; }
+.result { color: #FF4500; font-weight: bold; }
+.meaning { color: #CD853F; }
+.connection { color: #20B2AA; }
+table.grid { border-collapse: collapse; }
+table.grid td { border: 2px solid white; width: 8em; height: 6em; text-align: center; font-weight: bold; }
+"""
+
+PAGE_TEMPLATE = CompiledTemplate("""<!DOCTYPE html>
+<html lang="zh-Hant">
+<head>
+<meta charset="utf-8">
+<title>生命靈數報告 {birthdate}</title>
+<style>{style_html}</style>
+</head>
+<body>
+<h1>生命靈數報告</h1>
+<p class="process">出生日期：{birthdate}　目標年份：{year}</p>
+{sections_html}
+</body>
+</html>
+""")
+
+SECTION_TEMPLATE = CompiledTemplate('<section>\n<h2>【{title}】</h2>\n{body_html}</section>\n')
+
+ITEM_TEMPLATE = CompiledTemplate(
+    '<div class="item">\n'
+    '<h3>{label}</h3>\n'
+    '<p class="process">◆ 計算方式：{method}</p>\n'
+    '{steps_html}'
+    '<p class="result">結果：{result}</p>\n'
+    '<p class="meaning">含義：{meaning}</p>\n'
+    '</div>\n'
+)
+
+STEP_TEMPLATE = CompiledTemplate('<p class="process">{line}</p>\n')
+
+PAIRING_TEMPLATE = CompiledTemplate(
+    '<div class="item">\n'
+    '<h3>◆ {title}</h3>\n'
+    '<p class="process">{cards}</p>\n'
+    '<p class="process">牌號差距：{differences}（轉變{transitions}）；能量總和：{energy}（{energy_level}）</p>\n'
+    '<p class="result">解讀：{interpretation}</p>\n'
+    '<p class="meaning">代表：{description}</p>\n'
+    '</div>\n'
+)
+
+NOTE_TEMPLATE = CompiledTemplate('<p class="result">★ {text}</p>\n')
+
+GRID_ROW_TEMPLATE = CompiledTemplate('<tr>{cells_html}</tr>\n')
+
+GRID_CELL_TEMPLATE = CompiledTemplate('<td>{position}<br>{count}次<br>{numbers}</td>')
+
+LIST_TEMPLATE = CompiledTemplate('<h3>◆ {title}</h3>\n<ul>\n{items_html}</ul>\n')
+
+LIST_ITEM_TEMPLATE = CompiledTemplate('<li class="{css}">{text}</li>\n')
+
+TAROT_FIELDS = (
+    'life_tarot', 'soul_tarot', 'talent_tarot', 'innate_tarot',
+    'acquired_tarot', 'personality_tarot', 'shadow_tarot', 'year_tarot',
+)
+
+GRID_LAYOUT = (
+    ('思想', '精神', '愛情'),
+    ('健康', '意志', '直覺'),
+    ('物質', '才能', '智慧'),
+)
+
+CONNECTION_TYPES = {
+    'connection_innate': "先天數",
+    'connection_life': "生命數",
+    'connection_talent': "天賦數",
+}
+
+
+def _render_item(birthdate, field, year, result, meaning):
+    trace = explain(birthdate, field, year)
+    steps_html = ''.join(STEP_TEMPLATE.render(line=line) for line in format_trace_steps(trace))
+    return ITEM_TEMPLATE.render(label=trace['label'], method=trace['method'],
+                                steps_html=steps_html, result=result, meaning=meaning)
+
+
+def _render_list(title, items, css, empty_text):
+    if not items:
+        items, css = [empty_text], 'process'
+    items_html = ''.join(LIST_ITEM_TEMPLATE.render(css=css, text=item) for item in items)
+    return LIST_TEMPLATE.render(title=title, items_html=items_html)
+
+
+def render_report(birthdate, year=None):
+    """
+    產生單一生日的 HTML 報告
+
+    Args:
+        birthdate (str): 已驗證的出生日期，格式為 'YYYYMMDD'
+        year (int): 流年使用的目標年份，預設為今年
+
+    Returns:
+        str: 完整的 HTML 文件
+    """
+    if year is None:
+        year = datetime.now().year
+    profile = compute_profile(birthdate, year=year)
+    sections = []
+
+    # 生命靈數與流年數
+    body = _render_item(birthdate, 'life_number', year, f"生命靈數為 {profile['life_number']}",
+                        get_life_number_meaning(profile['life_number']))
+    body += _render_item(birthdate, 'year_number', year, f"{year}年的流年數為 {profile['year_number']}",
+                         get_year_number_meaning(profile['year_number']))
+    sections.append(SECTION_TEMPLATE.render(title="生命靈數", body_html=body))
+
+    # 連線數與星座數
+    body = ''
+    for field, type_name in CONNECTION_TYPES.items():
+        number = profile[field]
+        body += _render_item(birthdate, field, year, f"{type_name}為 {number}",
+                             get_connection_number_meaning(number, type_name))
+    body += _render_item(birthdate, 'zodiac_number', year,
+                         f"{profile['zodiac_name']}（{profile['zodiac_number']}）",
+                         get_zodiac_meaning(profile['zodiac_number']))
+    sections.append(SECTION_TEMPLATE.render(title="生命靈數連線數", body_html=body))
+
+    # 紫微靈動數
+    body = ''
+    for field in ('ziwei_main', 'ziwei_sub', 'ziwei_destiny'):
+        number = profile[field]
+        body += _render_item(birthdate, field, year, str(number), get_ziwei_meaning(number))
+    sections.append(SECTION_TEMPLATE.render(title="紫微靈動數", body_html=body))
+
+    # 塔羅牌與配牌
+    body = ''
+    for field in TAROT_FIELDS:
+        number = profile[field]
+        card, meaning = get_tarot_card(number)
+        body += _render_item(birthdate, field, year, f"{card}（{number}號牌）", meaning)
+    for (title, fields, description), pairing in zip(TAROT_PAIRINGS, profile['tarot_pairings']):
+        separator = ' + ' if len(fields) == 2 else ' → '
+        body += PAIRING_TEMPLATE.render(
+            title=title, cards=separator.join(pairing['names']), description=description,
+            differences='、'.join(map(str, pairing.get('differences', (pairing.get('difference'),)))),
+            transitions='、'.join(pairing.get('transitions', (pairing.get('transition'),))),
+            energy=pairing['energy'], energy_level=pairing['energy_level'],
+            interpretation=pairing['interpretation'])
+    for (first, second), text in TAROT_NOTES:
+        if profile[first] == profile[second]:
+            body += NOTE_TEMPLATE.render(text=text)
+    sections.append(SECTION_TEMPLATE.render(title="塔羅牌配牌", body_html=body))
+
+    # 九宮格
+    grid = profile['life_grid']
+    strengths, weaknesses, connections = profile['grid_analysis']
+    rows_html = ''
+    for row in GRID_LAYOUT:
+        cells_html = ''.join(
+            GRID_CELL_TEMPLATE.render(position=position, count=len(grid[position]),
+                                      numbers=' '.join(map(str, grid[position])) or '空')
+            for position in row)
+        rows_html += GRID_ROW_TEMPLATE.render(cells_html=cells_html)
+    body = f'<table class="grid">\n{rows_html}</table>\n'
+    body += _render_list("強項分析", strengths, 'result', "數字分布較為平均")
+    body += _render_list("弱項分析", weaknesses, 'process', "無明顯弱項")
+    body += _render_list("數字連線分析", connections, 'meaning', "無特殊數字連線")
+    sections.append(SECTION_TEMPLATE.render(title="生命靈數九宮格", body_html=body))
+
+    return PAGE_TEMPLATE.render(birthdate=birthdate, year=year, style_html=REPORT_STYLE,
+                                sections_html=''.join(sections))
+
+
+def _render_chunk(chunk, year):
+    """在工作行程中渲染一批報告"""
+    return [(report_id, render_report(birthdate, year)) for report_id, birthdate in chunk]
+
+
+def iter_rendered_reports(records, year=None, workers=None, chunk_size=256):
+    """
+    依輸入順序串流產生報告，必要時以多個行程平行渲染
+
+    同時進行中的批次數量有上限，輸入再大也不會一次全部載入記憶體。
+
+    Args:
+        records (iterable): (報告編號, 'YYYYMMDD') 序列
+        year (int): 流年使用的目標年份
+        workers (int): 行程數，預設為 CPU 數；1 表示不使用子行程
+        chunk_size (int): 每個工作批次的報告數
+
+    Yields:
+        tuple: (報告編號, HTML 字串)
+    """
+    workers = workers or os.cpu_count() or 1
+    records = iter(records)
+    chunks = iter(lambda: list(islice(records, chunk_size)), [])
+    if workers == 1:
+        for chunk in chunks:
+            yield from _render_chunk(chunk, year)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_render_chunk, chunk, year))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def report_filename(report_id, fallback='report'):
+    """將報告編號轉為安全的檔名；編號為空或只剩 '.'（例如 '..'）時改用 fallback"""
+    stem = re.sub(r'[^0-9A-Za-z_.-]', '_', str(report_id)).lstrip('.')
+    return (stem or fallback) + '.html'
+
+
+def iter_report_files(reports):
+    """
+    為每份報告配上不重複的檔名
+
+    不同的編號可能轉成相同的檔名（例如 'a/b' 與 'a_b'，或只差大小寫），
+    後出現的報告依序加上 -2、-3 ... 而不覆蓋先前的報告。
+    編號轉換後為空時以序號命名（report-1、report-2 ...）。
+
+    Args:
+        reports (iterable): (報告編號, HTML 字串) 序列
+
+    Yields:
+        tuple: (檔名, HTML 字串)
+    """
+    used = set()
+    for number, (report_id, html) in enumerate(reports, 1):
+        filename = report_filename(report_id, f"report-{number}")
+        stem, suffix = filename[:-len('.html')], 2
+        # 以小寫比對，不分大小寫的檔案系統上也不會互相覆蓋
+        while filename.lower() in used:
+            filename = f"{stem}-{suffix}.html"
+            suffix += 1
+        used.add(filename.lower())
+        yield filename, html
+
+
+def write_reports_to_directory(reports, directory):
+    """
+    將報告逐一寫入資料夾
+
+    Returns:
+        int: 寫入的報告數
+    """
+    os.makedirs(directory, exist_ok=True)
+    count = 0
+    for filename, html in iter_report_files(reports):
+        with open(os.path.join(directory, filename), 'w', encoding='utf-8') as f:
+            f.write(html)
+        count += 1
+    return count
+
+
+def write_reports_to_archive(reports, path):
+    """
+    將報告串流寫入單一 zip 壓縮檔
+
+    Returns:
+        int: 寫入的報告數
+    """
+    count = 0
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for filename, html in iter_report_files(reports):
+            archive.writestr(filename, html.encode('utf-8'))
+            count += 1
+    return count
+
+
+def read_records(lines, rejects):
+    """
+    讀取 '編號,生日' 或只有生日的 CSV 行，略過無效的日期
+
+    Args:
+        lines (iterable): 檔案的每一行
+        rejects (list): 收集 (行號, 無效原因代碼)
+
+    Yields:
+        tuple: (報告編號, 'YYYYMMDD')
+    """
+    for line_number, row in enumerate(csv.reader(lines), 1):
+        if not row:
+            continue
+        report_id, value = (row[0], row[1]) if len(row) >= 2 else (str(line_number), row[0])
+        date, reason = normalize_date(value)
+        if reason is None:
+            yield report_id, format_birthdate(date)
+        else:
+            rejects.append((line_number, reason))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批次產生生命靈數 HTML 報告")
+    parser.add_argument('--input', required=True, help="'編號,生日' CSV 檔案，'-' 表示標準輸入")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--output-dir', help="輸出資料夾")
+    target.add_argument('--archive', help="輸出的 zip 壓縮檔")
+    parser.add_argument('--year', type=int, help="流年使用的目標年份，預設為今年")
+    parser.add_argument('--workers', type=int, help="平行渲染的行程數，預設為 CPU 數")
+    parser.add_argument('--chunk-size', type=int, default=256, help="每個工作批次的報告數")
+    args = parser.parse_args(argv)
+
+    rejects = []
+    # 標準輸入不是這裡開啟的，不在結束時關閉
+    source = nullcontext(sys.stdin) if args.input == '-' else open(args.input, encoding='utf-8', newline='')
+    with source as lines:
+        reports = iter_rendered_reports(read_records(lines, rejects), year=args.year,
+                                        workers=args.workers, chunk_size=args.chunk_size)
+        if args.archive:
+            count = write_reports_to_archive(reports, args.archive)
+        else:
+            count = write_reports_to_directory(reports, args.output_dir)
+
+    print(f"已產生 {count} 份報告，略過 {len(rejects)} 筆無效資料", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
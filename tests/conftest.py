@@ -0,0 +1,19 @@
+from datetime import date
+import os
+import random
+import sys
+
+import pytest
+
+# 測試直接匯入專案根目錄的模組
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def sample_birthdates():
+    """固定種子的 400 個隨機生日（1-9999 年），加上年份中間為 00、閏日與年底等邊界日期"""
+    rng = random.Random(20261019)
+    first, last = date(1, 1, 1).toordinal(), date(9999, 12, 31).toordinal()
+    days = [date.fromordinal(rng.randint(first, last)) for _ in range(400)]
+    days += [date(2005, 1, 1), date(2000, 2, 29), date(1999, 12, 31), date(9999, 12, 31), date(1, 1, 1)]
+    return [f"{day.year:04d}{day.month:02d}{day.day:02d}" for day in days]
@@ -0,0 +1,102 @@
+from http.client import HTTPConnection
+from http.server import ThreadingHTTPServer
+import json
+import threading
+
+import pytest
+
+from api import index
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), index.handler)
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True)
+    thread.start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _post(address, body, headers=None):
+    connection = HTTPConnection(*address, timeout=5)
+    connection.putrequest('POST', '/api/profiles')
+    for name, value in (headers or {'Content-Length': str(len(body))}).items():
+        connection.putheader(name, value)
+    connection.endheaders(body)
+    response = connection.getresponse()
+    result = response.status, json.loads(response.read())
+    connection.close()
+    return result
+
+
+def _post_json(address, request):
+    return _post(address, json.dumps(request).encode('utf-8'))
+
+
+def test_batch_request(server):
+    status, body = _post_json(server, {'birthdates': ['19790619', 'bad'], 'year': 2025, 'fields': ['life_number']})
+    assert status == 200
+    assert body == [{'life_number': 6}, {'error': 'format'}]
+
+
+@pytest.mark.parametrize('request_body, error', [
+    ({'birthdates': ['19790619'], 'year': True}, 'year'),
+    ({'birthdates': ['19790619'], 'year': '2025'}, 'year'),
+    ({'birthdates': ['19790619'], 'fields': 'life_number'}, 'field'),
+    ({'birthdates': ['19790619'], 'fields': [1]}, 'field'),
+    ({'birthdates': ['19790619'], 'fields': ['no_such_field']}, 'field'),
+    ({'birthdates': '19790619'}, 'format'),
+    (['19790619'], 'format'),
+])
+def test_bad_request_fields(server, request_body, error):
+    assert _post_json(server, request_body) == (400, {'error': error})
+
+
+@pytest.mark.parametrize('length', ['-1', 'abc', '1e3'])
+def test_bad_content_length(server, length):
+    assert _post(server, b'{}', {'Content-Length': length}) == (400, {'error': 'length'})
+
+
+def test_oversized_body(server, monkeypatch):
+    monkeypatch.setattr(index, 'MAX_BODY_BYTES', 10)
+    assert _post_json(server, {'birthdates': ['19790619']}) == (413, {'error': 'too_large'})
+
+
+def test_unexpected_error_is_500(server, monkeypatch):
+    def broken(birthdates, year, fields):
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(index, 'batch_json', broken)
+    assert _post_json(server, {'birthdates': ['19790619']}) == (500, {'error': 'internal'})
+
+
+def _get(address, path):
+    connection = HTTPConnection(*address, timeout=5)
+    connection.request('GET', path)
+    response = connection.getresponse()
+    result = response.status, json.loads(response.read())
+    connection.close()
+    return result
+
+
+@pytest.mark.parametrize('year', ['0', '%C2%B2', '10000', '-1', '1' * 5000])
+def test_get_rejects_bad_year(server, year):
+    assert _get(server, f'/api/profile?birthdate=19790619&year={year}') == (400, {'error': 'year'})
+
+
+def test_get_profile(server):
+    assert _get(server, '/api/profile?birthdate=19790619&year=2025&fields=life_number') == (200, {'life_number': 6})
+
+
+@pytest.mark.parametrize('year', [0, -5, 10000, 2.5])
+def test_post_rejects_bad_year(server, year):
+    assert _post_json(server, {'birthdates': ['19790619'], 'year': year}) == (400, {'error': 'year'})
+
+
+def test_get_unexpected_error_is_500(server, monkeypatch):
+    def broken(birthdate, year, fields):
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(index.handler.batcher, 'compute', broken)
+    assert _get(server, '/api/profile?birthdate=19790619&year=2025') == (500, {'error': 'internal'})
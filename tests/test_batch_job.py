@@ -0,0 +1,116 @@
+import os
+
+import pytest
+
+import batch_job
+from batch_job import run_job
+
+# 重複的生日跨越多個分段
+ROWS = ['1,20050101', '2,19790619', '3,20050101', '4,bad', '5,19790619', '6,2005-01-01', '7,19800229', '8,20050101']
+
+
+class Interrupt(Exception):
+    pass
+
+
+def _write_input(tmp_path):
+    source = tmp_path / 'members.csv'
+    source.write_text(''.join(row + '\n' for row in ROWS), encoding='utf-8')
+    return str(source)
+
+
+def _stop_after(segments):
+    def progress(checkpoint):
+        if checkpoint['segments'] == segments and not checkpoint['done']:
+            raise Interrupt
+    return progress
+
+
+def _outputs(directory):
+    return {name: open(os.path.join(directory, name), 'rb').read()
+            for name in sorted(os.listdir(directory)) if name.startswith('part-')}
+
+
+def test_repeated_birthdates_are_computed_once(tmp_path, monkeypatch):
+    calls = []
+    original = batch_job.compute_profile
+
+    def counting(birthdate, fields=None, year=None):
+        calls.append((birthdate, year))
+        return original(birthdate, fields, year)
+
+    monkeypatch.setattr(batch_job, 'compute_profile', counting)
+    checkpoint = run_job(_write_input(tmp_path), str(tmp_path / 'out'), year=2026, segment_size=3)
+    # 第一次呼叫是開始前的欄位檢查
+    assert sorted(calls[1:]) == [('19790619', 2026), ('19800229', 2026), ('20050101', 2026)]
+    assert (checkpoint['rows'], checkpoint['computed'], checkpoint['rejects']) == (7, 3, {'format': 1})
+
+
+def test_resumed_dedup_output_is_identical(tmp_path):
+    source = _write_input(tmp_path)
+    whole = run_job(source, str(tmp_path / 'whole'), year=2026, segment_size=2)
+    with pytest.raises(Interrupt):
+        run_job(source, str(tmp_path / 'resumed'), year=2026, segment_size=2, progress=_stop_after(2))
+    resumed = run_job(source, str(tmp_path / 'resumed'), segment_size=2)
+    assert _outputs(tmp_path / 'resumed') == _outputs(tmp_path / 'whole')
+    assert resumed['rows'] == whole['rows'] == 7
+    assert resumed['segments'] == whole['segments']
+
+
+def _member_file(tmp_path, count=23):
+    source = tmp_path / 'members.csv'
+    source.write_text(''.join(f'{i},{1950 + i * 3}-{i % 12 + 1:02d}-{i % 28 + 1:02d}\n' for i in range(count)),
+                      encoding='utf-8')
+    return str(source)
+
+
+@pytest.mark.parametrize('file_format', ['csv', 'jsonl', 'columnar'])
+def test_resume_after_interruption_matches_uninterrupted_run(tmp_path, file_format):
+    source = _member_file(tmp_path)
+    options = {'year': 2026, 'file_format': file_format, 'segment_size': 5}
+    whole = run_job(source, str(tmp_path / 'whole'), **options)
+    with pytest.raises(Interrupt):
+        run_job(source, str(tmp_path / 'resumed'), progress=_stop_after(2), **options)
+    stopped = batch_job.load_checkpoint(str(tmp_path / 'resumed'))
+    assert (stopped['rows'], stopped['done']) == (10, False)
+
+    resumed = run_job(source, str(tmp_path / 'resumed'), **options)
+    assert _outputs(tmp_path / 'resumed') == _outputs(tmp_path / 'whole')
+    assert {key: resumed[key] for key in ('rows', 'segments', 'offset', 'line_number', 'done')} == \
+           {key: whole[key] for key in ('rows', 'segments', 'offset', 'line_number', 'done')}
+
+
+def test_interruption_before_checkpoint_rewrites_the_segment(tmp_path, monkeypatch):
+    source = _member_file(tmp_path)
+    options = {'year': 2026, 'segment_size': 5}
+    run_job(source, str(tmp_path / 'whole'), **options)
+
+    # 第二個分段已寫好，但檢查點還停在第一個分段
+    saves = []
+    original = batch_job.save_checkpoint
+
+    def failing(output_dir, checkpoint):
+        saves.append(checkpoint['segments'])
+        if checkpoint['segments'] == 2:
+            raise Interrupt
+        original(output_dir, checkpoint)
+
+    monkeypatch.setattr(batch_job, 'save_checkpoint', failing)
+    with pytest.raises(Interrupt):
+        run_job(source, str(tmp_path / 'resumed'), **options)
+    monkeypatch.setattr(batch_job, 'save_checkpoint', original)
+    assert batch_job.load_checkpoint(str(tmp_path / 'resumed'))['segments'] == 1
+    assert len(_outputs(tmp_path / 'resumed')) == 2
+
+    run_job(source, str(tmp_path / 'resumed'), **options)
+    assert _outputs(tmp_path / 'resumed') == _outputs(tmp_path / 'whole')
+
+
+def test_changed_input_is_not_resumed(tmp_path):
+    source = _member_file(tmp_path)
+    with pytest.raises(Interrupt):
+        run_job(source, str(tmp_path / 'out'), year=2026, segment_size=5, progress=_stop_after(1))
+    with open(source, 'a', encoding='utf-8') as f:
+        f.write('99,19900101\n')
+    with pytest.raises(ValueError):
+        run_job(source, str(tmp_path / 'out'), segment_size=5)
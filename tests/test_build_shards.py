@@ -0,0 +1,36 @@
+import gzip
+import json
+
+from build_shards import SHARD_FIELDS, ZODIAC_NAMES, build_shards
+from life_number_calculator import calculate_year_number_from_sum, compute_profile
+
+
+def test_month_shard_matches_compute_profile(tmp_path):
+    index = build_shards(str(tmp_path), 2024, 2024, granularity='month')
+    assert sorted(index['shards']) == [f"2024{month:02d}" for month in range(1, 13)]
+    assert index['fields'] == list(SHARD_FIELDS)
+
+    shard = json.loads((tmp_path / '202402.json').read_text(encoding='utf-8'))
+    assert shard['start'] == '20240201'
+    assert shard['days'] == len(shard['rows']) == 29
+    with gzip.open(tmp_path / '202402.json.gz') as f:
+        assert json.load(f) == shard
+
+    for day, row in enumerate(shard['rows'], start=1):
+        birthdate = f"202402{day:02d}"
+        values = dict(zip(SHARD_FIELDS, row))
+        expected = compute_profile(birthdate, SHARD_FIELDS, year=2024)
+        assert ZODIAC_NAMES[values.pop('zodiac_name')] == expected.pop('zodiac_name')
+        assert values.pop('grid_counts') == list(expected.pop('grid_counts'))
+        assert values == expected
+        # 前端以 month_day_sum 推算任意年份的流年數
+        for year in (1, 2025, 9999):
+            assert (calculate_year_number_from_sum(values['month_day_sum'], year)
+                    == compute_profile(birthdate, ('year_number',), year=year)['year_number'])
+
+
+def test_rebuild_is_byte_identical(tmp_path):
+    build_shards(str(tmp_path / 'a'), 2024, 2024, granularity='month', plain=False)
+    build_shards(str(tmp_path / 'b'), 2024, 2024, granularity='month', plain=False)
+    for path in sorted((tmp_path / 'a').iterdir()):
+        assert path.read_bytes() == (tmp_path / 'b' / path.name).read_bytes()
@@ -0,0 +1,53 @@
+import json
+import socket
+
+import pytest
+
+from calculator_daemon import answer_query, remove_stale_socket
+
+
+def test_regular_file_is_kept(tmp_path):
+    path = tmp_path / 'daemon.sock'
+    path.write_text('data')
+    with pytest.raises(ValueError):
+        remove_stale_socket(str(path))
+    assert path.read_text() == 'data'
+
+
+def test_stale_socket_is_removed(tmp_path):
+    path = tmp_path / 'daemon.sock'
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(str(path))
+    remove_stale_socket(str(path))
+    assert not path.exists()
+
+
+def test_live_socket_is_kept(tmp_path):
+    path = tmp_path / 'daemon.sock'
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(str(path))
+        sock.listen()
+        with pytest.raises(ValueError):
+            remove_stale_socket(str(path))
+    assert path.exists()
+
+
+def test_missing_path_is_fine(tmp_path):
+    remove_stale_socket(str(tmp_path / 'daemon.sock'))
+
+
+@pytest.mark.parametrize('line, error', [
+    ('19790619 ²', 'year'),
+    ('19790619 ' + '9' * 5000, 'year'),
+    ('19790619 0', 'year'),
+    ('19790619 2025 no_such_field', 'field'),
+    ('19790230', 'day'),
+    ('', 'empty'),
+])
+def test_bad_queries_get_error_responses(line, error):
+    assert json.loads(answer_query(line)) == {'error': error, 'input': line}
+
+
+def test_query_fields():
+    assert json.loads(answer_query('1979-06-19 2025 life_number,year_number')) == {'life_number': 6, 'year_number': 7}
+    assert answer_query('ping') == '{"pong":true}'
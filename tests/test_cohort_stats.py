@@ -0,0 +1,19 @@
+from cohort_stats import count_birthdates_in_file, count_birthdates_in_range
+
+
+def test_count_birthdates_in_file():
+    lines = ['19790619', '1979-06-19', '1979/06/19', 'garbage', '20230230', '', '19900101']
+    counts, rejects = count_birthdates_in_file(lines)
+    assert counts == {'19790619': 3, '19900101': 1}
+    assert sum(rejects.values()) == 2
+
+
+def test_missing_column_is_rejected():
+    counts, rejects = count_birthdates_in_file(['a,19790619', 'b'], column=1)
+    assert counts == {'19790619': 1}
+    assert sum(rejects.values()) == 1
+
+
+def test_count_birthdates_in_range_edges():
+    assert list(count_birthdates_in_range('00991231', '01000101')) == ['00991231', '01000101']
+    assert list(count_birthdates_in_range('99991230', '99991231')) == ['99991230', '99991231']
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from compatibility import (
+    COMPATIBILITY_FIELDS,
+    DEFAULT_WEIGHTS,
+    STORE_MAGIC,
+    CandidateStore,
+    find_compatible_matches,
+)
+from life_number_calculator import compute_profile
+
+
+def test_store_round_trip(tmp_path):
+    store = CandidateStore.build([('a', '19790619'), ('b', '19900101'), ('c', '20230230')])
+    path = tmp_path / 'store.bin'
+    store.save(path)
+    loaded = CandidateStore.load(path)
+    assert loaded.ids == store.ids
+    assert loaded.skipped == 1
+
+
+def test_load_rejects_different_fields(tmp_path):
+    store = CandidateStore.build([('a', '19790619')])
+    path = tmp_path / 'store.bin'
+    store.save(path)
+    data = path.read_bytes()
+    header_end = data.index(b'\n', len(STORE_MAGIC))
+    header = json.loads(data[len(STORE_MAGIC):header_end])
+    header['fields'] = header['fields'][::-1]
+    path.write_bytes(STORE_MAGIC + json.dumps(header).encode('utf-8') + data[header_end:])
+    with pytest.raises(ValueError):
+        CandidateStore.load(path)
+
+# 包含同一天生日的多位候選人（分數必然相同）與一筆無效生日
+CANDIDATES = [
+    ('a', '19790619'), ('b', '19900101'), ('c', '20050101'), ('d', '19790619'),
+    ('e', '19881130'), ('f', '20000229'), ('g', '19700707'), ('h', '19900101'),
+    ('i', '19620815'), ('j', '20230230'), ('k', '19990909'), ('l', '20120512'),
+]
+
+
+def _brute_force(query, k, weights=None, exclude=()):
+    """逐一計算每位候選人的分數；同分時依生日、再依加入順序排列"""
+    resolved = dict(DEFAULT_WEIGHTS, **(weights or {}))
+    mine = compute_profile(query, COMPATIBILITY_FIELDS)
+    scored = []
+    for order, (candidate_id, birthdate) in enumerate(CANDIDATES):
+        if candidate_id in exclude or birthdate == '20230230':
+            continue
+        theirs = compute_profile(birthdate, COMPATIBILITY_FIELDS)
+        score = 0.0
+        for field in COMPATIBILITY_FIELDS:
+            if resolved[field]:
+                score += resolved[field] if mine[field] == theirs[field] else 0.0
+        scored.append((-score, birthdate, order, candidate_id))
+    scored.sort()
+    return [(candidate_id, birthdate, -score) for score, birthdate, _, candidate_id in scored[:k]]
+
+
+@pytest.mark.parametrize('query', ['19790619', '20050101', '19900101', '19620815'])
+@pytest.mark.parametrize('k', [1, 3, 11, 50])
+def test_top_matches_match_brute_force(query, k):
+    store = CandidateStore.build(CANDIDATES)
+    assert store.top_matches(query, k) == _brute_force(query, k)
+
+
+@pytest.mark.parametrize('weights', [{'life_number': 10.0}, {'shadow_tarot': 5.0, 'zodiac_number': 0.0},
+                                     {field: 0.0 for field in COMPATIBILITY_FIELDS}])
+def test_weights_and_exclude_match_brute_force(weights):
+    store = CandidateStore.build(CANDIDATES)
+    exclude = {'a', 'h'}
+    expected = _brute_force('19790619', 5, weights, exclude)
+    assert find_compatible_matches(store, '19790619', 5, weights, exclude) == expected
+    assert not {candidate_id for candidate_id, _, _ in expected} & exclude
+
+
+def test_score_dates_align_with_dates():
+    store = CandidateStore.build(CANDIDATES)
+    scores = store.score_dates('19790619')
+    assert len(scores) == len(store.dates)
+    assert scores[store.dates.index('19790619')] == sum(DEFAULT_WEIGHTS.values())
+
+
+def test_top_matches_edge_cases():
+    store = CandidateStore.build(CANDIDATES)
+    assert store.top_matches('19790619', 0) == []
+    assert CandidateStore.build([]).top_matches('19790619', 5) == []
+    with pytest.raises(ValueError):
+        store.top_matches('19790230', 5)
+    with pytest.raises(ValueError):
+        store.top_matches('19790619', 5, weights={'no_such_field': 1.0})
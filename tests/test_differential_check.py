@@ -0,0 +1,31 @@
+from datetime import date
+
+import differential_check
+from differential_check import MISSING, check_range, registry_engine
+
+
+def _check(monkeypatch, engine):
+    monkeypatch.setitem(differential_check.ENGINES, 'test', engine)
+    return check_range('test', date(2005, 1, 1), date(2005, 1, 5), 2025, 100)
+
+
+def test_registry_engine_matches(monkeypatch):
+    assert _check(monkeypatch, registry_engine) == (5, [])
+
+
+def test_short_result_is_a_mismatch(monkeypatch):
+    checked, mismatches = _check(monkeypatch, lambda birthdates, year: registry_engine(birthdates, year)[:-1])
+    assert checked == 5
+    assert mismatches == [('20050101', '（筆數）', 5, 4)]
+
+
+def test_missing_field_is_a_mismatch(monkeypatch):
+    def engine(birthdates, year):
+        profiles = registry_engine(birthdates, year)
+        del profiles[2]['life_tarot']
+        return profiles
+
+    checked, mismatches = _check(monkeypatch, engine)
+    assert [(birthdate, field, actual) for birthdate, field, _, actual in mismatches] == [
+        ('20050103', 'life_tarot', MISSING),
+    ]
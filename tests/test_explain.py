@@ -0,0 +1,43 @@
+import pytest
+
+from differential_check import reference_profile
+from life_number_calculator import (
+    EXPLAINERS,
+    calculate_year_number,
+    calculate_year_tarot,
+    compute_profile,
+    explain,
+    explain_year_from_sum,
+)
+
+
+@pytest.mark.parametrize('birthdate', ['19790619', '20050101', '19991229'])
+@pytest.mark.parametrize('year', [2025, 2026, 1999, 2099])
+def test_year_trace_from_cached_sum(birthdate, year):
+    sums = compute_profile(birthdate, ('month_day_sum', 'digit_sum'))
+    number = explain_year_from_sum('year_number', sums['month_day_sum'], year)
+    tarot = explain_year_from_sum('year_tarot', sums['digit_sum'], year)
+    assert number['result'] == calculate_year_number(birthdate, year) == explain(birthdate, 'year_number', year)['result']
+    assert tarot['result'] == calculate_year_tarot(birthdate, year) == explain(birthdate, 'year_tarot', year)['result']
+
+
+def test_year_trace_rejects_other_fields():
+    with pytest.raises(ValueError):
+        explain_year_from_sum('life_number', 10, 2025)
+
+
+@pytest.mark.parametrize('year', [2025, 1, 9999])
+def test_explain_matches_calculators(year, sample_birthdates):
+    for birthdate in sample_birthdates:
+        expected = reference_profile(birthdate, year)
+        for field in EXPLAINERS:
+            trace = explain(birthdate, field, year)
+            assert trace['result'] == expected[field], (birthdate, field)
+            assert trace['field'] == field and trace['steps']
+            # 最後一個步驟的值就是結果
+            assert trace['steps'][-1][1] == trace['result'], (birthdate, field)
+
+
+def test_explain_rejects_unknown_field():
+    with pytest.raises(ValueError):
+        explain('19790619', 'no_such_field')
@@ -0,0 +1,66 @@
+import life_number_calculator as m
+
+
+class FakeText:
+    """只支援 replace_span 用到的操作；索引以 'c<位移>' 表示"""
+
+    def __init__(self):
+        self.chars = []
+
+    def _offset(self, index):
+        if index in (m.tk.END, m.tk.END + "-1c"):
+            return len(self.chars)
+        return int(index[1:])
+
+    def index(self, index):
+        return f"c{self._offset(index)}"
+
+    def insert(self, index, *args):
+        position = self._offset(index)
+        for text, tags in zip(args[::2], args[1::2]):
+            tags = (tags,) if isinstance(tags, str) else tuple(tags)
+            self.chars[position:position] = [(char, tags) for char in text]
+            position += len(text)
+
+    def delete(self, first, last):
+        del self.chars[self._offset(first):self._offset(last)]
+
+    def tag_ranges(self, tag):
+        offsets = [i for i, (_, tags) in enumerate(self.chars) if tag in tags]
+        return (f"c{offsets[0]}", f"c{offsets[-1] + 1}") if offsets else ()
+
+    def text(self):
+        return ''.join(char for char, _ in self.chars)
+
+
+class FakeVar:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+def _gui(year):
+    gui = m.LifeNumberCalculatorGUI.__new__(m.LifeNumberCalculatorGUI)
+    gui.tracer, gui.root = m.LatencyTracer(False), None
+    gui.year_var = FakeVar(year)
+    gui.life_text, gui.tarot_text = FakeText(), FakeText()
+    gui.year_cache = m.compute_profile('19790619', ('month_day_sum', 'digit_sum'))
+    return gui
+
+
+def test_invalid_year_keeps_the_span_in_its_section():
+    gui = _gui('')
+    gui.life_text.insert(m.tk.END, "【流年數計算】\n", "title")
+    gui.render_year_number()
+    gui.life_text.insert(m.tk.END, "【生命靈數連線數】\n", "title")
+    assert '請輸入有效年份' in gui.life_text.text()
+
+    for year in ('²', '2026'):
+        gui.year_var.value = year
+        gui.render_year_number()
+    text = gui.life_text.text()
+    assert '請輸入有效年份' not in text
+    assert text.index('目標年份：2026') < text.index('【生命靈數連線數】')
+    assert text.endswith('【生命靈數連線數】\n')
@@ -0,0 +1,30 @@
+from datetime import date, timedelta
+
+import pytest
+
+from heatmap import HEATMAP_FIELDS, _year_cells, year_values
+from life_number_calculator import compute_profile
+
+
+@pytest.mark.parametrize('year', [2024, 2000, 1900, 2023])
+def test_year_values_match_compute_profile(year):
+    first = date(year, 1, 1)
+    days = (date(year + 1, 1, 1) - first).days
+    profiles = [compute_profile(f"{day:%Y%m%d}", tuple(HEATMAP_FIELDS))
+                for day in (first + timedelta(days=offset) for offset in range(days))]
+    for field in HEATMAP_FIELDS:
+        assert year_values(field, year) == [profile[field] for profile in profiles], field
+
+
+def test_year_cells_place_days_by_weekday():
+    rows = _year_cells('life_number', 2024)
+    values = year_values('life_number', 2024)
+    # 2024-01-01 為星期一，12-31 為星期二
+    assert rows[0][0] == values[0] - 1
+    assert rows[1][52] == values[-1] - 1
+    assert sum(cell is not None for row in rows for cell in row) == 366
+
+
+def test_year_values_rejects_unknown_field():
+    with pytest.raises(ValueError):
+        year_values('year_number', 2024)
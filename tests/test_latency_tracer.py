@@ -0,0 +1,95 @@
+import pytest
+
+import life_number_calculator
+from life_number_calculator import LatencyTracer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, ms):
+        self.now += ms / 1000
+
+
+class FakeRoot:
+    def __init__(self):
+        self.idle = []
+        self.timers = []
+
+    def after_idle(self, callback):
+        self.idle.append(callback)
+
+    def after(self, ms, callback):
+        self.timers.append(callback)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(life_number_calculator.time, 'perf_counter', clock)
+    return clock
+
+
+def _calculate(tracer, clock, root, validate_ms, render_ms, paint_ms):
+    tracer.start('calculate')
+    clock.advance(validate_ms)
+    tracer.lap('validate')
+    clock.advance(render_ms)
+    tracer.lap('render')
+    tracer.finish(root)
+    clock.advance(paint_ms)
+    root.idle.pop()()
+
+
+def test_summary_of_known_sample(clock):
+    logs, notified = [], []
+    tracer = LatencyTracer(enabled=True, stall_threshold_ms=100, log=logs.append)
+    tracer.listeners.append(notified.append)
+    root = FakeRoot()
+    for validate_ms, render_ms, paint_ms in ((1, 10, 4), (3, 20, 2), (2, 60, 6)):
+        _calculate(tracer, clock, root, validate_ms, render_ms, paint_ms)
+
+    assert tracer.stats['calculate/validate'] == [3, pytest.approx(0.006), pytest.approx(0.003)]
+    assert tracer.stats['calculate/render'] == [3, pytest.approx(0.09), pytest.approx(0.06)]
+    assert tracer.stats['calculate/total'] == [3, pytest.approx(0.096), pytest.approx(0.062)]
+    assert tracer.last_trace == [('validate', pytest.approx(0.002)), ('render', pytest.approx(0.06))]
+    assert logs[-1] == "calculate: validate=2.0ms, render=60.0ms, paint=6.0ms"
+    assert notified == [tracer] * 3
+
+    lines = tracer.summary()
+    assert lines[1:5] == [
+        f"{'calculate/paint':<32}{3:>6}{4.0:>10.1f}{6.0:>10.1f}",
+        f"{'calculate/render':<32}{3:>6}{30.0:>10.1f}{60.0:>10.1f}",
+        f"{'calculate/total':<32}{3:>6}{32.0:>10.1f}{62.0:>10.1f}",
+        f"{'calculate/validate':<32}{3:>6}{2.0:>10.1f}{3.0:>10.1f}",
+    ]
+    assert lines[-1] == "事件迴圈停頓：0 次（門檻 100ms，最長 0.0ms）"
+
+
+def test_watch_records_stalls_over_threshold(clock):
+    logs = []
+    tracer = LatencyTracer(enabled=True, stall_threshold_ms=100, log=logs.append)
+    root = FakeRoot()
+    tracer.watch(root, interval_ms=20)
+    for late_ms in (5, 150, 99, 250):
+        clock.advance(20 + late_ms)
+        root.timers.pop()()
+
+    assert tracer.stalls == [pytest.approx(0.15), pytest.approx(0.25)]
+    assert logs == ["事件迴圈停頓 150.0ms", "事件迴圈停頓 250.0ms"]
+    assert tracer.summary()[-1] == "事件迴圈停頓：2 次（門檻 100ms，最長 250.0ms）"
+
+
+def test_disabled_tracer_records_nothing(clock):
+    tracer = LatencyTracer(log=pytest.fail)
+    root = FakeRoot()
+    tracer.start('calculate')
+    clock.advance(10)
+    tracer.lap('validate')
+    tracer.finish(root)
+    tracer.watch(root)
+    assert tracer.stats == {} and tracer.last_trace == [] and root.idle == root.timers == []
@@ -0,0 +1,35 @@
+from datetime import date, timedelta
+
+from life_number_calculator import (
+    calculate_lunar_ziwei_number,
+    calculate_lunar_ziwei_numbers,
+    calculate_lunar_ziwei_numbers_from_lunar,
+    normalize_dates,
+)
+from lunar_calendar import SOLAR_FIRST, SOLAR_LAST, lookup_lunar, lunar_to_solar, solar_to_lunar_many
+
+
+def test_batch_matches_single_lookup():
+    solars, expected = [], []
+    day = date(1899, 12, 25)
+    while day <= date(2101, 2, 5):
+        solars.append(day.year * 10000 + day.month * 100 + day.day)
+        inside = SOLAR_FIRST <= solars[-1] <= SOLAR_LAST
+        expected.append(lookup_lunar(day.year, day.month, day.day) if inside else None)
+        day += timedelta(days=30)
+    assert solar_to_lunar_many(solars) == expected
+
+
+def test_batch_rejects_invalid_dates():
+    assert solar_to_lunar_many([0, 20230229, 20231301, 20230100, None, '20230101']) == [None] * 6
+    _, dates, _ = normalize_dates(['2023-02-29', '20240229'])
+    assert solar_to_lunar_many(dates) == [None, lookup_lunar(2024, 2, 29)]
+
+
+def test_lunar_birthdates_to_ziwei():
+    lunars = [(1990, 1, 1, False), (2023, 2, 1, True), (2023, 3, 1, True), (2023, 1, 31, False), (1899, 1, 1, False)]
+    assert calculate_lunar_ziwei_numbers_from_lunar(lunars) == [
+        calculate_lunar_ziwei_number(lunars[0]), calculate_lunar_ziwei_number(lunars[1]), None, None, None,
+    ]
+    solar = lunar_to_solar(1990, 1, 1)
+    assert calculate_lunar_ziwei_numbers([solar]) == [((1990, 1, 1, False), calculate_lunar_ziwei_number(lunars[0]))]
@@ -0,0 +1,118 @@
+from datetime import datetime
+import random
+
+import pytest
+
+from life_number_calculator import (
+    DATE_REJECT_REASONS,
+    LifeNumberCalculatorGUI,
+    iter_normalized_dates,
+    normalize_date,
+    normalize_dates,
+    normalize_year,
+)
+
+
+@pytest.mark.parametrize('value', [
+    '19790619', '1979-06-19', '1979/06/19', ' 19790619\n', 19790619,
+])
+def test_accepted_formats(value):
+    assert normalize_date(value) == (19790619, None)
+
+
+@pytest.mark.parametrize('value, reason', [
+    ('', 'empty'),
+    ('   ', 'empty'),
+    (None, 'empty'),
+    (1979.0619, 'type'),
+    (True, 'type'),
+    (['19790619'], 'type'),
+    ('1979/6/19', 'format'),
+    ('1979-06/19', 'format'),
+    ('1979.06.19', 'format'),
+    ('１９７９０６１９', 'format'),
+    ('1979061', 'format'),
+    ('1979O619', 'format'),
+    ('+9790619', 'format'),
+    (0, 'format'),
+    (-19790619, 'format'),
+    ('00000619', 'year'),
+    (100000101, 'year'),
+    ('19791319', 'month'),
+    ('19790019', 'month'),
+    ('19790631', 'day'),
+    ('19790600', 'day'),
+    ('19000229', 'day'),
+    ('20230229', 'day'),
+])
+def test_reject_reasons(value, reason):
+    assert normalize_date(value) == (None, reason)
+    assert reason in DATE_REJECT_REASONS
+
+
+def test_leap_days():
+    assert normalize_date('20000229') == (20000229, None)
+    assert normalize_date('2024-02-29') == (20240229, None)
+    assert normalize_date(16000229) == (16000229, None)
+
+
+def _reference(text):
+    """以 datetime.strptime 判斷 YYYYMMDD 是否有效"""
+    try:
+        parsed = datetime.strptime(text, '%Y%m%d')
+    except ValueError:
+        return None
+    return parsed.year * 10000 + parsed.month * 100 + parsed.day
+
+
+def test_random_dates_match_strptime():
+    rng = random.Random(20261019)
+    for _ in range(30000):
+        year, month, day = rng.randint(0, 9999), rng.randint(0, 13), rng.randint(0, 32)
+        text = f"{year:04d}{month:02d}{day:02d}"
+        expected = _reference(text)
+        separator = rng.choice(('', '-', '/'))
+        formatted = f"{year:04d}{separator}{month:02d}{separator}{day:02d}"
+        assert normalize_date(formatted)[0] == expected, formatted
+        assert normalize_date(int(text))[0] == expected or int(text) == 0, text
+
+
+def test_batch_forms():
+    values = ['19790619', 'bad', 20000229, None, '2023-02-29']
+    mask, dates, rejects = normalize_dates(values)
+    assert list(mask) == [1, 0, 1, 0, 0]
+    assert list(dates) == [19790619, 0, 20000229, 0, 0]
+    assert rejects == [(1, 'format'), (3, 'empty'), (4, 'day')]
+    assert list(iter_normalized_dates(values)) == [
+        (0, 19790619, None), (1, None, 'format'), (2, 20000229, None), (3, None, 'empty'), (4, None, 'day'),
+    ]
+
+
+class _Value:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+@pytest.mark.parametrize('text, leap, expected', [
+    ('20230201', True, (20230322, None)),
+    ('20230201', False, (20230220, None)),
+    ('20241301', False, (None, 'lunar')),
+    ('2023021', False, (None, 'lunar')),
+    ('18990101', False, (None, 'lunar')),
+])
+def test_lunar_input_reason(text, leap, expected):
+    gui = LifeNumberCalculatorGUI.__new__(LifeNumberCalculatorGUI)
+    gui.date_entry, gui.lunar_input_var, gui.leap_month_var = _Value(text), _Value(True), _Value(leap)
+    assert gui.read_birthdate() == expected
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2025', (2025, None)), (' 1 ', (1, None)), (9999, (9999, None)),
+    ('0', (None, 'year')), ('²', (None, 'year')), ('10000', (None, 'year')), (True, (None, 'year')),
+    ('', (None, 'year')), (2025.0, (None, 'year')),
+])
+def test_normalize_year(value, expected):
+    assert normalize_year(value) == expected
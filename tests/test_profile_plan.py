@@ -0,0 +1,39 @@
+import pytest
+
+import life_number_calculator
+from differential_check import CHECK_FIELDS, reference_profile
+from life_number_calculator import PROFILE_PLAN_CACHE_SIZE, compute_profile, plan_profile
+
+
+def test_field_order_shares_one_plan():
+    fields = ('life_tarot', 'life_number', 'digit_sum')
+    reordered = ('digit_sum', 'life_number', 'life_tarot', 'life_number')
+    assert life_number_calculator._plan_for(fields) is life_number_calculator._plan_for(reordered)
+    profile = compute_profile('19790619', reordered, 2025)
+    assert list(profile) == ['digit_sum', 'life_number', 'life_tarot']
+    assert profile == compute_profile('19790619', fields, 2025)
+    assert plan_profile(fields)('19790619', 2025) == compute_profile('19790619', fields, 2025)
+
+
+def test_plan_cache_is_bounded():
+    assert life_number_calculator._compile_plan.cache_info().maxsize == PROFILE_PLAN_CACHE_SIZE
+    assert life_number_calculator._plan_for.cache_info().maxsize == PROFILE_PLAN_CACHE_SIZE
+
+
+def test_unknown_field_is_rejected():
+    with pytest.raises(ValueError):
+        compute_profile('19790619', ('life_number', 'no_such_field'))
+
+
+@pytest.mark.parametrize('year', [2025, 1, 9999])
+def test_registry_matches_legacy_calculators(year, sample_birthdates):
+    for birthdate in sample_birthdates:
+        assert compute_profile(birthdate, CHECK_FIELDS, year) == reference_profile(birthdate, year), birthdate
+
+
+def test_field_subsets_match_full_profile(sample_birthdates):
+    fields = tuple(CHECK_FIELDS)
+    for birthdate in sample_birthdates[:100]:
+        full = compute_profile(birthdate, fields, 2025)
+        for subset in (fields[::-1], fields[::3], fields[1::4], ('grid_counts',)):
+            assert compute_profile(birthdate, subset, 2025) == {field: full[field] for field in subset}
@@ -0,0 +1,60 @@
+import io
+
+import pytest
+
+from life_number_calculator import compute_profile
+from profile_store import ProfileStore, read_members
+
+
+@pytest.fixture
+def store(tmp_path):
+    with ProfileStore(str(tmp_path / 'members.db')) as store:
+        yield store
+
+
+def test_read_members_skips_header_row():
+    text = '\ufeffmember_id,birthdate\nm1,19790619\nm2,生日\n\nm3,1990-01-01\n'
+    assert list(read_members(io.StringIO(text))) == [('m1', '19790619'), ('m2', '生日'), ('m3', '1990-01-01')]
+    assert list(read_members(io.StringIO('birthdate\n20000229\n'))) == [('2', '20000229')]
+    # 第一行是含數字的無效生日時仍照常讀出，計入無效資料
+    assert list(read_members(io.StringIO('m1,19790230\n'))) == [('m1', '19790230')]
+
+
+def test_header_not_counted_as_reject(store):
+    text = 'member_id,birthdate\nm1,19790619\nm2,19790230\n'
+    written, rejects = store.upsert_members(read_members(io.StringIO(text)))
+    assert written == 1
+    assert rejects == {'day': 1}
+
+
+@pytest.mark.parametrize('year', [2025, 1, 9999])
+def test_find_members_matches_compute_profile(store, sample_birthdates, year):
+    members = [(f"m{index}", birthdate) for index, birthdate in enumerate(sample_birthdates)]
+    store.upsert_members(members, batch_size=97)
+    profiles = {birthdate: compute_profile(birthdate, year=year) for birthdate in set(sample_birthdates)}
+    for field in ('year_number', 'year_tarot'):
+        for value in sorted({profile[field] for profile in profiles.values()}):
+            expected = sorted((member_id, birthdate) for member_id, birthdate in members
+                              if profiles[birthdate][field] == value)
+            assert sorted(store.find_members(year=year, **{field: value})) == expected
+            assert store.count_members(year, **{field: value}) == len(expected)
+    expected = sorted((member_id, birthdate) for member_id, birthdate in members
+                      if profiles[birthdate]['life_number'] == 3 and profiles[birthdate]['year_number'] in (1, 9))
+    assert sorted(store.find_members(year=year, life_number=3, year_number=[1, 9])) == expected
+
+
+def test_get_member_matches_compute_profile(store):
+    store.upsert_members([('a', '1979-06-19'), ('a', '20000229')])
+    member = store.get_member('a', year=2025)
+    profile = compute_profile('20000229', year=2025)
+    assert member['birthdate'] == '20000229'
+    for field, value in member.items():
+        if field not in ('id', 'birthdate', 'month_day_sum', 'digit_sum'):
+            assert value == profile[field], field
+
+
+def test_year_field_requires_year(store):
+    with pytest.raises(ValueError):
+        list(store.find_members(year_number=1))
+    with pytest.raises(ValueError):
+        store.count_members(no_such_field=1)
@@ -0,0 +1,34 @@
+import io
+import sys
+import zipfile
+
+from report_renderer import iter_report_files, main, render_report
+
+
+def test_colliding_ids_get_distinct_filenames():
+    reports = [('a/b', 1), ('a_b', 2), ('A_B', 3), ('a_b-2', 4)]
+    assert [name for name, _ in iter_report_files(reports)] == [
+        'a_b.html', 'a_b-2.html', 'A_B-3.html', 'a_b-2-2.html',
+    ]
+
+
+def test_empty_ids_fall_back_to_row_number():
+    reports = [('', 1), ('..', 2), ('/', 3), ('...x', 4), ('report-2', 5)]
+    assert [name for name, _ in iter_report_files(reports)] == [
+        'report-1.html', 'report-2.html', '_.html', 'x.html', 'report-2-2.html',
+    ]
+
+
+def test_grid_cell_lists_digits_as_text():
+    html = render_report('19790619', 2025)
+    assert '[' not in html.split('<table class="grid">', 1)[1].split('</table>', 1)[0]
+    assert '思想<br>2次<br>1 1' in html
+
+
+def test_stdin_input_is_left_open(tmp_path, monkeypatch):
+    stdin = io.StringIO('x,19790619\nx,19800101\n')
+    monkeypatch.setattr(sys, 'stdin', stdin)
+    archive = tmp_path / 'reports.zip'
+    main(['--input', '-', '--archive', str(archive), '--workers', '1', '--year', '2025'])
+    assert not stdin.closed
+    assert zipfile.ZipFile(archive).namelist() == ['x.html', 'x-2.html']
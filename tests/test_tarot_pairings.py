@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from api.index import batch_json
+from calculator_daemon import answer_query
+from life_number_calculator import (
+    TAROT_NUMBERS,
+    TAROT_PAIRINGS,
+    calculate_shadow_tarot,
+    compute_profile,
+    lookup_tarot_pairing,
+)
+from report_renderer import render_report
+
+# 年份中間兩位為 00 的生日，陰影塔羅為 0
+ZERO_SHADOW_BIRTHDATES = [f'{year}{month:02d}15' for year in (2000, 2005, 2009, 1001) for month in range(1, 13)]
+
+
+@pytest.mark.parametrize('birthdate', ZERO_SHADOW_BIRTHDATES)
+def test_pairings_for_zero_shadow_tarot(birthdate):
+    assert calculate_shadow_tarot(birthdate) == 0
+    pairings = compute_profile(birthdate, ('tarot_pairings',), 2025)['tarot_pairings']
+    assert len(pairings) == len(TAROT_PAIRINGS)
+    assert all(pairing['interpretation'] for pairing in pairings)
+
+
+def test_every_card_number_has_a_pairing():
+    for first in TAROT_NUMBERS:
+        for second in TAROT_NUMBERS:
+            assert lookup_tarot_pairing(first, second)['transition']
+    assert lookup_tarot_pairing(0, 22, 0)['cards'] == (0, 22, 0)
+    with pytest.raises(ValueError):
+        lookup_tarot_pairing(1, 23)
+
+
+def test_callers_handle_2000s_birthdates():
+    assert '陰影整合配牌' in render_report('20050101', 2025)
+    assert json.loads(answer_query('20050101 2025'))['shadow_tarot'] == 0
+    assert json.loads(batch_json(['2005-01-01'], 2025, None))[0]['shadow_tarot'] == 0
@@ -0,0 +1,24 @@
+import pytest
+
+from batch_job import run_job, segment_path
+from columnar import ColumnarFile
+from life_number_calculator import YEAR_FIELDS, compute_profile
+from year_rollover import run_rollover
+
+BIRTHDATES = ['09990101', '00050709', '20050101', '19790619']
+# 沒有 month_day_sum、digit_sum 的舊版結果，重算時改由生日計算
+OLD_FIELDS = ('life_number', 'year_number', 'year_tarot')
+
+
+@pytest.mark.parametrize('fields', [OLD_FIELDS, None])
+def test_columnar_rollover_matches_recompute(tmp_path, fields):
+    source = tmp_path / 'members.csv'
+    source.write_text(''.join(f'{i},{b}\n' for i, b in enumerate(BIRTHDATES)), encoding='utf-8')
+    out = str(tmp_path / 'out')
+    options = {'fields': fields} if fields else {}
+    run_job(str(source), out, year=2026, file_format='columnar', **options)
+    manifest = run_rollover(out, 2027)
+    assert manifest['done']
+    with ColumnarFile(segment_path(out + '/year-2027', 0, 'columnar')) as result:
+        rows = list(zip(*(result.columns[field].tolist() for field in YEAR_FIELDS)))
+    assert rows == [tuple(compute_profile(birthdate, YEAR_FIELDS, 2027).values()) for birthdate in BIRTHDATES]
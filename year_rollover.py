@@ -0,0 +1,216 @@
+"""
+跨年重算流年欄位
+
+每年只有流年數（year_number）與流年塔羅（year_tarot）會隨目標年份改變。
+本工具讀取 batch_job.py 已完成的結果資料夾，以每一筆資料已存下的 month_day_sum 與 digit_sum
+算出新年份的兩個流年欄位，只寫出這兩欄，不重新計算其他欄位，也不必重寫整份結果。
+
+兩個欄位都只由「數字和 + 目標年份的數字和」決定，因此先為新年份建好以數字和為索引的
+256 位元組對照表：欄式檔案以 bytes.translate 將整欄數字和一次換成流年欄位，CSV 與 JSONL 則逐列查表。
+舊版結果沒有這兩個數字和時，改由生日欄位計算。
+
+輸出資料夾（預設為 <結果資料夾>/year-<年份>）中每個來源分段對應一個同名的分段檔案，列的順序與來源相同：
+    CSV、JSONL   id、year_number、year_tarot
+    欄式         year_number、year_tarot 兩欄，依列號與來源分段對齊
+每個分段都以原子方式寫出，中斷後再次執行會略過已完成的分段；進度記錄在 rollover.json。
+
+用法：
+    python year_rollover.py --input-dir out/ --year 2027
+    python year_rollover.py --input-dir out/ --year 2027 --output-dir out-2027/
+"""
+import argparse
+import csv
+import glob
+import io
+import json
+import os
+import sys
+
+from batch_job import atomic_write, load_checkpoint, segment_path
+from columnar import ColumnarFile, write_columns
+from life_number_calculator import YEAR_FIELDS, sum_digits, reduce_to_9, reduce_to_22
+
+ROLLOVER_VERSION = 1
+ROLLOVER_NAME = 'rollover.json'
+
+
+def year_tables(year):
+    """
+    目標年份的流年對照表
+
+    Args:
+        year (int): 目標年份
+
+    Returns:
+        tuple: (流年數對照表, 流年塔羅對照表)，皆為 256 位元組，以數字和為索引
+    """
+    year_sum = sum_digits(str(year))
+    return (bytes(reduce_to_9(total + year_sum) for total in range(256)),
+            bytes(reduce_to_22(total + year_sum) for total in range(256)))
+
+
+def _sums(month_day_sum, digit_sum, birthdate):
+    """取得一筆資料的 (月日數字和, 年月日數字和)，結果中沒有存下時由生日計算"""
+    if month_day_sum is None or digit_sum is None:
+        return sum_digits(birthdate[4:]), sum_digits(birthdate)
+    return int(month_day_sum), int(digit_sum)
+
+
+def rollover_csv_segment(source_path, out, tables):
+    """將一個 CSV 分段的流年欄位寫成 id、year_number、year_tarot 三欄的 CSV"""
+    year_numbers, year_tarots = tables
+    text = io.TextIOWrapper(out, encoding='utf-8', newline='')
+    writer = csv.writer(text)
+    writer.writerow(('id',) + YEAR_FIELDS)
+    with open(source_path, encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        id_index, birthdate_index = header.index('id'), header.index('birthdate')
+        month_day_index = header.index('month_day_sum') if 'month_day_sum' in header else None
+        digit_index = header.index('digit_sum') if 'digit_sum' in header else None
+        for row in reader:
+            month_day_sum, digit_sum = _sums(
+                None if month_day_index is None else row[month_day_index],
+                None if digit_index is None else row[digit_index],
+                row[birthdate_index],
+            )
+            writer.writerow((row[id_index], year_numbers[month_day_sum], year_tarots[digit_sum]))
+    text.flush()
+    text.detach()
+
+
+def rollover_jsonl_segment(source_path, out, tables):
+    """將一個 JSONL 分段的流年欄位寫成每行 {"id", "year_number", "year_tarot"}"""
+    year_numbers, year_tarots = tables
+    with open(source_path, encoding='utf-8') as f:
+        for line in f:
+            row = json.loads(line)
+            month_day_sum, digit_sum = _sums(row.get('month_day_sum'), row.get('digit_sum'), row['birthdate'])
+            result = {'id': row['id'], 'year_number': year_numbers[month_day_sum],
+                      'year_tarot': year_tarots[digit_sum]}
+            out.write(json.dumps(result, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n')
+
+
+def rollover_columnar_segment(source_path, out, tables):
+    """將一個欄式分段的流年欄位寫成只有 year_number、year_tarot 兩欄的欄式檔案"""
+    year_numbers, year_tarots = tables
+    with ColumnarFile(source_path) as source:
+        columns = source.columns
+        if 'month_day_sum' in columns and 'digit_sum' in columns:
+            month_day_sums = columns['month_day_sum'].tobytes()
+            digit_sums = columns['digit_sum'].tobytes()
+        else:
+            # 欄式檔案的生日存成整數，補回前導零，例如 9990101 -> '09990101'
+            sums = [_sums(None, None, f'{birthdate:08d}') for birthdate in columns['birthdate']]
+            month_day_sums = bytes(month_day_sum for month_day_sum, _ in sums)
+            digit_sums = bytes(digit_sum for _, digit_sum in sums)
+        rows = source.rows
+    write_columns(out, rows, [
+        ('year_number', 'u1', month_day_sums.translate(year_numbers)),
+        ('year_tarot', 'u1', digit_sums.translate(year_tarots)),
+    ])
+
+
+# 來源分段格式 -> 重算函式 rollover(source_path, out, tables)
+ROLLOVER_FORMATS = {
+    'csv': rollover_csv_segment,
+    'jsonl': rollover_jsonl_segment,
+    'columnar': rollover_columnar_segment,
+}
+
+
+def _save_manifest(output_dir, manifest):
+    data = json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8')
+    atomic_write(os.path.join(output_dir, ROLLOVER_NAME), lambda f: f.write(data))
+
+
+def run_rollover(input_dir, year, output_dir=None, restart=False, progress=None):
+    """
+    為已完成的批次結果重算新年份的流年欄位
+
+    Args:
+        input_dir (str): batch_job.py 的輸出資料夾
+        year (int): 新的目標年份
+        output_dir (str): 輸出資料夾，預設為 <input_dir>/year-<year>
+        restart (bool): 刪除既有的輸出分段，從頭開始
+        progress (function): progress(已完成分段數, 分段總數)，每完成一個分段呼叫一次
+
+    Returns:
+        dict: 完成後的 rollover.json 內容
+
+    Raises:
+        ValueError: 來源不是已完成的批次結果，或輸出資料夾屬於其他年份或來源
+    """
+    checkpoint = load_checkpoint(input_dir)
+    if checkpoint is None:
+        raise ValueError(f"找不到批次工作的檢查點：{input_dir}")
+    if not checkpoint['done']:
+        raise ValueError("批次工作尚未完成，請先以 batch_job.py 跑完再重算流年")
+    file_format = checkpoint['format']
+    output_dir = output_dir or os.path.join(input_dir, f"year-{year}")
+    if os.path.abspath(output_dir) == os.path.abspath(input_dir):
+        raise ValueError("輸出資料夾不能與來源資料夾相同")
+    os.makedirs(output_dir, exist_ok=True)
+
+    if restart:
+        for path in glob.glob(os.path.join(output_dir, 'part-*')):
+            os.remove(path)
+    manifest = {
+        'version': ROLLOVER_VERSION,
+        'source': os.path.abspath(input_dir),
+        'source_year': checkpoint['year'],
+        'year': year,
+        'format': file_format,
+        'fields': list(YEAR_FIELDS),
+        'segments': checkpoint['segments'],
+        'rows': checkpoint['rows'],
+        'done': False,
+    }
+    manifest_path = os.path.join(output_dir, ROLLOVER_NAME)
+    if not restart and os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as f:
+            previous = json.load(f)
+        if {**previous, 'done': False} != manifest:
+            raise ValueError("輸出資料夾中是其他年份或來源的結果，請使用 --restart 重新開始")
+    _save_manifest(output_dir, manifest)
+
+    rollover = ROLLOVER_FORMATS[file_format]
+    tables = year_tables(year)
+    for index in range(checkpoint['segments']):
+        # 分段以原子方式寫出，存在就表示已經完整寫好
+        target = segment_path(output_dir, index, file_format)
+        if not os.path.exists(target):
+            source = segment_path(input_dir, index, file_format)
+            atomic_write(target, lambda out: rollover(source, out, tables))
+        if progress:
+            progress(index + 1, checkpoint['segments'])
+
+    manifest['done'] = True
+    _save_manifest(output_dir, manifest)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="為已完成的批次結果重算新年份的流年欄位")
+    parser.add_argument('--input-dir', required=True, help="batch_job.py 的輸出資料夾")
+    parser.add_argument('--year', type=int, required=True, help="新的目標年份")
+    parser.add_argument('--output-dir', help="輸出資料夾，預設為 <input-dir>/year-<year>")
+    parser.add_argument('--restart', action='store_true', help="刪除既有的輸出分段，從頭開始")
+    args = parser.parse_args(argv)
+
+    def report(done, total):
+        print(f"分段 {done}/{total}", file=sys.stderr)
+
+    try:
+        manifest = run_rollover(args.input_dir, args.year, args.output_dir, args.restart, report)
+    except ValueError as e:
+        parser.error(str(e))
+    except KeyboardInterrupt:
+        print("已中斷，再次執行相同指令即可略過已完成的分段繼續", file=sys.stderr)
+        sys.exit(1)
+    print(f"完成：{manifest['rows']} 筆的流年欄位已由 {manifest['source_year']} 年更新為 {manifest['year']} 年",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()